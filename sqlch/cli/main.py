@@ -1,14 +1,12 @@
 import json
 import os
 import sys
-import tempfile
-import subprocess
-from pathlib import Path
-from urllib.parse import urlparse
 
-from sqlch.core import player, library, discover
+# Only the control-socket client is imported up front: daemon-forwarded
+# commands (status, play, stop, ...) are forked constantly by bars and key
+# bindings, so player/library/discover (and requests behind them) are
+# imported inside the commands and fallbacks that actually need them.
 from sqlch.core import client
-from sqlch.core.daemon import run_daemon
 
 HELP = (
     'sqlch — radio + metadata orchestrator\n'
@@ -22,6 +20,7 @@ HELP = (
     '  sqlch stop\n'
     '  sqlch record [--full|--track]   (start; shows status if active)\n'
     '  sqlch record stop\n'
+    '  sqlch stats [--json]            (daemon counters + latencies)\n'
     '  sqlch tui\n'
     '\n'
     'Library:\n'
@@ -30,6 +29,8 @@ HELP = (
     '  sqlch add <url>\n'
     '  sqlch edit <id>\n'
     '  sqlch rm <id>\n'
+    '  sqlch import <file|-> [--format F]   (rb, sqlch, m3u, pls, xspf)\n'
+    '  sqlch export <file|-> [--format F]\n'
     '\n'
     'Discovery:\n'
     '  sqlch search <query>\n'
@@ -47,6 +48,7 @@ def main():
         return
     cmd, *args = argv
     if cmd == 'daemon':
+        from sqlch.core.daemon import run_daemon
         run_daemon()
         return
     if cmd == 'tui':
@@ -66,10 +68,18 @@ def daemon_call(payload: dict):
     return client.send(payload)
 
 
+def daemon_job(payload: dict):
+    """Like daemon_call, for commands that can outlast a request timeout."""
+    if not client.daemon_available():
+        return None
+    return client.run_job(payload)
+
+
 def status():
     resp = daemon_call({'cmd': 'status'})
     if resp:
         return resp.get('status', 'sqlch: unknown')
+    from sqlch.core import player
     return player.status_string()
 
 
@@ -79,15 +89,18 @@ def dispatch_command(cmd: str, args: list[str]) -> None:
         return
     if cmd == 'stop':
         if daemon_call({'cmd': 'stop'}) is None:
+            from sqlch.core import player
             player.stop()
         return
     if cmd == 'pause':
         if daemon_call({'cmd': 'pause'}) is None:
+            from sqlch.core import player
             player.pause()
         return
     if cmd == 'play-last':
         resp = daemon_call({'cmd': 'play', 'query': '__last__'})
         if resp is None:
+            from sqlch.core import library, player
             st = library.last_played_station()
             if st:
                 player.play_station(st)
@@ -112,6 +125,12 @@ def dispatch_command(cmd: str, args: list[str]) -> None:
     if cmd == 'rm':
         rm_cmd(args)
         return
+    if cmd == 'import':
+        import_cmd(args)
+        return
+    if cmd == 'export':
+        export_cmd(args)
+        return
     if cmd == 'search':
         search_cmd(args)
         return
@@ -121,6 +140,9 @@ def dispatch_command(cmd: str, args: list[str]) -> None:
     if cmd == 'record':
         record_cmd(args)
         return
+    if cmd == 'stats':
+        stats_cmd(args)
+        return
     if cmd == 'next':
         if daemon_call({'cmd': 'next'}) is None:
             print("sqlch: daemon not running")
@@ -138,12 +160,15 @@ def play_cmd(args: list[str]) -> None:
         print('Usage: sqlch play <id|name|index|url>', file=sys.stderr)
         sys.exit(1)
     arg = args[0]
-    resp = daemon_call({'cmd': 'play', 'query': arg})
+    resp = daemon_job({'cmd': 'play', 'query': arg})
     if resp:
         if not resp.get('ok'):
             print(resp.get('error', 'play failed'), file=sys.stderr)
             sys.exit(1)
         return
+    from urllib.parse import urlparse
+
+    from sqlch.core import discover, library, player
     if arg.isdigit():
         results = discover.load_last_search()
         idx = int(arg) - 1
@@ -179,6 +204,7 @@ def play_cmd(args: list[str]) -> None:
 
 
 def list_cmd() -> None:
+    from sqlch.core import library
     stations = library.list_stations()
     if not stations:
         print('No stations saved.')
@@ -191,6 +217,7 @@ def info_cmd(args: list[str]) -> None:
     if not args:
         print('Usage: sqlch info <station-id>', file=sys.stderr)
         sys.exit(1)
+    from sqlch.core import library
     st = library.find_station(args[0])
     if not st:
         print('Station not found.', file=sys.stderr)
@@ -205,6 +232,8 @@ def add_cmd(args: list[str]) -> None:
 
     query = " ".join(args)
 
+    from sqlch.core import discover, library
+
     results = discover.load_last_search()
     if not results:
         print("No recent search results found. Run `sqlch search` first.")
@@ -248,6 +277,11 @@ def edit_cmd(args: list[str]) -> None:
     if not args:
         print('Usage: sqlch edit <station-id>', file=sys.stderr)
         sys.exit(1)
+    import subprocess
+    import tempfile
+    from pathlib import Path
+
+    from sqlch.core import library
     st = library.find_station(args[0])
     if not st:
         print('Station not found.', file=sys.stderr)
@@ -267,6 +301,7 @@ def rm_cmd(args: list[str]) -> None:
     if not args:
         print('Usage: sqlch rm <station-id>', file=sys.stderr)
         sys.exit(1)
+    from sqlch.core import library
     if library.remove_station(args[0]):
         print('Removed.')
     else:
@@ -274,10 +309,89 @@ def rm_cmd(args: list[str]) -> None:
         sys.exit(1)
 
 
+def _file_and_format(args: list[str], usage: str) -> tuple[str, str | None]:
+    fmt = None
+    if '--format' in args:
+        i = args.index('--format')
+        if i + 1 >= len(args):
+            print(usage, file=sys.stderr)
+            sys.exit(1)
+        fmt = args[i + 1]
+        args = args[:i] + args[i + 2:]
+    if len(args) != 1:
+        print(usage, file=sys.stderr)
+        sys.exit(1)
+    from sqlch.core import stationio
+    if fmt is not None and fmt not in stationio.FORMATS:
+        print(f"Unknown format: {fmt} (one of {', '.join(stationio.FORMATS)})", file=sys.stderr)
+        sys.exit(1)
+    return args[0], fmt
+
+
+def import_cmd(args: list[str]) -> None:
+    usage = 'Usage: sqlch import <file|-> [--format rb|sqlch|m3u|pls|xspf]'
+    path, fmt = _file_and_format(args, usage)
+    from pathlib import Path
+
+    from sqlch.core import library, stationio
+    if path == '-':
+        if fmt is None:
+            print('sqlch: --format is required when importing from stdin', file=sys.stderr)
+            sys.exit(1)
+        f = sys.stdin
+    else:
+        try:
+            fmt = fmt or stationio.detect_format(Path(path))
+            f = open(path, encoding='utf-8')
+        except OSError as e:
+            print(f'sqlch: {e}', file=sys.stderr)
+            sys.exit(1)
+        except ValueError as e:  # UnicodeDecodeError while sniffing
+            print(f'sqlch: cannot read {path}: {e}', file=sys.stderr)
+            sys.exit(1)
+    try:
+        added, skipped = library.import_stations(stationio.read_stations(f, fmt))
+    except (ValueError, SyntaxError) as e:  # SyntaxError: XSPF ParseError
+        print(f'sqlch: cannot read {path} as {fmt}: {e}', file=sys.stderr)
+        sys.exit(1)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    print(f'Imported {added} stations ({skipped} skipped as duplicates or without URL).')
+
+
+def export_cmd(args: list[str]) -> None:
+    usage = 'Usage: sqlch export <file|-> [--format rb|sqlch|m3u|pls|xspf]'
+    path, fmt = _file_and_format(args, usage)
+    from pathlib import Path
+
+    from sqlch.core import library, stationio
+    if fmt is None:
+        suffix = Path(path).suffix.lower().lstrip('.')
+        fmt = {'m3u8': 'm3u'}.get(suffix, suffix) if suffix in ('m3u', 'm3u8', 'pls', 'xspf') else 'sqlch'
+    stations = library.list_stations()
+    if path == '-':
+        stationio.write_stations(stations, sys.stdout, fmt)
+        return
+    tmp = Path(path).with_name(Path(path).name + '.tmp')
+    try:
+        with open(tmp, 'w', encoding='utf-8') as f:
+            n = stationio.write_stations(stations, f, fmt)
+        tmp.replace(path)
+    except BaseException as e:
+        tmp.unlink(missing_ok=True)
+        if not isinstance(e, OSError):
+            raise
+        print(f'sqlch: {e}', file=sys.stderr)
+        sys.exit(1)
+    print(f'Exported {n} stations to {path} ({fmt}).')
+
+
 def search_cmd(args: list[str]) -> None:
     if not args:
         print('Usage: sqlch search <query>', file=sys.stderr)
         sys.exit(1)
+    from sqlch.core import discover
     results = discover.search(' '.join(args))
     discover.save_last_search(results)
     if not results:
@@ -293,7 +407,7 @@ def search_cmd(args: list[str]) -> None:
 
 def record_cmd(args: list[str]) -> None:
     if args and args[0] == 'stop':
-        resp = daemon_call({'cmd': 'record', 'action': 'stop'})
+        resp = daemon_job({'cmd': 'record', 'action': 'stop'})
         if resp is None:
             print('sqlch: daemon not running (recording requires the daemon)',
                   file=sys.stderr)
@@ -332,9 +446,10 @@ def preview_cmd(args: list[str]) -> None:
         print('Usage: sqlch preview <index|url>', file=sys.stderr)
         sys.exit(1)
     arg = args[0]
-    resp = daemon_call({'cmd': 'preview', 'url': arg})
+    resp = daemon_job({'cmd': 'preview', 'url': arg})
     if resp:
         return
+    from sqlch.core import discover, player
     if arg.isdigit():
         results = discover.load_last_search()
         idx = int(arg) - 1
@@ -344,3 +459,75 @@ def preview_cmd(args: list[str]) -> None:
         player.preview(results[idx]['url'])
     else:
         player.preview(arg)
+
+
+def _ms(v) -> str:
+    return '-' if v is None else f'{v:.1f}'
+
+
+def _latency_row(label: str, lat: dict, extra: str = '') -> str:
+    return (f"  {label:<14}{lat.get('count', 0):>7} {_ms(lat.get('p50')):>8} "
+            f"{_ms(lat.get('p95')):>8} {_ms(lat.get('p99')):>8} "
+            f"{_ms(lat.get('max')):>8}{extra}")
+
+
+def stats_cmd(args: list[str]) -> None:
+    resp = daemon_call({'cmd': 'stats'})
+    if resp is None:
+        print('sqlch: daemon not running', file=sys.stderr)
+        sys.exit(1)
+    st = resp.get('stats') or {}
+    if '--json' in args:
+        print(json.dumps(st, indent=2))
+        return
+    counters = st.get('counters') or {}
+    latency = st.get('latency_ms') or {}
+    gauges = st.get('gauges') or {}
+    threads = st.get('threads') or {}
+
+    print(f"uptime {st.get('uptime_s', 0)}s, {threads.get('total', 0)} threads")
+    header = f"  {'':<14}{'count':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}"
+
+    print('\ncommands (ms)')
+    print(header + '  errors')
+    errors = counters.get('cmd_errors') or {}
+    for name, lat in sorted((latency.get('cmd') or {}).items()):
+        print(_latency_row(name, lat, f"  {errors.get(name, 0):>6}"))
+
+    ipc = counters.get('mpv_ipc') or {}
+    print('\nmpv ipc (ms)')
+    print(header)
+    print(_latency_row('round trip', (latency.get('mpv_ipc') or {}).get('round_trip') or {}))
+    print(f"  timeouts {ipc.get('timeouts', 0)}, unavailable {ipc.get('unavailable', 0)}, "
+          f"pipelined commands {ipc.get('pipelined', 0)}")
+
+    print('\nenrichment caches')
+    for provider, c in sorted((counters.get('cache') or {}).items()):
+        hit, miss, stale = c.get('hit', 0), c.get('miss', 0), c.get('stale', 0)
+        total = hit + miss + stale
+        rate = f'{100 * hit / total:.0f}%' if total else '-'
+        print(f"  {provider:<14}hit {hit}, miss {miss}, stale {stale} ({rate} hits)")
+
+    probe = counters.get('probe') or {}
+    print('\nicy probes')
+    print(f"  title {probe.get('title', 0)}, no title {probe.get('no_title', 0)}, "
+          f"error {probe.get('error', 0)}")
+    if latency.get('probe'):
+        print(header)
+        print(_latency_row('probe', latency['probe']))
+
+    rec = gauges.get('recorder') or {}
+    print('\nrecorder')
+    print(f"  finalize queue {rec.get('finalize_queue', 0)}")
+    fin = (latency.get('recorder') or {}).get('finalize')
+    if fin:
+        print(header)
+        print(_latency_row('finalize', fin))
+
+    pool = gauges.get('standby') or {}
+    print('\nstandby pool')
+    print(f"  {pool.get('instances', 0)} warm instances, {pool.get('kbps', 0)} kbps")
+
+    print('\nthreads')
+    for name, n in (threads.get('by_name') or {}).items():
+        print(f"  {name:<24}{n:>4}")
@@ -1,8 +1,20 @@
+"""Client side of the daemon control socket.
+
+A Session keeps one connection to the daemon open and tags every request
+with an "id", which the daemon echoes in the reply. Any number of threads
+can have requests in flight on it at once; a reader thread hands each reply
+to the caller waiting on that id and anything else (subscription events) to
+registered listeners. If the daemon restarts, the next request reconnects.
+"""
+
 import json
 import socket
+import threading
+import time
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
+from sqlch.core.jsonline import JsonLineConnection
 from sqlch.core.paths import runtime_dir
 
 
@@ -14,18 +26,129 @@ def daemon_available() -> bool:
     return _control_sock().exists()
 
 
+class Session(JsonLineConnection):
+    """A persistent, pipelined connection to the daemon's control socket.
+
+    request() raises ConnectionError when the daemon cannot be reached (or
+    drops the connection before answering) and TimeoutError when no reply
+    arrives in time, matching what a one-shot socket would raise.
+    """
+
+    id_field = 'id'
+    thread_name = 'sqlch-client'
+
+    def __init__(self, path: Path | None = None) -> None:
+        super().__init__()
+        self.path = path
+
+    def _socket_path(self) -> Path:
+        return self.path or _control_sock()
+
+    def request(self, msg: dict[str, Any], timeout: float = 1.5) -> dict[str, Any]:
+        """Send one command and wait for its reply."""
+        return self.request_many([msg], timeout)[0]
+
+    def request_many(
+        self, msgs: list[dict[str, Any]], timeout: float = 1.5
+    ) -> list[dict[str, Any]]:
+        """Pipeline several commands in one write; replies in command order."""
+        if not msgs:
+            return []
+        # A write can only fail before the daemon saw the request (stale
+        # connection after a restart), so one reconnect + resend is safe.
+        pendings = self._submit(msgs, timeout, retries=1)
+        self._collect(pendings, timeout)
+        replies = [p.reply for p in pendings]
+        if all(r is not None for r in replies):
+            return replies
+        if any(p.done.is_set() and p.reply is None for p in pendings):
+            raise ConnectionError('daemon closed the connection')
+        raise TimeoutError('no reply from daemon')
+
+    def batch(
+        self, msgs: list[dict[str, Any]], stop_on_error: bool = False,
+        timeout: float = 1.5,
+    ) -> list[dict[str, Any]]:
+        """Run msgs as one daemon-side batch; one reply per message, in order."""
+        resp = self.request({'cmd': 'batch', 'commands': msgs,
+                             'stop_on_error': stop_on_error}, timeout)
+        if 'replies' not in resp:
+            raise RuntimeError(resp.get('error') or 'batch failed')
+        return resp['replies']
+
+
+_session: Session | None = None
+_session_lock = threading.Lock()
+
+
+def session() -> Session:
+    """The process-wide session on the default control socket."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = Session()
+        return _session
+
+
 def send(msg: dict[str, Any], timeout: float = 1.5) -> dict[str, Any]:
-    sock = _control_sock()
+    return session().request(msg, timeout)
+
+
+def run_job(
+    msg: dict[str, Any], timeout: float = 30.0, wait: float = 5.0,
+) -> dict[str, Any]:
+    """Run a slow command as a daemon job and wait for the command's reply.
+
+    The daemon answers the submission at once, and each poll as soon as
+    the job finishes or after up to wait seconds, so a search or station
+    switch that outlasts a request timeout is not mistaken for a dead
+    daemon and a quick one costs no sleep. The job is cancelled if timeout
+    passes first (raising TimeoutError) or the caller is interrupted.
+    """
+    resp = send({**msg, 'async': True})
+    job_id = resp.get('job')
+    if not job_id:
+        return resp  # rejected before it became a job
+    deadline = time.monotonic() + timeout
+    try:
+        while True:
+            left = max(0.0, min(wait, deadline - time.monotonic()))
+            info = send({'cmd': 'job', 'job': job_id, 'wait': left}, timeout=left + 1.5)
+            if not info.get('ok'):
+                return info
+            job = info['job']
+            if job['state'] in ('done', 'failed'):
+                return job.get('result') or {'ok': job['state'] == 'done'}
+            if job['state'] == 'cancelled':
+                return {'ok': False, 'error': 'cancelled'}
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"job {job_id} still {job['state']}")
+    except BaseException:
+        try:
+            send({'cmd': 'job', 'job': job_id, 'action': 'cancel'})
+        except (ConnectionError, TimeoutError):
+            pass
+        raise
+
+
+def subscribe(topics: list[str] | None = None) -> Iterator[dict[str, Any]]:
+    """Yield daemon events (see sqlch.core.events) as they happen.
+
+    Blocks between events; the stream ends when the daemon goes away.
+    Raises RuntimeError if the daemon rejects the subscription.
+    """
+    msg: dict[str, Any] = {'cmd': 'subscribe'}
+    if topics:
+        msg['topics'] = list(topics)
     with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
-        s.settimeout(timeout)
-        s.connect(str(sock))
+        s.connect(str(_control_sock()))
         s.sendall((json.dumps(msg) + '\n').encode())
-        data = b''
-        while not data.endswith(b'\n'):
-            chunk = s.recv(4096)
-            if not chunk:
-                break
-            data += chunk
-    if not data:
-        return {'ok': False, 'error': 'no response'}
-    return json.loads(data.decode('utf-8', errors='replace'))
+        with s.makefile('rb') as f:
+            ack = f.readline()
+            if not ack:
+                return
+            resp = json.loads(ack.decode('utf-8', errors='replace'))
+            if not resp.get('ok'):
+                raise RuntimeError(resp.get('error') or 'subscribe failed')
+            for line in f:
+                yield json.loads(line.decode('utf-8', errors='replace'))
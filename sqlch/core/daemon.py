@@ -1,11 +1,19 @@
 import json
 import os
+import queue
+import selectors
+import signal
 import socket
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any
 
-from sqlch.core import library, notify, player, discover
+from sqlch.core import (
+    config, events, jobs, library, notify, player, discover, standby, stats,
+    trace,
+)
 from sqlch.core.paths import runtime_dir
 
 
@@ -13,28 +21,232 @@ def control_sock() -> Path:
     return runtime_dir() / "control.sock"
 
 
-def _reply(conn: socket.socket, obj: dict[str, Any]):
-    data = (json.dumps(obj) + '\n').encode()
-    conn.sendall(data)
+# Commands answered on the server thread. They only read state, so they
+# never wait behind a station switch or a network search on a worker.
+# (A job poll with "wait" blocks, so it goes to a worker; see _inline.)
+_INLINE = {'ping', 'status', 'stats', 'job'}
+
+# Longest a job poll may block server-side; clients re-poll past it.
+_MAX_JOB_WAIT = 10.0
+
+# Commands that may be sent with "async": true and run as a background job
+# (see sqlch.core.jobs); the reply is then just the job id.
+_JOB_COMMANDS = {'play', 'preview', 'next', 'prev', 'record', 'stop'}
+
+# A play query that matches no station exactly or as a substring takes the
+# best fuzzy library match scoring at least this (share of the query's
+# trigrams found), before asking RadioBrowser.
+_FUZZY_MIN = 0.75
+
+# Serialises everything that drives the player; workers otherwise run
+# concurrently (a play resolving a query over HTTP does not hold it).
+_player_lock = threading.RLock()
+
+# Command names reported individually by `stats`; anything else is "unknown".
+_KNOWN = {'ping', 'status', 'stats', 'stop', 'pause', 'play', 'preview',
+          'next', 'prev', 'record', 'batch', 'job'}
+
+# Sub-commands a batch may carry: no nesting, and subscriptions belong to
+# the connection rather than to one request.
+_MAX_BATCH = 64
+_NOT_BATCHABLE = {'batch', 'subscribe', 'unsubscribe'}
+
+_WORKERS = 4
+_MAX_LINE = 1 << 20
+_MAX_BACKLOG = 1 << 20  # unsent bytes before a stalled subscriber is dropped
+
+
+class _StatusSnapshot:
+    """What `status` reports, kept current from player events.
+
+    The watcher and command handlers already publish every change, so the
+    daemon folds them into one small dict and pre-rendered text; answering
+    status is then a lock and a copy, with no mpv round trip or library read.
+    Recording state comes from `recording` events too: recorder.status()
+    would wait on the recorder's lock, which recorder.start holds across
+    mpv IPC.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._token: int | None = None
+        self._set({'status': 'stopped'}, 'stopped')
+        self._recording: dict[str, Any] = {'active': False}
+        self._rec_started = 0.0
+
+    def _set(self, info: dict[str, Any], state: str) -> None:
+        self._info = info
+        self._state = state
+        self._text = player.format_status(info)
+
+    def start(self) -> None:
+        """Subscribe to events and seed from the player (one mpv query)."""
+        from sqlch.core import recorder
+        if self._token is None:
+            self._token = events.subscribe(self.on_event, ['playback', 'track', 'recording'])
+        info = player.now_playing_info()
+        with self._lock:
+            self._set(info, info['status'])
+        self._on_recording(recorder.status())
+
+    def stop(self) -> None:
+        if self._token is not None:
+            events.unsubscribe(self._token)
+            self._token = None
+
+    def _on_recording(self, rec: dict[str, Any]) -> None:
+        with self._lock:
+            self._recording = {k: v for k, v in rec.items() if k not in ('event', 'ts')}
+            self._rec_started = time.monotonic() - (rec.get('elapsed') or 0)
+
+    def on_event(self, ev: dict[str, Any]) -> None:
+        if ev['event'] == 'recording':
+            self._on_recording(ev)
+            return
+        with self._lock:
+            info, state = self._info, self._state
+            if ev['event'] == 'track':
+                if state == 'stopped':
+                    return
+                info = {**info, 'station': ev.get('station') or info.get('station'),
+                        'artist': ev.get('artist'), 'track': ev.get('title')}
+            elif ev.get('state') == 'stopped':
+                info, state = {'status': 'stopped'}, 'stopped'
+            else:
+                name = (ev.get('station') or {}).get('name')
+                resumed = state == 'paused' and name == info.get('station')
+                if not resumed and ev['state'] == 'playing':
+                    info = {'status': 'playing', 'station': name}  # new station
+                state = ev['state']
+            self._set(info, state)
+
+    def reply(self) -> dict[str, Any]:
+        with self._lock:
+            rec = self._recording
+            if rec.get('active'):
+                rec = {**rec, 'elapsed': int(time.monotonic() - self._rec_started)}
+            return {'status': self._text, 'state': self._state, 'recording': rec}
+
+
+_status = _StatusSnapshot()
+
+
+def _play(st: dict[str, Any]) -> None:
+    """Play st, promoting its warm standby if the pool has one."""
+    with _player_lock:
+        sock = standby.take(st.get('id'))
+        if not (sock and player.adopt_standby(st, sock)):
+            if sock:
+                player._quit_instance(sock)
+            player.play_station(st)
+        standby.refill(st.get('id'))
+
+
+def _batch(msg: dict[str, Any]) -> dict[str, Any]:
+    """Run msg["commands"] in order; one reply per sub-command, same order.
+
+    A failing sub-command (ok false, or an exception) does not stop the
+    batch unless "stop_on_error" is set; then every later sub-command is
+    left unrun and answered with {"ok": false, "skipped": true}. The
+    envelope's ok is true only if every sub-command succeeded. Sub-commands
+    are not atomic: those that ran keep their effects.
+    """
+    cmds = msg.get('commands')
+    if not isinstance(cmds, list) or not cmds:
+        return {'ok': False, 'error': 'batch needs a non-empty commands list'}
+    if len(cmds) > _MAX_BATCH:
+        return {'ok': False, 'error': f'batch limited to {_MAX_BATCH} commands'}
+    stop_on_error = bool(msg.get('stop_on_error'))
+    replies: list[dict[str, Any]] = []
+    failed = False
+    for sub in cmds:
+        if failed and stop_on_error:
+            replies.append({'ok': False, 'error': 'skipped', 'skipped': True})
+            continue
+        if isinstance(sub, dict) and sub.get('cmd') in _NOT_BATCHABLE:
+            resp = {'ok': False, 'error': f"{sub['cmd']} cannot be batched"}
+        else:
+            resp = _respond(sub)
+        failed = failed or not resp.get('ok')
+        replies.append(resp)
+    return {'ok': not failed, 'replies': replies}
+
+
+def _is_job(msg: dict[str, Any]) -> bool:
+    return bool(msg.get('async')) and msg.get('cmd') in _JOB_COMMANDS
+
+
+def _submit_job(msg: dict[str, Any]) -> dict[str, Any]:
+    sub = {k: v for k, v in msg.items() if k not in ('async', 'id')}
+    job = jobs.submit(sub['cmd'], lambda: _respond(sub))
+    return {'ok': True, 'job': job.id, 'state': job.state}
+
+
+def _job(msg: dict[str, Any]) -> dict[str, Any]:
+    """Poll or cancel msg["job"]; without one, list recent jobs.
+
+    A poll with "wait": <seconds> answers once the job is final or the wait
+    (at most _MAX_JOB_WAIT) has passed, whichever comes first.
+    """
+    job_id = msg.get('job')
+    if not job_id:
+        return {'ok': True, 'jobs': jobs.recent()}
+    action = msg.get('action') or 'get'
+    wait = msg.get('wait')
+    if action == 'cancel':
+        job = jobs.cancel(job_id)
+    elif action == 'get' and wait:
+        if not isinstance(wait, (int, float)) or isinstance(wait, bool) or wait < 0:
+            return {'ok': False, 'error': 'wait must be a number of seconds'}
+        job = jobs.wait(job_id, min(float(wait), _MAX_JOB_WAIT))
+    elif action == 'get':
+        job = jobs.get(job_id)
+    else:
+        return {'ok': False, 'error': f'unknown job action: {action}'}
+    if job is None:
+        return {'ok': False, 'error': f'unknown job: {job_id}'}
+    return {'ok': True, 'job': job.info()}
+
+
+def _inline(msg: Any) -> bool:
+    """Whether msg can be answered on the server thread without a worker."""
+    if not isinstance(msg, dict):
+        return False
+    if msg.get('cmd') == 'batch':
+        cmds = msg.get('commands')
+        return isinstance(cmds, list) and all(_inline(c) for c in cmds)
+    if msg.get('cmd') == 'job' and msg.get('wait'):
+        return False
+    return msg.get('cmd') in _INLINE or _is_job(msg)
 
 
 def _handle(msg: dict[str, Any]) -> dict[str, Any]:
     cmd = msg.get('cmd')
+    if cmd == 'batch':
+        return _batch(msg)
+    if _is_job(msg):
+        return _submit_job(msg)
+    if cmd == 'job':
+        return _job(msg)
     if cmd == 'ping':
         return {'ok': True, 'msg': 'pong'}
     if cmd == 'status':
-        from sqlch.core import recorder
         return {
             'ok': True,
-            'status': player.status_string(),
+            **_status.reply(),
             'current': player.current(),
-            'recording': recorder.status(),
+            'last_switch': next(reversed(player.switch_latencies()), None),
         }
+    if cmd == 'stats':
+        return {'ok': True, 'stats': stats.snapshot()}
     if cmd == 'stop':
-        player.stop()
+        with _player_lock:
+            player.stop()
+            standby.clear()
         return {'ok': True}
     if cmd == 'pause':
-        player.pause()
+        with _player_lock:
+            player.pause()
         return {'ok': True}
     if cmd == 'play':
         q = (msg.get('query') or '').strip()
@@ -44,11 +256,16 @@ def _handle(msg: dict[str, Any]) -> dict[str, Any]:
             st = library.last_played_station()
             if not st:
                 return {'ok': False, 'error': 'no last played station'}
-            player.play_station(st)
+            _play(st)
             return {'ok': True}
         st = library.find_station(q)
         if not st:
+            hits = library.search_stations(q, limit=1, min_score=_FUZZY_MIN)
+            st = hits[0][1] if hits else None
+        if not st:
+            jobs.progress('searching')
             results = discover.search(q)
+            jobs.checkpoint()
             if len(results) == 1:
                 st = library.add_station(
                     name=results[0].get('name') or 'unknown',
@@ -61,36 +278,41 @@ def _handle(msg: dict[str, Any]) -> dict[str, Any]:
                     'error': f'could not resolve: {q}',
                     'results': results[:10],
                 }
-        player.play_station(st)
+        jobs.checkpoint()
+        jobs.progress('switching')
+        _play(st)
         return {'ok': True, 'station': {'id': st.get('id'), 'name': st.get('name')}}
     if cmd == 'preview':
         url = (msg.get('url') or '').strip()
         if not url:
             return {'ok': False, 'error': 'missing url'}
         dur = int(msg.get('duration') or 12)
-        player.preview(url, duration=dur)
+        with _player_lock:
+            player.preview(url, duration=dur)
         return {'ok': True}
     if cmd == 'next':
-        current = player.current()
-        if current:
-            sid = current.get('item', {}).get('id')
-            st = library.next_station(sid)
-        else:
-            stations = library.list_stations()
-            st = stations[0] if stations else None
-        if st:
-            player.play_station(st)
+        with _player_lock:
+            current = player.current()
+            if current:
+                sid = current.get('item', {}).get('id')
+                st = library.next_station(sid)
+            else:
+                stations = library.list_stations()
+                st = stations[0] if stations else None
+            if st:
+                _play(st)
         return {'ok': True}
     if cmd == 'prev':
-        current = player.current()
-        if current:
-            sid = current.get('item', {}).get('id')
-            st = library.prev_station(sid)
-        else:
-            stations = library.list_stations()
-            st = stations[-1] if stations else None
-        if st:
-            player.play_station(st)
+        with _player_lock:
+            current = player.current()
+            if current:
+                sid = current.get('item', {}).get('id')
+                st = library.prev_station(sid)
+            else:
+                stations = library.list_stations()
+                st = stations[-1] if stations else None
+            if st:
+                _play(st)
         return {'ok': True}
     if cmd == 'record':
         from sqlch.core import recorder
@@ -98,56 +320,292 @@ def _handle(msg: dict[str, Any]) -> dict[str, Any]:
         mode = msg.get('mode') or 'full'
         if action == 'status':
             return {'ok': True, 'recording': recorder.status()}
-        if action == 'stop':
-            return recorder.stop()
-        if action == 'start':
-            cur = player.current() or {}
-            return recorder.start(mode, cur.get('item'))
-        if action == 'toggle':
-            if recorder.status()['active']:
+        with _player_lock:
+            if action == 'stop':
                 return recorder.stop()
-            cur = player.current() or {}
-            return recorder.start(mode, cur.get('item'))
+            if action == 'start':
+                cur = player.current() or {}
+                return recorder.start(mode, cur.get('item'))
+            if action == 'toggle':
+                if recorder.status()['active']:
+                    return recorder.stop()
+                cur = player.current() or {}
+                return recorder.start(mode, cur.get('item'))
         return {'ok': False, 'error': f'unknown record action: {action}'}
     return {'ok': False, 'error': f'unknown cmd: {cmd}'}
 
 
-def run_daemon():
-    sock = control_sock()
-    # Start MPRIS daemon in background thread
-    from sqlch.core import mpris_daemon
-    threading.Thread(target=mpris_daemon.main, daemon=True, name="mpris").start()
+# ------------------------------------------------------------
+# Control server
+# ------------------------------------------------------------
 
+def _respond(msg: Any) -> dict[str, Any]:
+    """Run one request and shape its reply (echoing the request's id)."""
+    if not isinstance(msg, dict):
+        return {'ok': False, 'error': 'invalid request'}
+    if _is_job(msg):
+        name = 'job_submit'
+    else:
+        name = msg.get('cmd') if msg.get('cmd') in _KNOWN else 'unknown'
+    t0 = time.perf_counter()
     try:
-        if sock.exists():
-            sock.unlink()
-    except Exception:
-        pass
-
-    srv = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-    srv.bind(str(sock))
-    os.chmod(sock, 0o600)
-    srv.listen(16)
-
-    while True:
-        conn, _ = srv.accept()
+        with trace.span(f'daemon.{name}'):
+            resp = dict(_handle(msg))
+    except jobs.Cancelled:
+        raise
+    except Exception as e:
+        resp = {'ok': False, 'error': str(e)}
+    stats.observe(f'cmd.{name}', (time.perf_counter() - t0) * 1000)
+    if not resp.get('ok'):
+        stats.incr(f'cmd_errors.{name}')
+    if 'id' in msg:
+        resp['id'] = msg['id']
+    return resp
+
+
+class _Client:
+    __slots__ = ('sock', 'inbuf', 'outbuf', 'closed', 'subscription')
+
+    def __init__(self, sock: socket.socket) -> None:
+        self.sock = sock
+        self.inbuf = b''
+        self.outbuf = b''
+        self.closed = False
+        self.subscription: int | None = None
+
+
+class ControlServer:
+    """Line-delimited JSON control socket serving many clients at once.
+
+    One selector thread owns every socket. Each request line is answered
+    either inline (read-only commands in _INLINE) or by a worker pool, so
+    a play that falls through to a network search never holds up status
+    polls. Connections stay open for as many requests as the client sends;
+    a request carrying an "id" gets it echoed back, which lets a client
+    pipeline requests and match replies that finish out of order.
+
+    ``batch`` runs a list of commands in one request (see _batch).
+
+    A command in _JOB_COMMANDS sent with "async": true is answered at once
+    with {"job": <id>} and runs on the job pool; ``job`` (with "job": <id>,
+    optionally "action": "cancel" or "wait": <seconds>) polls, cancels or
+    waits on it, and ``job`` events report its progress.
+
+    ``subscribe`` (optionally with "topics", see sqlch.core.events) turns
+    a connection into an event stream: after the ack, every matching event
+    is written to it as one JSON line until the client disconnects or sends
+    ``unsubscribe``.
+    """
+
+    def __init__(self, path: Path, workers: int = _WORKERS) -> None:
+        self.path = path
+        self._sel = selectors.DefaultSelector()
+        self._pool = ThreadPoolExecutor(max_workers=workers,
+                                        thread_name_prefix='sqlch-cmd')
+        self._done: queue.Queue = queue.Queue()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._stopping = False
+        self._srv: socket.socket | None = None
+
+    def bind(self) -> None:
         try:
-            buf = b''
-            while not buf.endswith(b'\n'):
-                chunk = conn.recv(4096)
-                if not chunk:
-                    break
-                buf += chunk
-            if not buf:
-                _reply(conn, {'ok': False, 'error': 'empty request'})
-                continue
-            msg = json.loads(buf.decode('utf-8', errors='replace'))
-            resp = _handle(msg)
-            _reply(conn, resp)
-        except Exception as e:
-            _reply(conn, {'ok': False, 'error': str(e)})
+            if self.path.exists():
+                self.path.unlink()
+        except Exception:
+            pass
+        srv = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        srv.bind(str(self.path))
+        os.chmod(self.path, 0o600)
+        srv.listen(16)
+        srv.setblocking(False)
+        self._srv = srv
+        self._sel.register(srv, selectors.EVENT_READ)
+        self._sel.register(self._wake_r, selectors.EVENT_READ)
+
+    def shutdown(self) -> None:
+        self._stopping = True
+        self._wake()
+
+    def _wake(self) -> None:
+        try:
+            self._wake_w.send(b'\0')
+        except OSError:
+            pass  # buffer full: the loop is already due to wake
+
+    # --------------------------------------------------------
+    # Event loop
+    # --------------------------------------------------------
+
+    def serve_forever(self) -> None:
+        if self._srv is None:
+            self.bind()
+        try:
+            while not self._stopping:
+                for key, mask in self._sel.select():
+                    if key.fileobj is self._srv:
+                        self._accept()
+                    elif key.fileobj is self._wake_r:
+                        self._drain_done()
+                    else:
+                        client = key.data
+                        if mask & selectors.EVENT_READ:
+                            self._read(client)
+                        if mask & selectors.EVENT_WRITE and not client.closed:
+                            self._flush(client)
         finally:
-            try:
-                conn.close()
-            except Exception:
+            self._close_all()
+
+    def _accept(self) -> None:
+        try:
+            conn, _ = self._srv.accept()
+        except (BlockingIOError, InterruptedError):
+            return
+        conn.setblocking(False)
+        self._sel.register(conn, selectors.EVENT_READ, _Client(conn))
+
+    def _read(self, client: _Client) -> None:
+        try:
+            chunk = client.sock.recv(65536)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError:
+            chunk = b''
+        if not chunk:
+            self._close(client)
+            return
+        client.inbuf += chunk
+        while b'\n' in client.inbuf and not client.closed:
+            line, client.inbuf = client.inbuf.split(b'\n', 1)
+            if line.strip():
+                self._dispatch(client, line)
+        if len(client.inbuf) > _MAX_LINE:
+            self._close(client)
+
+    def _dispatch(self, client: _Client, line: bytes) -> None:
+        try:
+            msg = json.loads(line.decode('utf-8', errors='replace'))
+        except ValueError as e:
+            self._send(client, {'ok': False, 'error': f'invalid json: {e}'})
+            return
+        if isinstance(msg, dict) and msg.get('cmd') in ('subscribe', 'unsubscribe'):
+            resp = self._subscription(client, msg)
+            if 'id' in msg:
+                resp['id'] = msg['id']
+            self._send(client, resp)
+            return
+        if _inline(msg):
+            self._send(client, _respond(msg))
+            return
+        self._pool.submit(self._work, client, msg)
+
+    def _subscription(self, client: _Client, msg: dict[str, Any]) -> dict[str, Any]:
+        if client.subscription is not None:
+            events.unsubscribe(client.subscription)
+            client.subscription = None
+        if msg['cmd'] == 'unsubscribe':
+            return {'ok': True}
+        topics = msg.get('topics') or None
+        if isinstance(topics, str):
+            topics = [t.strip() for t in topics.split(',') if t.strip()]
+        try:
+            client.subscription = events.subscribe(
+                lambda ev: self._push(client, ev), topics)
+        except (TypeError, ValueError) as e:
+            return {'ok': False, 'error': str(e)}
+        return {'ok': True, 'topics': sorted(topics or events.TOPICS)}
+
+    def _push(self, client: _Client, event: dict[str, Any]) -> None:
+        # Runs on the publishing thread; the loop thread does the write.
+        self._done.put((client, event))
+        self._wake()
+
+    def _work(self, client: _Client, msg: Any) -> None:
+        self._done.put((client, _respond(msg)))
+        self._wake()
+
+    def _drain_done(self) -> None:
+        try:
+            while self._wake_r.recv(4096):
                 pass
+        except (BlockingIOError, InterruptedError):
+            pass
+        while True:
+            try:
+                client, resp = self._done.get_nowait()
+            except queue.Empty:
+                return
+            if not client.closed:
+                self._send(client, resp)
+
+    def _send(self, client: _Client, resp: dict[str, Any]) -> None:
+        client.outbuf += (json.dumps(resp) + '\n').encode()
+        if len(client.outbuf) > _MAX_BACKLOG:
+            self._close(client)
+            return
+        self._flush(client)
+
+    def _flush(self, client: _Client) -> None:
+        try:
+            sent = client.sock.send(client.outbuf)
+        except (BlockingIOError, InterruptedError):
+            sent = 0
+        except OSError:
+            self._close(client)
+            return
+        client.outbuf = client.outbuf[sent:]
+        events = selectors.EVENT_READ
+        if client.outbuf:
+            events |= selectors.EVENT_WRITE
+        self._sel.modify(client.sock, events, client)
+
+    def _close(self, client: _Client) -> None:
+        if client.closed:
+            return
+        client.closed = True
+        if client.subscription is not None:
+            events.unsubscribe(client.subscription)
+            client.subscription = None
+        try:
+            self._sel.unregister(client.sock)
+        except (KeyError, ValueError):
+            pass
+        try:
+            client.sock.close()
+        except OSError:
+            pass
+
+    def _close_all(self) -> None:
+        for key in list(self._sel.get_map().values()):
+            if isinstance(key.data, _Client):
+                self._close(key.data)
+        self._pool.shutdown(wait=False)
+        self._sel.close()
+        for s in (self._srv, self._wake_r, self._wake_w):
+            if s is not None:
+                s.close()
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
+
+
+def run_daemon(mpris: bool = True):
+    player.set_reuse(bool(config.load().get('mpv_reuse', True)))
+    if mpris:  # off for headless runs (tools/loadtest.py): needs D-Bus + GLib
+        # Start MPRIS daemon in background thread
+        from sqlch.core import mpris_daemon
+        threading.Thread(target=mpris_daemon.main, daemon=True, name="mpris").start()
+    _status.start()
+
+    server = ControlServer(control_sock())
+    # SIGTERM (systemd, pkill) ends the loop like Ctrl-C, so the muted
+    # standby and preview mpv processes are not left streaming.
+    signal.signal(signal.SIGTERM, lambda *_: server.shutdown())
+    try:
+        server.serve_forever()
+    finally:
+        with _player_lock:
+            standby.clear()
+            player.close_preview()
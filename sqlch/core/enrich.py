@@ -8,7 +8,7 @@ from typing import Any
 
 import requests
 
-from sqlch.core import spoti
+from sqlch.core import spoti, stats, trace
 from sqlch.core.paths import cache_dir
 
 
@@ -75,6 +75,7 @@ def _save_cache(db: dict[str, Any]) -> None:
     _cache_file().write_text(json.dumps(db, indent=2))
 
 
+@trace.traced
 def _enrich_musicbrainz(artist: str, track: str) -> dict[str, Any]:
     base = _mb_base_url()
     result: dict[str, Any] = {}
@@ -122,6 +123,7 @@ def _mb_base_url() -> str:
     return os.environ.get("SQLCH_MUSICBRAINZ_BASE", "https://musicbrainz.org/ws/2")
 
 
+@trace.traced
 def _mb_genres_for_recording(recording_id: str | None) -> list:
     """Fetch MusicBrainz tags for a recording and return the top genre tags."""
     if not recording_id:
@@ -149,6 +151,7 @@ def _mb_genres_for_recording(recording_id: str | None) -> list:
         return []
 
 
+@trace.traced
 def enrich_track(artist: str, track: str) -> dict[str, Any]:
     """
     Enrich track metadata using:
@@ -175,8 +178,10 @@ def enrich_track(artist: str, track: str) -> dict[str, Any]:
         and cached_tracklist is not None
         and (not cached_tracklist or 'duration_ms' in cached_tracklist[0])
     ):
+        stats.incr('cache.enrich.hit')
         cached['source'] = 'cache'
         return cached
+    stats.incr('cache.enrich.stale' if cached else 'cache.enrich.miss')
 
     # Fetch fresh result
     base = _empty_result(artist, track)
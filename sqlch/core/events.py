@@ -0,0 +1,62 @@
+"""In-process event bus for the daemon's push notifications.
+
+Player, watcher and recorder publish small JSON-able events here; the
+control server's ``subscribe`` command relays them to clients. Events are
+delivered synchronously on the publishing thread, so subscribers must only
+hand them off (queue, wake a loop) and never block.
+
+Topics:
+
+- track:       ICY title changed (station, artist, title)
+- playback:    state is "playing", "paused" or "stopped" (station)
+- recording:   recorder started or stopped (the recorder status dict)
+- buffer:      mpv cache-buffering-state changed (percent)
+- enrichment:  enriched fields for the current track are published
+- job:         a background job changed state or progress (sqlch.core.jobs)
+"""
+
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from typing import Any, Callable
+
+TOPICS = ("track", "playback", "recording", "buffer", "enrichment", "job")
+
+Subscriber = Callable[[dict[str, Any]], None]
+
+_lock = threading.Lock()
+_subscribers: dict[int, tuple[Subscriber, frozenset[str]]] = {}
+_tokens = itertools.count(1)
+
+
+def subscribe(fn: Subscriber, topics: list[str] | None = None) -> int:
+    """Call fn with every event on topics (all topics if None); returns a token."""
+    wanted = frozenset(topics) if topics else frozenset(TOPICS)
+    unknown = wanted - set(TOPICS)
+    if unknown:
+        raise ValueError(f"unknown topics: {', '.join(sorted(unknown))}")
+    token = next(_tokens)
+    with _lock:
+        _subscribers[token] = (fn, wanted)
+    return token
+
+
+def unsubscribe(token: int) -> None:
+    with _lock:
+        _subscribers.pop(token, None)
+
+
+def publish(topic: str, **data: Any) -> None:
+    """Deliver {"event": topic, "ts": ..., **data} to matching subscribers."""
+    with _lock:
+        targets = [fn for fn, wanted in _subscribers.values() if topic in wanted]
+    if not targets:
+        return
+    event = {"event": topic, "ts": round(time.time(), 3), **data}
+    for fn in targets:
+        try:
+            fn(event)
+        except Exception:
+            pass
@@ -0,0 +1,87 @@
+"""Trigram index for typo-tolerant station lookup.
+
+Text is case- and accent-folded and split into words; each word is padded
+("  jazz ") and cut into trigrams, as pg_trgm does. A document is the set
+of trigrams of all its fields. A query is scored by the share of its
+trigrams a document contains, so "jaz fm" still finds "Jazz FM 91" and
+extra words in a station name cost nothing. Ties go to the closer match
+(Jaccard over both sets), then to the earlier document.
+
+Lookups count posting hits in an inverted index (trigram -> document
+positions) rather than intersecting trigram sets per document. A document
+sharing need of the n query trigrams (need from min_score) must hold one
+of any n - need + 1 of them, so only the rarest postings make candidates;
+the common ones ("rad", " fm") just add to the counts of those, via set
+intersections rather than a Python loop over every posting.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import unicodedata
+from collections import Counter
+
+_WORD = re.compile(r"[^\W_]+")
+
+
+def _fold(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def trigrams(text: str) -> set[str]:
+    out: set[str] = set()
+    for word in _WORD.findall(_fold(text)):
+        padded = f"  {word} "
+        out.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return out
+
+
+class TrigramIndex:
+    """Documents are numbered in insertion order, like the station list."""
+
+    __slots__ = ("postings", "sizes")
+
+    def __init__(self) -> None:
+        self.postings: dict[str, list[int]] = {}
+        self.sizes: list[int] = []  # trigram count per document
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    def add(self, *fields: str) -> int:
+        """Index the next document (the union of fields); returns its position."""
+        pos = len(self.sizes)
+        grams: set[str] = set()
+        for field in fields:
+            grams |= trigrams(field)
+        for g in grams:
+            self.postings.setdefault(g, []).append(pos)
+        self.sizes.append(len(grams))
+        return pos
+
+    def search(self, query: str, limit: int = 10, min_score: float = 0.3) -> list[tuple[float, int]]:
+        """Best (score, position) pairs for query, best first; score is 0..1."""
+        wanted = trigrams(query)
+        if not wanted:
+            return []
+        n = len(wanted)
+        need = max(1, math.ceil(min_score * n - 1e-9))
+        if need > n:
+            return []
+        rarest = sorted((self.postings.get(g, ()) for g in wanted), key=len)
+        split = n - need + 1
+        hits: Counter[int] = Counter()
+        for posting in rarest[:split]:
+            hits.update(posting)
+        candidates = set(hits)
+        for posting in rarest[split:]:
+            hits.update(candidates.intersection(posting))
+
+        sizes = self.sizes
+        scored = [(shared / n, shared / (n + sizes[pos] - shared), -pos)
+                  for pos, shared in hits.items() if shared >= need]
+        best = heapq.nlargest(limit, scored)
+        return [(round(score, 3), -neg) for score, _, neg in best]
@@ -0,0 +1,183 @@
+"""Background jobs for slow daemon commands.
+
+A control request sent with ``"async": true`` is answered at once with a
+job id; the command itself runs on the job pool. Its progress and outcome
+are published as ``job`` events (see sqlch.core.events) and can be polled
+with the ``job`` command, or waited on (wait()). Cancellation is cooperative: a job that has not
+started never runs, and a running one stops at its next checkpoint()
+(between a search and the station switch, say). Work already done stays
+done.
+
+Command code does not take the job as an argument: progress() and
+checkpoint() act on the job running on the calling thread, and are no-ops
+when the same code runs synchronously.
+"""
+
+from __future__ import annotations
+
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from sqlch.core import events
+
+_WORKERS = 2
+_KEEP_FINISHED = 64
+
+PENDING, RUNNING, DONE, FAILED, CANCELLED = (
+    "pending", "running", "done", "failed", "cancelled",
+)
+_FINAL = {DONE, FAILED, CANCELLED}
+
+
+class Cancelled(Exception):
+    """Raised by checkpoint() inside a job that has been cancelled."""
+
+
+class Job:
+    def __init__(self, job_id: str, cmd: str) -> None:
+        self.id = job_id
+        self.cmd = cmd
+        self.state = PENDING
+        self.progress: str | None = None
+        self.result: dict[str, Any] | None = None
+        self.created = time.time()
+        self.finished: float | None = None
+        self.cancel_requested = threading.Event()
+        self.done = threading.Event()  # set on reaching a final state
+        self.lock = threading.Lock()  # guards pending -> running/cancelled
+
+    def info(self) -> dict[str, Any]:
+        out = {"id": self.id, "cmd": self.cmd, "state": self.state,
+               "progress": self.progress}
+        if self.result is not None:
+            out["result"] = self.result
+        return out
+
+
+_lock = threading.Lock()
+_jobs: "OrderedDict[str, Job]" = OrderedDict()
+_ids = itertools.count(1)
+_local = threading.local()
+_pool: ThreadPoolExecutor | None = None
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    with _lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=_WORKERS,
+                                       thread_name_prefix="sqlch-job")
+        return _pool
+
+
+def _publish(job: Job) -> None:
+    events.publish("job", **job.info())
+
+
+def _prune_locked() -> None:
+    finished = [j.id for j in _jobs.values() if j.state in _FINAL]
+    for job_id in finished[: max(0, len(finished) - _KEEP_FINISHED)]:
+        del _jobs[job_id]
+
+
+# ------------------------------------------------------------
+# Inside a job
+# ------------------------------------------------------------
+
+def current() -> Job | None:
+    return getattr(_local, "job", None)
+
+
+def progress(text: str) -> None:
+    """Report what the current job is doing (no-op outside a job)."""
+    job = current()
+    if job is not None and job.progress != text:
+        job.progress = text
+        _publish(job)
+
+
+def checkpoint() -> None:
+    """Stop here if the current job has been cancelled."""
+    job = current()
+    if job is not None and job.cancel_requested.is_set():
+        raise Cancelled()
+
+
+# ------------------------------------------------------------
+# Public API
+# ------------------------------------------------------------
+
+def submit(cmd: str, fn: Callable[[], dict[str, Any]]) -> Job:
+    """Queue fn (returning a control reply) as a job; returns it immediately.
+
+    The job fails if the reply's ok is false or fn raises.
+    """
+    job = Job(f"j{next(_ids)}", cmd)
+    with _lock:
+        _jobs[job.id] = job
+        _prune_locked()
+    _publish(job)
+    _executor().submit(_run, job, fn)
+    return job
+
+
+def _run(job: Job, fn: Callable[[], dict[str, Any]]) -> None:
+    with job.lock:
+        if job.cancel_requested.is_set():
+            return  # cancel() already finished it
+        job.state = RUNNING
+    _publish(job)
+    _local.job = job
+    try:
+        result = fn()
+        job.result = result
+        job.state = DONE if result.get("ok") else FAILED
+    except Cancelled:
+        job.state = CANCELLED
+    except Exception as e:
+        job.result = {"ok": False, "error": str(e)}
+        job.state = FAILED
+    finally:
+        _local.job = None
+    job.finished = time.time()
+    job.done.set()
+    _publish(job)
+
+
+def get(job_id: str) -> Job | None:
+    with _lock:
+        return _jobs.get(job_id)
+
+
+def cancel(job_id: str) -> Job | None:
+    """Request cancellation; a job that has not started is cancelled outright."""
+    job = get(job_id)
+    if job is None or job.state in _FINAL:
+        return job
+    with job.lock:
+        job.cancel_requested.set()
+        cancelled_outright = job.state == PENDING
+        if cancelled_outright:
+            job.state = CANCELLED
+            job.finished = time.time()
+            job.done.set()
+    if cancelled_outright:
+        _publish(job)
+    return job
+
+
+def wait(job_id: str, timeout: float) -> Job | None:
+    """get(), after up to timeout seconds for the job to reach a final state."""
+    job = get(job_id)
+    if job is not None:
+        job.done.wait(timeout)
+    return job
+
+
+def recent() -> list[dict[str, Any]]:
+    with _lock:
+        return [j.info() for j in _jobs.values()]
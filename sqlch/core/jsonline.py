@@ -0,0 +1,247 @@
+"""Request/response multiplexing over a newline-delimited JSON socket.
+
+Both sockets sqlch speaks JSON lines on, mpv's IPC and the daemon's
+control socket, echo a request id in every reply, so one connection can
+carry any number of in-flight requests from any number of threads.
+JsonLineConnection owns such a connection: it connects lazily, tags and
+writes requests, and runs the reader thread that hands each reply to the
+caller waiting on its id and everything else (events) to listeners. A
+dropped connection fails the requests still in flight on it; the next
+request reconnects.
+
+Subclasses name the id field and the socket, and put their own request
+API on top (sqlch.core.mpv_ipc.MpvConnection, sqlch.core.client.Session).
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+Listener = Callable[[dict[str, Any]], None]
+
+
+class _Pending:
+    __slots__ = ("rid", "sock", "done", "reply")
+
+    def __init__(self, rid: int, sock: socket.socket) -> None:
+        self.rid = rid
+        self.sock = sock
+        self.done = threading.Event()
+        self.reply: dict[str, Any] | None = None
+
+
+class JsonLineConnection:
+    """One long-lived, multiplexed connection; see the module docstring."""
+
+    id_field = "id"
+    thread_name = "jsonline"
+
+    def __init__(self) -> None:
+        self._sock: socket.socket | None = None
+        self._send_lock = threading.Lock()  # guards connect + write
+        self._pending: dict[int, _Pending] = {}
+        self._pending_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._listeners: list[Listener] = []
+
+    def _socket_path(self) -> Path:
+        raise NotImplementedError
+
+    # --------------------------------------------------------
+    # Connection lifecycle
+    # --------------------------------------------------------
+
+    @property
+    def connected(self) -> bool:
+        return self._sock is not None
+
+    def _connect_locked(self, timeout: float) -> socket.socket:
+        """The live socket, connecting first if needed (caller holds _send_lock).
+
+        Raises ConnectionError when nothing is listening.
+        """
+        if self._sock is not None:
+            return self._sock
+        path = self._socket_path()
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        s.settimeout(timeout)
+        try:
+            s.connect(str(path))
+        except OSError as e:
+            s.close()
+            raise ConnectionError(f"{path} not reachable: {e}") from e
+        s.settimeout(None)  # reader blocks; liveness comes from EOF
+        self._sock = s
+        self._connected_locked(s)
+        threading.Thread(
+            target=self._read_loop,
+            args=(s,),
+            daemon=True,
+            name=f"{self.thread_name}:{path.name}",
+        ).start()
+        return s
+
+    def _connected_locked(self, sock: socket.socket) -> None:
+        """Hook: a new connection is up (still under _send_lock)."""
+
+    def _disconnected(self) -> None:
+        """Hook: the current connection dropped."""
+
+    def _drop(self, sock: socket.socket) -> None:
+        with self._send_lock:
+            was_current = self._sock is sock
+            if was_current:
+                self._sock = None
+        try:
+            sock.close()
+        except OSError:
+            pass
+        with self._pending_lock:
+            dead = [rid for rid, p in self._pending.items() if p.sock is sock]
+            failed = [self._pending.pop(rid) for rid in dead]
+        for p in failed:
+            p.done.set()  # reply stays None
+        if was_current:
+            self._disconnected()
+
+    def close(self) -> None:
+        """Drop the current connection; the next request reconnects."""
+        sock = self._sock
+        if sock is None:
+            return
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._drop(sock)
+
+    # --------------------------------------------------------
+    # Reader thread
+    # --------------------------------------------------------
+
+    def _read_loop(self, sock: socket.socket) -> None:
+        buf = b""
+        try:
+            while True:
+                chunk = sock.recv(65536)
+                if not chunk:
+                    break
+                buf += chunk
+                while b"\n" in buf:
+                    line, buf = buf.split(b"\n", 1)
+                    if line.strip():
+                        self._dispatch(line)
+        except OSError:
+            pass
+        finally:
+            self._drop(sock)
+
+    def _dispatch(self, line: bytes) -> None:
+        try:
+            msg = json.loads(line.decode("utf-8", errors="replace"))
+        except ValueError:
+            return
+        if not isinstance(msg, dict):
+            return
+        rid = msg.get(self.id_field)
+        if "event" not in msg and isinstance(rid, int):
+            with self._pending_lock:
+                p = self._pending.pop(rid, None)
+            if p is not None:
+                del msg[self.id_field]
+                p.reply = msg
+                p.done.set()
+            return  # a reply nobody waits for (fire-and-forget, timed out)
+        self._notify(msg)
+
+    def _notify(self, msg: dict[str, Any]) -> None:
+        for fn in list(self._listeners):
+            try:
+                fn(msg)
+            except Exception:
+                pass
+
+    # --------------------------------------------------------
+    # Requests
+    # --------------------------------------------------------
+
+    def _encode(self, msgs: list[dict[str, Any]], rids: list[int]) -> bytes:
+        return b"".join(
+            (json.dumps({**m, self.id_field: rid}) + "\n").encode()
+            for m, rid in zip(msgs, rids)
+        )
+
+    def _submit(
+        self, msgs: list[dict[str, Any]], timeout: float, retries: int = 0
+    ) -> list[_Pending]:
+        """Write msgs in one sendall, each registered to receive its reply.
+
+        A failed write can only mean a stale connection the peer never read
+        from, so it is dropped and the write retried up to retries times.
+        Raises ConnectionError if the peer cannot be reached.
+        """
+        rids = [next(self._ids) for _ in msgs]
+        payload = self._encode(msgs, rids)
+        for _ in range(retries + 1):
+            with self._send_lock:
+                sock = self._connect_locked(timeout)
+                pendings = [_Pending(rid, sock) for rid in rids]
+                with self._pending_lock:
+                    self._pending.update(zip(rids, pendings))
+                try:
+                    sock.sendall(payload)
+                    return pendings
+                except OSError:
+                    pass
+            self._drop(sock)
+        raise ConnectionError("connection lost")
+
+    def _collect(self, pendings: list[_Pending], timeout: float) -> bool:
+        """Wait for pendings under one deadline; False if any timed out."""
+        deadline = time.monotonic() + timeout
+        for p in pendings:
+            p.done.wait(max(0.0, deadline - time.monotonic()))
+        with self._pending_lock:
+            for p in pendings:
+                self._pending.pop(p.rid, None)
+        return all(p.done.is_set() for p in pendings)
+
+    def _write_locked(self, sock: socket.socket, msgs: list[dict[str, Any]]) -> bool:
+        """Fire-and-forget write (caller holds _send_lock); replies are discarded."""
+        try:
+            sock.sendall(self._encode(msgs, [next(self._ids) for _ in msgs]))
+            return True
+        except OSError:
+            return False
+
+    def _send(self, msgs: list[dict[str, Any]], timeout: float) -> bool:
+        """Fire-and-forget msgs in one write; whether it reached a live peer."""
+        with self._send_lock:
+            try:
+                sock = self._connect_locked(timeout)
+            except ConnectionError:
+                return False
+            if self._write_locked(sock, msgs):
+                return True
+        self._drop(sock)
+        return False
+
+    # --------------------------------------------------------
+    # Listeners
+    # --------------------------------------------------------
+
+    def add_listener(self, fn: Listener) -> None:
+        """Receive every message that is not a reply (events), on the reader thread."""
+        self._listeners.append(fn)
+
+    def remove_listener(self, fn: Listener) -> None:
+        try:
+            self._listeners.remove(fn)
+        except ValueError:
+            pass
@@ -1,10 +1,17 @@
 from __future__ import annotations
 
+import bisect
+import fcntl
 import json
+import os
 import re
+import threading
 import time
+from contextlib import contextmanager
 from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Iterator
 
+from sqlch.core import fuzzy
 from sqlch.core.paths import data_dir
 
 APP_NAME = "sqlch"
@@ -15,6 +22,432 @@ def _library_path() -> Path:
     return data_dir() / "library.json"
 
 
+def _plays_path() -> Path:
+    return _library_path().with_name("plays.log")
+
+
+def _db_path() -> Path:
+    from sqlch.core import library_db
+    return library_db.db_path()
+
+
+# ------------------------------------------------------------
+# Storage backends
+# ------------------------------------------------------------
+#
+# "library_backend" in sqlch.json picks where stations live: "json" (the
+# default, library.json rewritten whole on every change) or "sqlite"
+# (library.db, see sqlch.core.library_db; one row per station). Either way
+# the store reports a change key that moves when another process writes,
+# and each mutation is handed to it as a whole new library plus the one
+# change, so a row store writes only that row.
+
+class _JsonStore:
+    """library.json plus plays.log; the change key is both files' identity.
+
+    Plays are not written into library.json: each is one JSON line
+    appended to plays.log (O_APPEND, no rewrite, no fsync) and folded into
+    play_count / last_played when the library is read. Every log opens
+    with a header line naming it ({"log": <random id>}; inode numbers are
+    reused once a log is swapped out), and library.json's "plays_log"
+    marker ({"log", "size"}) says how much of which log its counters
+    already include, so a fold never counts a play twice. Once
+    the log passes _COMPACT_BYTES it is compacted: folded into
+    library.json, then swapped for a new, empty log, under an exclusive
+    flock that appenders share. Full saves take the same exclusive lock,
+    so they never interleave with a compaction.
+    """
+
+    @property
+    def path(self) -> Path:
+        return _library_path()
+
+    def key(self) -> tuple:
+        return (_file_key(self.path), _file_key(_plays_path()))
+
+    def read(self, key: tuple) -> tuple[dict, tuple]:
+        # The caller stat'ed before this read: a racing write only re-reads.
+        created = key[0] is None
+        if created:
+            lib = _default_library()
+            _atomic_write(self.path, lib)
+            key = self.key()
+        # Parse and fold under the lock: counters from before a compaction
+        # must not be folded with the log that compaction started.
+        with _plays_locked(exclusive=False):
+            if not created:
+                lib = self._parse()
+            if _new_log(replace=False):  # so the first play matches the marker
+                key = (key[0], _file_key(_plays_path()))  # stat before the fold
+            _fold_plays(lib)
+        return lib, key
+
+    def _parse(self) -> dict:
+        try:
+            return json.loads(self.path.read_text())
+        except Exception:
+            return _default_library()
+
+    def save(self, lib: dict, *_change) -> tuple:
+        with _plays_locked(exclusive=True):
+            _atomic_write(self.path, self._with_compacted_plays(lib))
+        return self.key()
+
+    def _with_compacted_plays(self, lib: dict) -> dict:
+        """lib, with the on-disk play counters if the log was compacted since.
+
+        A compaction folds the log into library.json and starts a new one,
+        so lib's counters, marked against the old log, would drop every play
+        it folded. Those are re-read (caller holds the exclusive lock).
+        """
+        mark = lib.get("plays_log") or {}
+        try:
+            with open(_plays_path(), "rb") as f:
+                log_id, _ = _log_header(f)
+                size = os.fstat(f.fileno()).st_size
+        except FileNotFoundError:
+            return lib
+        if mark.get("log") == log_id and mark.get("size", 0) <= size:
+            return lib
+        disk = self._parse()
+        by_id: dict[str, dict] = {}
+        for st in disk.get("stations", []):
+            by_id.setdefault(st.get("id"), st)
+        stations = []
+        for st in lib.get("stations", []):
+            old = by_id.get(st.get("id"))
+            if old is not None:
+                st = {**st, "play_count": old.get("play_count") or 0,
+                      "last_played": old.get("last_played")}
+            stations.append(st)
+        out = {**lib, "stations": stations}
+        out.pop("plays_log", None)
+        if "plays_log" in disk:
+            out["plays_log"] = disk["plays_log"]
+        return out
+
+    add = add_many = replace = remove = save
+
+    def play(self, lib: dict, st: dict) -> tuple | None:
+        line = (json.dumps({"id": st["id"], "ts": st["last_played"]}) + "\n").encode()
+        with _plays_locked(exclusive=False):
+            _new_log(replace=False)
+            with open(_plays_path(), "ab+") as f:
+                log_id, _ = _log_header(f)
+                before = os.fstat(f.fileno()).st_size
+                f.write(line)
+        mark = lib.get("plays_log") or {}
+        size = before + len(line)
+        if size >= _COMPACT_BYTES:
+            self.compact()
+            return None  # re-read the compacted library
+        if (mark.get("log"), mark.get("size")) != (log_id, before):
+            return None  # someone else appended first: lib is not the log's view
+        lib["plays_log"] = {"log": log_id, "size": size}
+        return self.key()
+
+    def compact(self) -> None:
+        """Fold plays.log into library.json and start an empty log."""
+        log = _plays_path()
+        with _plays_locked(exclusive=True):
+            if not log.exists():
+                return
+            lib = self._parse()
+            _fold_plays(lib)
+            _atomic_write(self.path, lib)
+            # A crash here is harmless: the marker already covers the old log.
+            _new_log(replace=True)
+
+
+class _SqliteStore:
+    """library.db; the change key is the connection's PRAGMA data_version.
+
+    The first open of an empty database imports library.json (left in
+    place, untouched). One connection is kept for the process and is only
+    used under _lock.
+    """
+
+    def __init__(self) -> None:
+        from sqlch.core import library_db
+        self.db = library_db
+        self.conn = library_db.connect(_db_path(), check_same_thread=False)
+        if library_db.get_meta(self.conn, "imported_from") is None:
+            json_path = _library_path()
+            stations = []
+            if json_path.exists():
+                store = _JsonStore()
+                lib, _ = store.read(store.key())
+                stations = [_normalize_station(st) for st in lib.get("stations", [])]
+            library_db.import_once(self.conn, stations, str(json_path))
+
+    def key(self) -> tuple:
+        return ("sqlite", self.db.data_version(self.conn))
+
+    def read(self, key: tuple | None) -> tuple[dict, tuple | None]:
+        stations = self.db.load_stations(self.conn)
+        return {"version": LIBRARY_VERSION, "stations": stations}, key
+
+    def save(self, lib: dict) -> tuple:
+        self.db.replace_all(self.conn, lib["stations"])
+        return self.key()
+
+    def add(self, lib: dict, st: dict) -> tuple:
+        self.db.insert_station(self.conn, st)
+        return self.key()
+
+    def add_many(self, lib: dict, sts: list[dict]) -> tuple:
+        self.db.insert_stations(self.conn, sts)
+        return self.key()
+
+    def replace(self, lib: dict, st: dict) -> tuple:
+        self.db.update_station(self.conn, st)
+        return self.key()
+
+    def remove(self, lib: dict, station_id: str) -> tuple:
+        self.db.delete_station(self.conn, station_id)
+        return self.key()
+
+    def play(self, lib: dict, st: dict) -> tuple:
+        self.db.record_play(self.conn, st["id"], st["last_played"])
+        return self.key()
+
+
+_COMPACT_BYTES = 32 * 1024  # about 600 plays
+_LOG_HEADER = re.compile(rb'\{"log": "([0-9a-f]+)"\}\n')
+
+
+@contextmanager
+def _plays_locked(exclusive: bool) -> Iterator[None]:
+    fd = os.open(_plays_path().with_suffix(".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield
+    finally:
+        os.close(fd)
+
+
+def _new_log(replace: bool) -> bool:
+    """Start plays.log afresh with a new id; unless replace, only if missing.
+
+    Returns whether this call put a new log in place.
+    """
+    log = _plays_path()
+    if not replace and log.exists():
+        return False
+    header = json.dumps({"log": os.urandom(8).hex()}) + "\n"
+    tmp = log.with_name(f"plays.{os.getpid()}.tmp")
+    tmp.write_text(header)
+    try:
+        if replace:
+            tmp.replace(log)
+        else:
+            os.link(tmp, log)  # two first plays: one log wins, whole
+        return True
+    except FileExistsError:
+        return False
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def _log_header(f: BinaryIO) -> tuple[str | None, int]:
+    """plays.log's id and where its entries start (a log without header: None, 0)."""
+    f.seek(0)
+    m = _LOG_HEADER.match(f.readline())
+    return (m.group(1).decode(), m.end()) if m else (None, 0)
+
+
+def _fold_plays(lib: dict) -> None:
+    """Apply plays.log entries past lib's marker to its (raw) stations."""
+    mark = lib.get("plays_log") or {}
+    try:
+        f = open(_plays_path(), "rb")
+    except OSError:
+        return
+    with f:
+        log_id, header = _log_header(f)
+        start = mark.get("size", 0) if mark.get("log") == log_id else header
+        f.seek(start)
+        data = f.read()
+    data = data[: data.rfind(b"\n") + 1]  # a torn last line waits for its end
+    by_id: dict[str, dict] = {}
+    for st in lib.get("stations", []):
+        by_id.setdefault(st.get("id"), st)
+    for line in data.splitlines():
+        try:
+            play = json.loads(line)
+            st = by_id.get(play["id"])
+        except (ValueError, KeyError, TypeError):
+            continue
+        if st is None:
+            continue
+        st["play_count"] = (st.get("play_count") or 0) + 1
+        st["last_played"] = max(st.get("last_played") or 0, play["ts"])
+    lib["plays_log"] = {"log": log_id, "size": start + len(data)}
+
+
+_backend: _JsonStore | _SqliteStore | None = None
+
+
+def set_backend(name: str | None) -> None:
+    """Switch storage ("json" / "sqlite"); None re-reads sqlch.json next use."""
+    global _backend
+    with _lock:
+        if name not in (None, "json", "sqlite"):
+            raise ValueError(f"unknown library backend: {name}")
+        _close_backend()
+        if name is not None:
+            _backend = _SqliteStore() if name == "sqlite" else _JsonStore()
+        _invalidate_locked()
+
+
+def _close_backend() -> None:
+    global _backend
+    if isinstance(_backend, _SqliteStore):
+        _backend.conn.close()
+    _backend = None
+
+
+def _store() -> _JsonStore | _SqliteStore:
+    global _backend
+    if _backend is None:
+        from sqlch.core import config
+        name = config.load().get("library_backend", "json")
+        _backend = _SqliteStore() if name == "sqlite" else _JsonStore()
+    return _backend
+
+
+# ------------------------------------------------------------
+# Process-wide cache
+# ------------------------------------------------------------
+#
+# The parsed, normalized library is kept in memory and reused until the
+# store's change key moves, i.e. until another process (the CLI, the GUI)
+# writes; our own writes refresh the cache in place. Readers get copies:
+# the cached dicts are never handed out.
+
+class _Index:
+    """Secondary indexes over the cached station list (list positions).
+
+    by_id / by_name map an id / lower-cased name to its first position, so
+    resolving a station or zapping to its neighbour is a dict lookup.
+    played holds (last_played, -position) for every played station in
+    ascending order; its last entry is the most recent play (ties go to
+    the earlier station, like max() over the list did). fuzzy is the
+    trigram index over names, ids and tags, built on first search.
+    """
+
+    __slots__ = ("by_id", "by_name", "names", "played", "fuzzy")
+
+    def __init__(self, stations: list[dict]) -> None:
+        self.by_id: dict[str, int] = {}
+        self.by_name: dict[str, int] = {}
+        self.names: list[str] = []
+        self.played: list[tuple[int, int]] = []
+        self.fuzzy: fuzzy.TrigramIndex | None = None
+        for st in stations:
+            self.append(st)
+
+    def append(self, st: dict) -> None:
+        pos = len(self.names)
+        name = st["name"].lower()
+        self.by_id.setdefault(st["id"], pos)
+        self.by_name.setdefault(name, pos)
+        self.names.append(name)
+        if st.get("last_played"):
+            bisect.insort(self.played, (st["last_played"], -pos))
+        if self.fuzzy is not None:
+            _fuzzy_add(self.fuzzy, st)
+
+    def fuzzy_index(self, stations: list[dict]) -> fuzzy.TrigramIndex:
+        if self.fuzzy is None:
+            self.fuzzy = fuzzy.TrigramIndex()
+            for st in stations:
+                _fuzzy_add(self.fuzzy, st)
+        return self.fuzzy
+
+    def replaced(self, pos: int, old: dict, new: dict) -> None:
+        """Station at pos changed in place; only play times may move."""
+        if old.get("last_played"):
+            i = bisect.bisect_left(self.played, (old["last_played"], -pos))
+            del self.played[i]
+        if new.get("last_played"):
+            bisect.insort(self.played, (new["last_played"], -pos))
+
+
+def _fuzzy_add(index: fuzzy.TrigramIndex, st: dict) -> None:
+    index.add(st["name"], st["id"].replace("-", " "), *st.get("tags") or ())
+
+
+_lock = threading.RLock()
+_cached: dict | None = None
+_cached_key: tuple | None = None
+_index = _Index([])
+
+
+def _file_key(path: Path) -> tuple[int, int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _copy_station(st: dict) -> dict:
+    return {k: v.copy() if isinstance(v, (dict, list)) else v for k, v in st.items()}
+
+
+def _library() -> dict:
+    """The cached library (shared; callers hold _lock and must not leak it)."""
+    global _cached, _cached_key, _index
+    store = _store()
+    key = store.key()
+    if _cached is not None and key == _cached_key:
+        return _cached
+    lib, key = store.read(key)
+    lib.setdefault("version", LIBRARY_VERSION)
+    lib.setdefault("stations", [])
+    lib["stations"] = [_normalize_station(st) for st in lib["stations"]]
+    _cached, _cached_key = lib, key
+    _index = _Index(lib["stations"])
+    return lib
+
+
+def _commit(
+    lib: dict,
+    write: Callable[[_JsonStore | _SqliteStore], tuple | None],
+    update: Callable[[_Index], None] | None = None,
+) -> None:
+    """Persist a change and make lib (already normalized) the cached copy.
+
+    write applies the change to the store and returns its new key; update
+    brings the index in step with an append or in-place change, without
+    it the index is rebuilt (removals shift positions).
+    """
+    global _cached, _cached_key, _index
+    store = _store()
+    raced = store.key() != _cached_key  # another process wrote since our read
+    key = write(store)
+    if raced or key is None:  # None: the store wants a fresh read
+        _invalidate_locked()
+        return
+    _cached, _cached_key = lib, key
+    if update is None:
+        _index = _Index(lib["stations"])
+    else:
+        update(_index)
+
+
+def invalidate() -> None:
+    """Drop the cached library; the next read re-reads the store."""
+    with _lock:
+        _invalidate_locked()
+
+
+def _invalidate_locked() -> None:
+    global _cached, _cached_key
+    _cached = _cached_key = None
+
+
 # ------------------------------------------------------------
 # Helpers
 # ------------------------------------------------------------
@@ -66,28 +499,33 @@ def _normalize_station(st: dict) -> dict:
     return st
 
 
+def _neighbour(current_id: str, step: int) -> dict | None:
+    with _lock:
+        stations = _library()["stations"]
+        if not stations:
+            return None
+        pos = _index.by_id.get(current_id)
+        if pos is None:
+            st = stations[0] if step > 0 else stations[-1]
+        else:
+            st = stations[(pos + step) % len(stations)]
+        return _copy_station(st)
+
+
 def next_station(current_id: str) -> dict | None:
-    stations = list_stations()
-    ids = [s["id"] for s in stations]
-    if current_id not in ids:
-        return stations[0] if stations else None
-    idx = (ids.index(current_id) + 1) % len(stations)
-    return stations[idx]
+    return _neighbour(current_id, 1)
 
 
 def prev_station(current_id: str) -> dict | None:
-    stations = list_stations()
-    ids = [s["id"] for s in stations]
-    if current_id not in ids:
-        return stations[-1] if stations else None
-    idx = (ids.index(current_id) - 1) % len(stations)
-    return stations[idx]
+    return _neighbour(current_id, -1)
 
 
 def last_played_station() -> dict | None:
-    stations = list_stations()
-    played = [s for s in stations if s.get("last_played")]
-    return max(played, key=lambda s: s["last_played"]) if played else None
+    with _lock:
+        stations = _library()["stations"]
+        if not _index.played:
+            return None
+        return _copy_station(stations[-_index.played[-1][1]])
 
 
 # ------------------------------------------------------------
@@ -95,52 +533,54 @@ def last_played_station() -> dict | None:
 # ------------------------------------------------------------
 
 def load() -> dict:
-    path = _library_path()
-
-    if not path.exists():
-        lib = _default_library()
-        _atomic_write(path, lib)
-        return lib
-
-    try:
-        lib = json.loads(path.read_text())
-    except Exception:
-        lib = _default_library()
-
-    lib.setdefault("version", LIBRARY_VERSION)
-    lib.setdefault("stations", [])
-    lib["stations"] = [_normalize_station(st) for st in lib["stations"]]
-
-    return lib
+    """The whole library, as a copy the caller may modify and save()."""
+    with _lock:
+        lib = _library()
+        return {**lib, "stations": [_copy_station(st) for st in lib["stations"]]}
 
 
 def save(lib: dict):
-    _atomic_write(_library_path(), lib)
+    with _lock:
+        lib = dict(lib)
+        lib["stations"] = [_normalize_station(st) for st in lib.get("stations", [])]
+        _commit(lib, lambda store: store.save(lib))
 
 
 def list_stations(category: str | None = None) -> list[dict]:
-    lib = load()
-    stations = lib["stations"]
-    if category:
-        stations = [st for st in stations if st.get("category") == category]
-    return stations
+    with _lock:
+        stations = _library()["stations"]
+        return [_copy_station(st) for st in stations
+                if not category or st.get("category") == category]
 
 
 def find_station(query: str) -> dict | None:
     q = query.lower()
-    lib = load()
+    with _lock:
+        stations = _library()["stations"]
 
-    for st in lib["stations"]:
-        if st["id"] == q or st["name"].lower() == q:
-            return st
+        exact = [p for p in (_index.by_id.get(q), _index.by_name.get(q)) if p is not None]
+        if exact:
+            return _copy_station(stations[min(exact)])
 
-    for st in lib["stations"]:
-        if q in st["name"].lower():
-            return st
+        for pos, name in enumerate(_index.names):
+            if q in name:
+                return _copy_station(stations[pos])
 
     return None
 
 
+def search_stations(query: str, limit: int = 10, min_score: float = 0.3) -> list[tuple[float, dict]]:
+    """Fuzzy-match query against names, ids and tags: (score, station), best first.
+
+    Tolerates typos and extra or missing words (see sqlch.core.fuzzy);
+    score is the share of the query's trigrams a station contains.
+    """
+    with _lock:
+        stations = _library()["stations"]
+        hits = _index.fuzzy_index(stations).search(query, limit, min_score)
+        return [(score, _copy_station(stations[pos])) for score, pos in hits]
+
+
 def add_station(
     *,
     name: str,
@@ -151,72 +591,140 @@ def add_station(
     source: dict | None = None,
     allow_existing: bool = False,
 ) -> dict:
-    lib = load()
     station_id = _normalize_id(name)
-
-    existing = next((s for s in lib["stations"] if s["id"] == station_id), None)
-    if existing:
-        if allow_existing:
-            return existing
-        raise ValueError(
-            f"Station ID collision: '{station_id}'. Rename the station or edit the existing one."
+    with _lock:
+        lib = _library()
+
+        pos = _index.by_id.get(station_id)
+        if pos is not None:
+            if allow_existing:
+                return _copy_station(lib["stations"][pos])
+            raise ValueError(
+                f"Station ID collision: '{station_id}'. Rename the station or edit the existing one."
+            )
+
+        st = _normalize_station(
+            {
+                "id": station_id,
+                "name": name,
+                "url": url,
+                "category": category,
+                "tags": tags or [],
+                "stream": stream or {},
+                "source": source or {"type": "manual", "origin": "user"},
+                "added_at": _now(),
+            }
         )
 
-    st = _normalize_station(
-        {
-            "id": station_id,
-            "name": name,
-            "url": url,
-            "category": category,
-            "tags": tags or [],
-            "stream": stream or {},
-            "source": source or {"type": "manual", "origin": "user"},
-            "added_at": _now(),
-        }
-    )
+        lib = {**lib, "stations": [*lib["stations"], st]}
+        _commit(lib, lambda store: store.add(lib, st), lambda index: index.append(st))
+        return _copy_station(st)
 
-    lib["stations"].append(st)
-    save(lib)
-    return st
 
+def _url_key(url: str | None) -> str | None:
+    return url.strip().rstrip("/").lower() if url else None
 
-def update_station(station_id: str, updates: dict) -> dict:
-    lib = load()
 
-    for i, st in enumerate(lib["stations"]):
-        if st["id"] == station_id:
-            updates = dict(updates)
-            updates.pop("id", None)
-            st.update(updates)
-            lib["stations"][i] = _normalize_station(st)
-            save(lib)
-            return lib["stations"][i]
+def _rb_uuid(st: dict) -> str | None:
+    """A station's RadioBrowser uuid; discovered stations keep it in source."""
+    source = st.get("source") or {}
+    if st.get("rb_uuid"):
+        return st["rb_uuid"]
+    if source.get("type") == "radiobrowser":
+        return source.get("origin")
+    return None
+
+
+def import_stations(stations: Iterable[dict]) -> tuple[int, int]:
+    """Add many stations in one pass and one write; returns (added, skipped).
+
+    stations are partial station dicts (see sqlch.core.stationio). One is
+    skipped when it has no URL, or when its rb_uuid (see _rb_uuid), URL
+    (case and trailing slash aside) or normalized id is already in the
+    library or earlier in the batch. Stations keep an id, added_at, play history
+    and any other fields they carry.
+    """
+    with _lock:
+        lib = _library()
+        seen_uuid = {uuid for st in lib["stations"] if (uuid := _rb_uuid(st))}
+        seen_url = {_url_key(st.get("url")) for st in lib["stations"]}
+        seen_id = set(_index.by_id)
+        added: list[dict] = []
+        skipped = 0
+        for raw in stations:
+            if not raw.get("url"):
+                skipped += 1
+                continue
+            st = _normalize_station({
+                **raw,
+                "id": raw.get("id") or _normalize_id(raw.get("name") or "unknown"),
+                "tags": list(raw.get("tags") or ()),
+            })
+            url = _url_key(st["url"])
+            if st["id"] in seen_id or url in seen_url or (st["rb_uuid"] and st["rb_uuid"] in seen_uuid):
+                skipped += 1
+                continue
+            seen_id.add(st["id"])
+            seen_url.add(url)
+            if st["rb_uuid"]:
+                seen_uuid.add(st["rb_uuid"])
+            added.append(st)
+
+        if added:
+            lib = {**lib, "stations": [*lib["stations"], *added]}
+
+            def append_all(index: _Index) -> None:
+                for st in added:
+                    index.append(st)
+
+            _commit(lib, lambda store: store.add_many(lib, added), append_all)
+        return len(added), skipped
+
 
-    raise KeyError(f"Station '{station_id}' not found")
+def update_station(station_id: str, updates: dict) -> dict:
+    with _lock:
+        lib = _library()
+        i = _index.by_id.get(station_id)
+        if i is None:
+            raise KeyError(f"Station '{station_id}' not found")
+
+        updates = dict(updates)
+        updates.pop("id", None)
+        stations = list(lib["stations"])
+        stations[i] = _normalize_station({**stations[i], **updates})
+        lib = {**lib, "stations": stations}
+        # A rename moves by_name entries: rebuild rather than patch.
+        _commit(lib, lambda store: store.replace(lib, stations[i]))
+        return _copy_station(stations[i])
 
 
 def remove_station(station_id: str) -> bool:
-    lib = load()
-    before = len(lib["stations"])
-    lib["stations"] = [st for st in lib["stations"] if st["id"] != station_id]
+    with _lock:
+        lib = _library()
+        stations = [st for st in lib["stations"] if st["id"] != station_id]
 
-    if len(lib["stations"]) == before:
-        return False
+        if len(stations) == len(lib["stations"]):
+            return False
 
-    save(lib)
-    return True
+        lib = {**lib, "stations": stations}
+        _commit(lib, lambda store: store.remove(lib, station_id))
+        return True
 
 
 def record_play(station_id: str):
-    lib = load()
-
-    for st in lib["stations"]:
-        if st["id"] == station_id:
-            st["last_played"] = _now()
-            st["play_count"] += 1
-            save(lib)
+    with _lock:
+        lib = _library()
+        i = _index.by_id.get(station_id)
+        if i is None:
             return
 
+        stations = list(lib["stations"])
+        old = stations[i]
+        stations[i] = {**old, "last_played": _now(), "play_count": old["play_count"] + 1}
+        lib = {**lib, "stations": stations}
+        _commit(lib, lambda store: store.play(lib, stations[i]),
+                lambda index: index.replaced(i, old, stations[i]))
+
 
 def add_discovered_station(st: dict) -> dict:
     """Add a station dict returned by RadioBrowser discovery to the library."""
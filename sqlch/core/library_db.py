@@ -0,0 +1,149 @@
+"""SQLite storage for the station library (opt-in, see sqlch.core.library).
+
+Same rules as curation_db: connect() is a plain factory and every function
+takes an explicit conn, so the caller owns the connection and its thread.
+Connections use WAL, so the daemon, CLI and GUI can read while one of them
+writes.
+
+Each station is one row: the station dict as JSON plus play_count and
+last_played as real columns, so a play is a single-row UPDATE. Rows keep
+insertion order through seq, which is the library's list order.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Iterable
+
+from sqlch.core.paths import data_dir
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stations (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    id TEXT NOT NULL UNIQUE,
+    data TEXT NOT NULL,
+    last_played INTEGER,
+    play_count INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_COUNTERS = ("last_played", "play_count")
+
+
+def db_path() -> Path:
+    return data_dir() / "library.db"
+
+
+def connect(path: Path | None = None, *, check_same_thread: bool = True) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path or db_path()), timeout=5.0,
+                           check_same_thread=check_same_thread)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def data_version(conn: sqlite3.Connection) -> int:
+    """Changes whenever another connection commits (never for conn's own)."""
+    return conn.execute("PRAGMA data_version").fetchone()[0]
+
+
+def get_meta(conn: sqlite3.Connection, key: str) -> str | None:
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row["value"] if row else None
+
+
+def _row_values(st: dict[str, Any]) -> tuple[str, str, int | None, int]:
+    data = {k: v for k, v in st.items() if k not in _COUNTERS}
+    return (st["id"], json.dumps(data, sort_keys=True, separators=(",", ":")),
+            st.get("last_played"), st.get("play_count") or 0)
+
+
+def _insert(conn: sqlite3.Connection, stations: Iterable[dict[str, Any]]) -> None:
+    # OR IGNORE: a duplicate id keeps its first row, as id lookups always did.
+    conn.executemany(
+        "INSERT OR IGNORE INTO stations (id, data, last_played, play_count) "
+        "VALUES (?, ?, ?, ?)",
+        (_row_values(st) for st in stations),
+    )
+
+
+def load_stations(conn: sqlite3.Connection) -> list[dict[str, Any]]:
+    rows = conn.execute(
+        "SELECT data, last_played, play_count FROM stations ORDER BY seq"
+    ).fetchall()
+    out = []
+    for r in rows:
+        st = json.loads(r["data"])
+        st["last_played"] = r["last_played"]
+        st["play_count"] = r["play_count"]
+        out.append(st)
+    return out
+
+
+def insert_station(conn: sqlite3.Connection, st: dict[str, Any]) -> None:
+    _insert(conn, [st])
+    conn.commit()
+
+
+def insert_stations(conn: sqlite3.Connection, stations: list[dict[str, Any]]) -> None:
+    with conn:
+        _insert(conn, stations)
+
+
+def update_station(conn: sqlite3.Connection, st: dict[str, Any]) -> None:
+    sid, data, last_played, play_count = _row_values(st)
+    conn.execute(
+        "UPDATE stations SET data = ?, last_played = ?, play_count = ? WHERE id = ?",
+        (data, last_played, play_count, sid),
+    )
+    conn.commit()
+
+
+def delete_station(conn: sqlite3.Connection, station_id: str) -> None:
+    conn.execute("DELETE FROM stations WHERE id = ?", (station_id,))
+    conn.commit()
+
+
+def record_play(conn: sqlite3.Connection, station_id: str, when: int) -> None:
+    conn.execute(
+        "UPDATE stations SET last_played = ?, play_count = play_count + 1 WHERE id = ?",
+        (when, station_id),
+    )
+    conn.commit()
+
+
+def replace_all(conn: sqlite3.Connection, stations: list[dict[str, Any]]) -> None:
+    with conn:
+        conn.execute("DELETE FROM stations")
+        _insert(conn, stations)
+
+
+def import_once(
+    conn: sqlite3.Connection, stations: list[dict[str, Any]], source: str
+) -> bool:
+    """Seed an empty database from another store, exactly once.
+
+    Runs in an IMMEDIATE transaction, so when several processes start on a
+    fresh database only the first imports; returns whether this call did.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if get_meta(conn, "imported_from") is not None:
+            conn.rollback()
+            return False
+        _insert(conn, stations)
+        conn.execute("INSERT INTO meta (key, value) VALUES ('imported_from', ?)", (source,))
+        conn.commit()
+        return True
+    except BaseException:
+        conn.rollback()
+        raise
@@ -0,0 +1,140 @@
+"""Persistent, multiplexed JSON-IPC connection to one mpv instance.
+
+mpv echoes the ``request_id`` of every command in its reply, so a single
+socket can carry any number of in-flight commands from any number of
+threads (the multiplexing itself lives in sqlch.core.jsonline, shared with
+the daemon client).
+
+A dropped connection — mpv quit, crashed, or was respawned on the same
+socket path — fails the requests still in flight on it and is re-established
+lazily by the next request, so callers never manage the socket themselves.
+Property observations registered through ``observe`` are replayed on every
+reconnect, and listeners are told about the drop with a synthetic
+``{"event": "ipc-disconnected"}`` message.
+"""
+
+from __future__ import annotations
+
+import itertools
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+from sqlch.core import stats
+from sqlch.core.jsonline import JsonLineConnection
+
+DISCONNECTED = "ipc-disconnected"
+
+
+class MpvConnection(JsonLineConnection):
+    """One long-lived IPC connection, shared by every caller in the process."""
+
+    id_field = "request_id"
+    thread_name = "mpv-ipc"
+
+    def __init__(self, path: Path) -> None:
+        super().__init__()
+        self.path = path
+        self._observed: dict[str, int] = {}
+        self._observe_ids = itertools.count(1)
+
+    def _socket_path(self) -> Path:
+        return self.path
+
+    def _connected_locked(self, sock: socket.socket) -> None:
+        self._write_locked(
+            sock, [{"command": ["observe_property", oid, name]}
+                   for name, oid in self._observed.items()]
+        )
+
+    def _disconnected(self) -> None:
+        self._notify({"event": DISCONNECTED})
+
+    # --------------------------------------------------------
+    # Requests + events
+    # --------------------------------------------------------
+
+    def request(self, command: list[Any], timeout: float = 0.5) -> dict[str, Any] | None:
+        """Send one command and wait for its reply (None on timeout/disconnect)."""
+        return self.request_many([command], timeout)[0]
+
+    def request_many(
+        self, commands: list[list[Any]], timeout: float = 0.5
+    ) -> list[dict[str, Any] | None]:
+        """Pipeline several commands in one write; replies in command order.
+
+        All commands go out in a single sendall and share one deadline, so N
+        queries cost one round trip instead of N.
+        """
+        if not commands:
+            return []
+        t0 = time.perf_counter()
+        try:
+            pendings = self._submit([{"command": c} for c in commands], timeout)
+        except ConnectionError:
+            stats.incr("mpv_ipc.unavailable")
+            return [None] * len(commands)
+        if self._collect(pendings, timeout):
+            stats.observe("mpv_ipc.round_trip", (time.perf_counter() - t0) * 1000)
+        else:
+            stats.incr("mpv_ipc.timeouts")
+        if len(commands) > 1:
+            stats.incr("mpv_ipc.pipelined", len(commands))
+        return [p.reply for p in pendings]
+
+    def send_many(self, commands: list[list[Any]], timeout: float = 0.5) -> bool:
+        """Write several commands in one sendall without waiting for replies.
+
+        For setters whose outcome nobody checks; the replies are discarded by
+        the reader. Returns whether the write reached a live mpv.
+        """
+        if not commands:
+            return True
+        return self._send([{"command": c} for c in commands], timeout)
+
+    def observe(self, name: str) -> bool:
+        """Subscribe to property-change events for name, kept across reconnects.
+
+        mpv answers an observation with the property's current value, so
+        listeners get an initial event without a separate get_property;
+        observing a name already observed on the live socket re-subscribes to
+        replay it. Returns whether the subscription reached a live mpv right now.
+        """
+        with self._send_lock:
+            fresh = self._sock is None
+            try:
+                sock = self._connect_locked(0.5)  # replays earlier observations
+            except ConnectionError:
+                sock = None
+            oid = self._observed.get(name)
+            if oid is None:
+                oid = self._observed[name] = next(self._observe_ids)
+            elif sock is None:
+                return False
+            elif fresh:
+                return True  # the connect just replayed it
+            else:
+                self._write_locked(sock, [{"command": ["unobserve_property", oid]}])
+            if sock is None:
+                return False
+            return self._write_locked(sock, [{"command": ["observe_property", oid, name]}])
+
+
+# ------------------------------------------------------------
+# Per-socket registry
+# ------------------------------------------------------------
+
+_connections: dict[str, MpvConnection] = {}
+_registry_lock = threading.Lock()
+
+
+def connection(path: Path) -> MpvConnection:
+    """Return the process-wide connection for the mpv listening on path."""
+    key = str(path)
+    with _registry_lock:
+        conn = _connections.get(key)
+        if conn is None:
+            conn = _connections[key] = MpvConnection(path)
+        return conn
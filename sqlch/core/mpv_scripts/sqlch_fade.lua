@@ -0,0 +1,40 @@
+-- sqlch volume ramps, run inside mpv so a fade costs one IPC message.
+--
+--   script-message-to sqlch_fade fade <target> <seconds>
+--
+-- A new fade supersedes the one in flight: it starts from wherever the
+-- volume currently is, so overlapping fades never fight each other.
+
+local TICK = 0.02
+local timer = nil
+
+local function cancel()
+    if timer then
+        timer:kill()
+        timer = nil
+    end
+end
+
+mp.register_script_message("fade", function(target, seconds)
+    target = tonumber(target)
+    seconds = tonumber(seconds) or 0
+    if not target then
+        return
+    end
+    cancel()
+    local from = mp.get_property_number("volume", target)
+    if seconds <= 0 then
+        mp.set_property_number("volume", target)
+        return
+    end
+    local t0 = mp.get_time()
+    timer = mp.add_periodic_timer(TICK, function()
+        local k = math.min(1, (mp.get_time() - t0) / seconds)
+        mp.set_property_number("volume", from + (target - from) * k)
+        if k >= 1 then
+            cancel()
+        end
+    end)
+end)
+
+mp.register_script_message("cancel", cancel)
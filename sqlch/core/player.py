@@ -1,16 +1,18 @@
 from __future__ import annotations
 
 import html
-import json
 import os
-import socket
+import queue
 import subprocess
 import threading
 import time
+from collections import deque
+from importlib import resources
 from pathlib import Path
 from typing import Any
 
-from sqlch.core import enrich, library, notify
+from sqlch.core import enrich, events, library, notify, trace
+from sqlch.core.mpv_ipc import DISCONNECTED, MpvConnection, connection
 from sqlch.core.paths import runtime_dir
 
 
@@ -22,6 +24,10 @@ def mpv_socket() -> Path:
     return runtime_dir() / "mpv.sock"
 
 
+def preview_socket() -> Path:
+    return runtime_dir() / "preview.sock"
+
+
 def mpv_bin() -> str:
     return os.environ.get("MPV_BIN", "mpv")
 
@@ -42,34 +48,39 @@ def _need_env(name: str, value: str | None) -> str:
 
 _current: dict[str, Any] | None = None
 _preview_timer: threading.Timer | None = None
+_preview_gen = 0  # bumped per preview; a timer only ends its own
+_preview_lock = threading.Lock()  # preview start/end vs. the timer thread
+_preduck_volume: float | None = None  # main volume to restore after a preview
 _metadata_thread: threading.Thread | None = None
 _metadata_stop = threading.Event()
+_metadata_events: queue.Queue | None = None
+
+# Properties the watcher subscribes to; their latest values land in _playback.
+_WATCHED_PROPS = ("metadata", "pause", "idle-active", "cache-buffering-state")
+_playback: dict[str, Any] = {}
+
+# Daemon mode keeps one idle mpv alive and switches stations with loadfile.
+_reuse_mpv = False
+
+# Switch-to-first-audio timing: the in-flight switch, and recent samples.
+_switch: dict[str, Any] | None = None
+_switch_log: deque[dict[str, Any]] = deque(maxlen=32)
+_event_conn: MpvConnection | None = None
 
 
 # ------------------------------------------------------------
 # MPV IPC helpers
 # ------------------------------------------------------------
 
+def _conn() -> MpvConnection:
+    return connection(mpv_socket())
+
+
 def _mpv_ipc(cmd: dict[str, Any], timeout: float = 0.5) -> dict[str, Any] | None:
-    sock = mpv_socket()
-    if not sock.exists():
-        return None
     try:
-        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
-            s.settimeout(timeout)
-            s.connect(str(sock))
-            s.sendall((json.dumps(cmd) + "\n").encode())
-            buf = b""
-            while not buf.endswith(b"\n"):
-                chunk = s.recv(4096)
-                if not chunk:
-                    break
-                buf += chunk
-        if buf.strip():
-            return json.loads(buf.decode())
+        return _conn().request(cmd["command"], timeout=timeout)
     except Exception:
         return None
-    return None
 
 
 def mpv_get(prop: str) -> Any:
@@ -79,6 +90,21 @@ def mpv_get(prop: str) -> Any:
     return None
 
 
+def mpv_snapshot(props: list[str]) -> dict[str, Any]:
+    """Fetch several properties in one pipelined round trip.
+
+    Missing or unavailable properties map to None, like mpv_get.
+    """
+    try:
+        replies = _conn().request_many([["get_property", p] for p in props])
+    except Exception:
+        replies = [None] * len(props)
+    return {
+        p: r.get("data") if r and r.get("error") == "success" else None
+        for p, r in zip(props, replies)
+    }
+
+
 def mpv_command(*parts: Any) -> None:
     _mpv_ipc({"command": list(parts)})
 
@@ -89,11 +115,18 @@ def mpv_set_userdata(key: str, value: Any) -> None:
     mpv_command("set_property_string", f"user-data/{key}", str(value))
 
 
-def _wait_for_ipc(timeout: float = 2.0) -> bool:
+def _mpv_alive() -> bool:
+    return mpv_socket().exists() and mpv_get("pid") is not None
+
+
+@trace.traced
+def _wait_for_ipc(timeout: float = 2.0, sock: Path | None = None) -> bool:
+    sock = sock or mpv_socket()
+    conn = connection(sock)
     start = time.time()
     while time.time() - start < timeout:
-        if mpv_socket().exists():
-            if _mpv_ipc({"command": ["get_property", "pid"]}):
+        if sock.exists():
+            if conn.request(["get_property", "pid"]):
                 return True
         time.sleep(0.05)
     return False
@@ -103,18 +136,69 @@ def _wait_for_ipc(timeout: float = 2.0) -> bool:
 # Volume fade
 # ------------------------------------------------------------
 
-def _fade_volume(target: int, steps: int = 20, duration: float = 1.0) -> None:
-    """Gradually fade the main mpv volume to target over duration seconds."""
-    current_vol = mpv_get("volume")
-    if current_vol is None:
+_FADE_SCRIPT = "sqlch_fade"
+_FADE_TICK = 0.05
+
+
+def fade_script() -> Path:
+    return Path(str(resources.files("sqlch.core") / "mpv_scripts" / f"{_FADE_SCRIPT}.lua"))
+
+
+class _FadeTimeline:
+    """Fallback ramp for an mpv without the fade script loaded.
+
+    One generation counter makes every ramp cancellable: starting a new fade
+    bumps it, and the superseded ramp notices on its next tick and exits.
+    """
+
+    def __init__(self) -> None:
+        self._gen = 0
+        self._lock = threading.Lock()
+
+    def start(self, target: float, duration: float) -> None:
+        gen = self.cancel()
+        threading.Thread(
+            target=self._run, args=(gen, target, duration), daemon=True,
+            name="volume-fade",
+        ).start()
+
+    def cancel(self) -> int:
+        with self._lock:
+            self._gen += 1
+            return self._gen
+
+    def _run(self, gen: int, target: float, duration: float) -> None:
+        start = mpv_get("volume")
+        if start is None:
+            return
+        start = float(start)
+        t0 = time.monotonic()
+        while self._gen == gen:
+            k = min(1.0, (time.monotonic() - t0) / duration) if duration > 0 else 1.0
+            mpv_command("set_property", "volume", round(start + (target - start) * k, 1))
+            if k >= 1.0:
+                return
+            time.sleep(_FADE_TICK)
+
+
+_timeline = _FadeTimeline()
+
+
+def fade_volume(target: float, duration: float = 1.0) -> None:
+    """Ramp the main mpv volume to target over duration seconds, without blocking.
+
+    The ramp runs inside mpv (one script-message); a new fade supersedes one
+    still in flight. Falls back to a cancellable timeline in this process if
+    the mpv was started without the fade script.
+    """
+    target = max(0.0, min(100.0, float(target)))
+    _timeline.cancel()
+    resp = _mpv_ipc({"command": [
+        "script-message-to", _FADE_SCRIPT, "fade", str(target), str(duration),
+    ]})
+    if resp and resp.get("error") == "success":
         return
-    current_vol = float(current_vol)
-    step_size = (target - current_vol) / steps
-    delay = duration / steps
-    for _ in range(steps):
-        current_vol += step_size
-        mpv_command("set_property", "volume", max(0, min(100, int(current_vol))))
-        time.sleep(delay)
+    _timeline.start(target, duration)
 
 
 # ------------------------------------------------------------
@@ -140,56 +224,237 @@ def _parse_icy(title: str) -> tuple[str | None, str | None]:
     return artist.strip() or None, track.strip() or None
 
 
-def _apply_enrichment_now(artist: str | None, track: str, station_name: str) -> None:
-    meta = enrich.enrich_track(artist or "", track)
-    album = meta.get("album") or station_name
-    year = meta.get("year")
-    genres = meta.get("genres")
-
-    mpv_set_metadata("title", track)
+def _track_fields(
+    artist: str | None,
+    track: str,
+    station_name: str,
+    meta: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """The metadata/user-data fields published for one track."""
+    meta = meta or {}
+    fields: dict[str, Any] = {"title": track}
     if artist:
-        mpv_set_metadata("artist", artist)
-    mpv_set_metadata("album", album)
-    if year:
-        mpv_set_metadata("date", year)
-    if genres:
-        mpv_set_metadata("genre", ", ".join(genres))
-
-    mpv_set_userdata("title", track)
-    if artist:
-        mpv_set_userdata("artist", artist)
-    mpv_set_userdata("album", album)
-    if year:
-        mpv_set_userdata("date", year)
-    if genres:
-        mpv_set_userdata("genre", ", ".join(genres))
+        fields["artist"] = artist
+    fields["album"] = meta.get("album") or station_name
+    if meta.get("year"):
+        fields["date"] = meta["year"]
+    if meta.get("genres"):
+        fields["genre"] = ", ".join(meta["genres"])
+    return fields
+
+
+class _MetadataPublisher:
+    """Mirror track fields into mpv's metadata/ and user-data/, diffed.
+
+    Remembers what was last published and sends only the keys whose value
+    changed, all in one pipelined write, so a station cycling titles every
+    few seconds costs one small write per change rather than ten commands.
+    Keys that disappear (no year for the new track) are blanked instead of
+    left over from the previous one. reset() forgets the mirror when the
+    player moves to another station or mpv instance.
+    """
+
+    PREFIXES = ("metadata", "user-data")
+
+    def __init__(self) -> None:
+        self._last: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._last.clear()
+
+    def publish(self, fields: dict[str, Any]) -> None:
+        new = {k: str(v) for k, v in fields.items() if v is not None}
+        with self._lock:
+            changed = {k: v for k, v in new.items() if self._last.get(k) != v}
+            changed.update({k: "" for k in self._last if k not in new})
+            if not changed:
+                return
+            commands = [
+                ["set_property_string", f"{prefix}/{key}", value]
+                for prefix in self.PREFIXES
+                for key, value in changed.items()
+            ]
+            if _conn().send_many(commands):
+                self._last = new
+            else:
+                self._last.clear()  # mpv gone: republish everything next time
+
+
+_publisher = _MetadataPublisher()
+
+
+def _publish_fields(fields: dict[str, Any]) -> None:
+    try:
+        _publisher.publish(fields)
+    except Exception:
+        _publisher.reset()
+
+
+class _EnrichmentQueue:
+    """Second phase of a track change: enrich off the watcher thread.
+
+    Every submit bumps a generation; a job whose generation is no longer
+    current (the title moved on, or the station changed) is dropped before
+    the lookup and again before its result is published. One worker keeps
+    the enrich/spoti JSON caches single-writer.
+    """
+
+    def __init__(self) -> None:
+        self._jobs: queue.Queue = queue.Queue()
+        self._gen = 0
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+
+    def invalidate(self) -> int:
+        with self._lock:
+            self._gen += 1
+            return self._gen
+
+    def is_current(self, gen: int) -> bool:
+        return gen == self._gen
+
+    def submit(self, artist: str | None, track: str, station_name: str) -> None:
+        gen = self.invalidate()
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, daemon=True, name="enrichment"
+                )
+                self._worker.start()
+        self._jobs.put((gen, artist, track, station_name))
+
+    def _run(self) -> None:
+        while True:
+            gen, artist, track, station_name = self._jobs.get()
+            if not self.is_current(gen):
+                continue
+            try:
+                meta = enrich.enrich_track(artist or "", track)
+            except Exception:
+                continue
+            if self.is_current(gen):
+                fields = _track_fields(artist, track, station_name, meta)
+                _publish_fields(fields)
+                events.publish("enrichment", station=station_name, fields=fields)
+
+
+_enrichment = _EnrichmentQueue()
+
+
+@trace.traced
+def _on_track_change(icy: str, station_name: str) -> None:
+    """First phase: publish the raw ICY fields now, queue enrichment."""
+    artist, track = _parse_icy(icy)
+    if not track:
+        return
+    try:
+        _publish_fields(_track_fields(artist, track, station_name))
+    except Exception:
+        pass
+    events.publish("track", station=station_name, artist=artist, title=track)
+    try:
+        from sqlch.core import recorder
+        recorder.on_track_change(artist, track)
+    except Exception:
+        pass
+    _enrichment.submit(artist, track, station_name)
 
 
-def _watch_metadata(station_name: str) -> None:
-    _metadata_stop.clear()
+def _watch_metadata(station_name: str, inbox: queue.Queue) -> None:
+    """React to mpv property-change events until stopped or disconnected.
+
+    Blocks on the event queue instead of polling, so a title change is seen
+    as soon as mpv reports it and an idle daemon does not wake up at all.
+    """
+    conn = _conn()
+
+    def _on_event(msg: dict[str, Any]) -> None:
+        if msg.get("event") in ("property-change", DISCONNECTED):
+            inbox.put(msg)
+
+    conn.add_listener(_on_event)
+    for name in _WATCHED_PROPS:
+        conn.observe(name)
     last_seen: str | None = None
-    _mpv_ipc({"command": ["observe_property", 1, "metadata"]})
-
-    while not _metadata_stop.is_set():
-        meta = mpv_get("metadata")
-        if not meta:
-            time.sleep(0.5)
-            continue
-        icy = meta.get("icy-title") or meta.get("title")
-        if icy and icy != last_seen:
-            last_seen = icy
-            artist, track = _parse_icy(icy)
-            if track:
-                try:
-                    _apply_enrichment_now(artist, track, station_name)
-                except Exception:
-                    pass
-                try:
-                    from sqlch.core import recorder
-                    recorder.on_track_change(artist, track)
-                except Exception:
-                    pass
-        time.sleep(0.5)
+    try:
+        while not _metadata_stop.is_set():
+            msg = inbox.get()
+            if msg is None:
+                break
+            if msg.get("event") == DISCONNECTED:
+                if not _metadata_stop.is_set():  # mpv died under us
+                    events.publish("playback", state="stopped", station=None)
+                break
+            name = msg.get("name")
+            if name not in _WATCHED_PROPS:
+                continue
+            data = msg.get("data")
+            prev = _playback.get(name)
+            _playback[name] = data
+            if name == "pause":
+                if prev is not None and data is not None and data != prev:
+                    events.publish("playback", state="paused" if data else "playing",
+                                   station=_station_ref())
+                continue
+            if name == "idle-active":
+                if prev is not None and data is not None and data != prev:
+                    events.publish("playback", state="stopped" if data else "playing",
+                                   station=None if data else _station_ref())
+                continue
+            if name == "cache-buffering-state":
+                if data != prev:
+                    events.publish("buffer", percent=data)
+                continue
+            if name != "metadata":
+                continue
+            meta = data or {}
+            icy = meta.get("icy-title") or meta.get("title")
+            if icy and icy != last_seen:
+                if last_seen is None:
+                    trace.instant("player.first_metadata", station=station_name)
+                last_seen = icy
+                _on_track_change(icy, station_name)
+    finally:
+        conn.remove_listener(_on_event)
+
+
+def _station_ref() -> dict[str, Any] | None:
+    item = (_current or {}).get("item") or {}
+    if not item:
+        return None
+    return {"id": item.get("id"), "name": item.get("name")}
+
+
+def _stop_watcher() -> None:
+    global _metadata_events
+    _metadata_stop.set()
+    _enrichment.invalidate()
+    _publisher.reset()
+    if _metadata_events is not None:
+        _metadata_events.put(None)
+        _metadata_events = None
+    _playback.clear()
+
+
+def _start_watcher(station_name: str) -> None:
+    global _metadata_thread, _metadata_events
+    _stop_watcher()
+    _metadata_stop.clear()
+    _metadata_events = queue.Queue()
+    _metadata_thread = threading.Thread(
+        target=_watch_metadata,
+        args=(station_name, _metadata_events),
+        daemon=True,
+        name="metadata-watcher",
+    )
+    _metadata_thread.start()
+
+
+def playback_state() -> dict[str, Any]:
+    """Latest watched mpv properties (pause, idle-active, buffering, metadata)."""
+    return dict(_playback)
 
 
 # ------------------------------------------------------------
@@ -206,31 +471,64 @@ def _send_quit() -> None:
 
 
 def _cleanup_socket() -> None:
+    _conn().close()
     sock = mpv_socket()
     try:
-        if sock.exists():
+        if sock.exists() or sock.is_symlink():
             sock.unlink()
     except Exception:
         pass
 
 
-def _kill_existing() -> None:
-    global _metadata_thread
-    _metadata_stop.set()
-    _send_quit()
-    _cleanup_socket()
-    sock = mpv_socket()
+def _pkill_instance(sock: Path) -> None:
     subprocess.run(
         ["pkill", "-f", f"mpv.*{sock}"],
         stderr=subprocess.DEVNULL,
         stdout=subprocess.DEVNULL,
         check=False,
     )
-    _metadata_thread = None
 
 
-def _spawn_mpv(url: str, *, video: bool = False, preview: bool = False) -> None:
+@trace.traced
+def _kill_existing() -> None:
+    global _metadata_thread
+    _stop_watcher()
     sock = mpv_socket()
+    # A promoted standby (see sqlch.core.standby) is reached through a
+    # symlink, and its command line names the real socket path.
+    real = sock.resolve() if sock.is_symlink() else sock
+    _send_quit()
+    _cleanup_socket()
+    _pkill_instance(sock)
+    if real != sock:
+        _pkill_instance(real)
+    _metadata_thread = None
+
+
+@trace.traced
+def _quit_instance(sock: Path) -> None:
+    """Quit a secondary mpv (standby/preview) and remove its socket."""
+    conn = connection(sock)
+    if sock.exists():
+        conn.request(["quit"], timeout=0.3)
+    conn.close()
+    try:
+        sock.unlink(missing_ok=True)
+    except OSError:
+        pass
+    _pkill_instance(sock)
+
+
+@trace.traced
+def _spawn_mpv(
+    url: str | None,
+    *,
+    video: bool = False,
+    sock: Path | None = None,
+    mpris: bool = True,
+    extra_args: list[str] | None = None,
+) -> None:
+    sock = sock or mpv_socket()
     sock.parent.mkdir(parents=True, exist_ok=True)
 
     args: list[str] = [
@@ -242,14 +540,16 @@ def _spawn_mpv(url: str, *, video: bool = False, preview: bool = False) -> None:
         "--no-terminal",
         "--cache=yes",
     ]
-    mpris = mpris_plugin()
-    if mpris:
-        args.insert(2, f"--script={mpris}")
+    plugin = mpris_plugin() if mpris else None
+    if plugin:
+        args.insert(2, f"--script={plugin}")
+    if fade_script().exists():
+        args.insert(2, f"--script={fade_script()}")
     if not video:
         args.append("--no-video")
-    if preview:
-        args.append("--volume=60")
-    args.append(url)
+    args.extend(extra_args or ())
+    if url:
+        args.append(url)
 
     subprocess.Popen(
         args,
@@ -260,19 +560,95 @@ def _spawn_mpv(url: str, *, video: bool = False, preview: bool = False) -> None:
     )
 
 
+@trace.traced
+def _load_into_running(url: str) -> bool:
+    """Switch the live mpv to url in place; False if it has to be respawned."""
+    resp = _mpv_ipc({"command": ["loadfile", url, "replace"]})
+    if not resp or resp.get("error") != "success":
+        return False
+    mpv_command("set_property", "pause", False)  # pause survives loadfile
+    return True
+
+
+# ------------------------------------------------------------
+# Switch latency
+# ------------------------------------------------------------
+
+def _on_player_event(msg: dict[str, Any]) -> None:
+    global _switch
+    sw = _switch
+    if sw is None or msg.get("event") != "playback-restart":
+        return
+    _switch = None
+    trace.instant("player.first_audio", mode=sw["mode"], station=sw["station"])
+    _switch_log.append({
+        "mode": sw["mode"],
+        "station": sw["station"],
+        "ms": round((time.monotonic() - sw["t0"]) * 1000, 1),
+    })
+
+
+def _begin_switch(mode: str, station: dict[str, Any]) -> None:
+    global _switch, _event_conn
+    conn = _conn()
+    if _event_conn is not conn:
+        conn.add_listener(_on_player_event)
+        _event_conn = conn
+    _switch = {"mode": mode, "station": station.get("id"), "t0": time.monotonic()}
+
+
+def _finish_switch() -> None:
+    """Close the in-flight switch now (audio was already running)."""
+    _on_player_event({"event": "playback-restart"})
+
+
+def switch_latencies() -> list[dict[str, Any]]:
+    """Recent switch-to-first-audio samples, oldest first.
+
+    Each sample records how the switch was made ("reuse" for loadfile into
+    the live mpv, "spawn" for a fresh process, "standby" for a promoted
+    warm-standby instance) and the milliseconds until audio was audible.
+    """
+    return list(_switch_log)
+
+
 # ------------------------------------------------------------
 # Public API
 # ------------------------------------------------------------
 
-def stop(notify_user: bool = True) -> None:
-    global _current, _preview_timer
-    if _preview_timer:
-        _preview_timer.cancel()
-        _preview_timer = None
+def set_reuse(enabled: bool) -> None:
+    """Keep one idle mpv across stops and station switches (daemon mode).
+
+    With reuse on, switching stations is a loadfile into the running mpv and
+    stop leaves it idle; the process is only respawned after it has died.
+    """
+    global _reuse_mpv
+    _reuse_mpv = enabled
+
+
+def _end_session() -> None:
+    global _preview_timer
+    with _preview_lock:
+        if _preview_timer:
+            _preview_timer.cancel()
+            _preview_timer = None
+            _end_preview(fade=0)
     from sqlch.core import recorder
     recorder.stop()  # no-op {'ok': False} when idle
-    _kill_existing()
+    _stop_watcher()
+
+
+@trace.traced
+def stop(notify_user: bool = True) -> None:
+    global _current, _switch
+    _end_session()
+    if _reuse_mpv and _mpv_alive():
+        mpv_command("stop")
+    else:
+        _kill_existing()
     _current = None
+    _switch = None
+    events.publish("playback", state="stopped", station=None)
     if notify_user:
         notify.notify("sqlch", "Playback stopped")
 
@@ -283,73 +659,161 @@ def pause() -> None:
     mpv_command("cycle", "pause")
 
 
+@trace.traced
 def play_station(station: dict[str, Any]) -> None:
-    global _current, _metadata_thread
+    global _current
 
     url = station.get("url")
     if not url:
         notify.notify("sqlch error", "Station missing URL")
         return
 
-    stop(notify_user=False)
     notify.notify("sqlch", f"NOW PLAYING\n{station.get('name', 'Unknown Station')}")
-    _spawn_mpv(url)
+    _end_session()
+    if _reuse_mpv and _mpv_alive():
+        _begin_switch("reuse", station)
+        reused = _load_into_running(url)
+    else:
+        reused = False
+    if not reused:
+        _kill_existing()
+        _begin_switch("spawn", station)
+        _spawn_mpv(url)
     _current = {"type": "station", "item": station}
+    events.publish("playback", state="playing", station=_station_ref())
 
     sid = station.get("id")
     if sid is not None:
         library.record_play(sid)
 
     if _wait_for_ipc():
-        _metadata_thread = threading.Thread(
-            target=_watch_metadata,
-            args=(station.get("name", "Station"),),
-            daemon=True,
-        )
-        _metadata_thread.start()
+        _start_watcher(station.get("name", "Station"))
 
 
-def preview(url: str, duration: int = 10) -> None:
+@trace.traced
+def adopt_standby(station: dict[str, Any], sock: Path) -> bool:
+    """Make an already-buffering standby mpv the main player for station.
+
+    The standby keeps its own socket; mpv_socket() becomes a symlink to it so
+    every other caller follows along. Returns False (leaving the old player
+    untouched) if the standby no longer answers.
+    """
+    global _current
+    standby = connection(sock)
+    resp = standby.request(["get_property", "pid"])
+    if not resp or resp.get("error") != "success":
+        return False
+
+    notify.notify("sqlch", f"NOW PLAYING\n{station.get('name', 'Unknown Station')}")
+    _end_session()
+    _kill_existing()
+    link = mpv_socket()
+    tmp = link.with_name(link.name + ".tmp")
+    tmp.unlink(missing_ok=True)
+    tmp.symlink_to(sock)
+    tmp.replace(link)
+
+    _begin_switch("standby", station)
+    plugin = mpris_plugin()
+    if plugin:
+        mpv_command("load-script", plugin)
+    mpv_command("set_property", "mute", False)
+    _finish_switch()
+    _current = {"type": "station", "item": station}
+    events.publish("playback", state="playing", station=_station_ref())
+
+    sid = station.get("id")
+    if sid is not None:
+        library.record_play(sid)
+    _start_watcher(station.get("name", "Station"))
+    return True
+
+
+# ------------------------------------------------------------
+# Preview engine
+# ------------------------------------------------------------
+
+def _ensure_preview_mpv() -> bool:
+    """Start the idle preview mpv once; later previews only loadfile into it."""
+    sock = preview_socket()
+    if connection(sock).request(["get_property", "pid"]):
+        return True
+    _quit_instance(sock)  # clear a stale socket from a crashed instance
+    # keep-open=no: when a preview reaches its end the stream is closed and
+    # mpv goes idle instead of holding it open, paused.
+    _spawn_mpv(None, sock=sock, mpris=False, extra_args=["--volume=60", "--keep-open=no"])
+    return _wait_for_ipc(sock=sock)
+
+
+def _end_preview(fade: float = 1.0) -> None:
+    global _preduck_volume
+    connection(preview_socket()).request(["stop"])
+    if _preduck_volume is not None:
+        fade_volume(_preduck_volume, duration=fade)
+        _preduck_volume = None
+
+
+def close_preview() -> None:
+    """End any preview at once and quit the preview mpv (daemon shutdown)."""
     global _preview_timer
+    with _preview_lock:
+        if _preview_timer:
+            _preview_timer.cancel()
+            _preview_timer = None
+        _end_preview(fade=0)
+        _quit_instance(preview_socket())
+
 
+def _preview_done(gen: int) -> None:
+    global _preview_timer
+    with _preview_lock:
+        if gen != _preview_gen:
+            return  # fired while a newer preview was starting
+        _end_preview()
+        _preview_timer = None
+
+
+@trace.traced
+def preview(url: str, duration: int = 10) -> None:
+    """Play url on the dedicated preview mpv for duration seconds.
+
+    The main player is never stopped: if it is playing it is ducked for the
+    length of the preview and restored afterwards. Back-to-back previews
+    reuse the same idle preview process. mpv itself ends the preview (its
+    "end" option), so it stops on time even when the caller exits first;
+    the timer here only handles the fade and the restore.
+    """
+    with _preview_lock:
+        _start_preview(url, duration)
+
+
+def _start_preview(url: str, duration: int) -> None:
+    global _preview_timer, _preview_gen, _preduck_volume
+
+    _preview_gen += 1  # a timer already firing now ends nothing
     if _preview_timer:
         _preview_timer.cancel()
         _preview_timer = None
 
-    was_playing = _current is not None and mpv_socket().exists()
-
-    if was_playing:
-        def _ducked_preview() -> None:
-            _fade_volume(20, steps=20, duration=1.0)
-
-            proc = subprocess.Popen(
-                [
-                    "ffplay",
-                    "-nodisp",
-                    "-autoexit",
-                    "-loglevel", "quiet",
-                    "-t", str(duration),
-                    url,
-                ],
-                stdin=subprocess.DEVNULL,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-            )
-            proc.wait()
-            _fade_volume(100, steps=20, duration=1.0)
-
-        threading.Thread(target=_ducked_preview, daemon=True).start()
-
-    else:
-        stop(notify_user=False)
-        _spawn_mpv(url, preview=True)
+    if not _ensure_preview_mpv():
+        notify.notify("sqlch error", "Could not start preview player")
+        return
+    prev = connection(preview_socket())
+    # A global option rather than a loadfile option: the latter's argument
+    # position changed in mpv 0.38.
+    prev.request(["set_property", "end", f"+{duration}"])
+    prev.request(["loadfile", url, "replace"])
+    prev.request(["set_property", "pause", False])
 
-        def _end_preview() -> None:
-            stop()
+    if _current is not None and mpv_socket().exists():
+        if _preduck_volume is None:
+            vol = mpv_get("volume")
+            _preduck_volume = float(vol) if vol is not None else 100.0
+        fade_volume(20, duration=1.0)
 
-        _preview_timer = threading.Timer(duration, _end_preview)
-        _preview_timer.daemon = True
-        _preview_timer.start()
+    _preview_timer = threading.Timer(duration, _preview_done, args=(_preview_gen,))
+    _preview_timer.daemon = True
+    _preview_timer.start()
 
 
 def current() -> dict[str, Any] | None:
@@ -360,6 +824,9 @@ def now_playing_info() -> dict:
     """Return structured now-playing info pulled from live MPV ICY metadata."""
     if not mpv_socket().exists():
         return {"status": "stopped"}
+    snap = mpv_snapshot(["idle-active", "metadata"])
+    if snap["idle-active"]:
+        return {"status": "stopped"}
 
     station_name = None
     if _current:
@@ -369,7 +836,7 @@ def now_playing_info() -> dict:
         if st:
             station_name = st.get("name")
 
-    meta = mpv_get("metadata") or {}
+    meta = snap["metadata"] or {}
     icy = meta.get("icy-title") or meta.get("title")
 
     info: dict = {"status": "playing", "station": station_name}
@@ -380,8 +847,8 @@ def now_playing_info() -> dict:
     return info
 
 
-def status_string() -> str:
-    info = now_playing_info()
+def format_status(info: dict) -> str:
+    """Render now_playing_info()-shaped info as the status text."""
     if info["status"] == "stopped":
         return "Not playing"
     lines = []
@@ -392,3 +859,7 @@ def status_string() -> str:
         track = info["track"]
         lines.append(f"  {artist} \u2014 {track}" if artist else f"  {track}")
     return "\n".join(lines) if lines else "Playing"
+
+
+def status_string() -> str:
+    return format_status(now_playing_info())
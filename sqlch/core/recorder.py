@@ -18,7 +18,7 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any
 
-from sqlch.core import config, notify
+from sqlch.core import config, events, notify, stats, trace
 
 _CODEC_EXT = {
     "aac": ".m4a",
@@ -104,6 +104,7 @@ def _probe_codec(path: Path) -> str | None:
         return None
 
 
+@trace.traced
 def _remux(raw: Path, dest: Path, tags: dict[str, str]) -> bool:
     cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
            "-i", str(raw), "-map", "0:a", "-c", "copy"]
@@ -159,11 +160,23 @@ _finalizers: list[threading.Thread] = []
 
 
 def _spawn_finalizer(target, *args) -> None:
-    t = threading.Thread(target=target, args=args, daemon=True)
+    def run() -> None:
+        with stats.timed("recorder.finalize"):
+            target(*args)
+
+    _finalizers[:] = [t for t in _finalizers if t.is_alive()]
+    t = threading.Thread(target=run, daemon=True, name="rec-finalize")
     _finalizers.append(t)
     t.start()
 
 
+def _finalize_queue_depth() -> int:
+    return sum(t.is_alive() for t in list(_finalizers))
+
+
+stats.gauge("recorder.finalize_queue", _finalize_queue_depth)
+
+
 def _join_finalizers(timeout: float = 10.0) -> None:
     """Test hook: wait for background finalize threads."""
     for t in list(_finalizers):
@@ -179,6 +192,7 @@ def _raw_path(started_at: datetime, seq: int) -> Path:
     return _staging_dir() / f"rec-{started_at:%Y%m%d-%H%M%S}-{seq}.mkv"
 
 
+@trace.traced
 def start(mode: str, station: dict[str, Any] | None) -> dict[str, Any]:
     global _session
     if mode not in ("full", "track"):
@@ -188,7 +202,11 @@ def start(mode: str, station: dict[str, Any] | None) -> dict[str, Any]:
         if _session:
             return {"ok": False, "error": "already recording",
                     "recording": _status_locked()}
-        if not p.mpv_socket().exists() or p.mpv_get("pid") is None:
+        if not p.mpv_socket().exists():
+            return {"ok": False, "error": "nothing playing"}
+        snap = p.mpv_snapshot(["pid", "idle-active", "metadata", "filtered-metadata"])
+        # idle-active: a reused mpv parked between stations
+        if snap["pid"] is None or snap["idle-active"]:
             return {"ok": False, "error": "nothing playing"}
 
         station = station or {}
@@ -197,11 +215,11 @@ def start(mode: str, station: dict[str, Any] | None) -> dict[str, Any]:
         p.mpv_command("set_property", "stream-record", str(raw))
 
         artist = title = None
-        meta = p.mpv_get("metadata") or {}
+        meta = snap["metadata"] or {}
         icy = meta.get("icy-title") or meta.get("title")
         if icy:
             artist, title = p._parse_icy(icy)
-        fmeta = p.mpv_get("filtered-metadata") or {}
+        fmeta = snap["filtered-metadata"] or {}
         genre = fmeta.get("icy-genre") or fmeta.get("genre")
 
         _session = {
@@ -220,7 +238,9 @@ def start(mode: str, station: dict[str, Any] | None) -> dict[str, Any]:
             _session["tracklist"].append((0.0, artist, title))
     notify.notify("sqlch record",
                   f"Recording ({mode})\n{station.get('name', 'station')}")
-    return {"ok": True, "recording": status()}
+    rec = status()
+    events.publish("recording", **rec)
+    return {"ok": True, "recording": rec}
 
 
 def on_track_change(artist: str | None, title: str | None) -> None:
@@ -246,6 +266,7 @@ def on_track_change(artist: str | None, title: str | None) -> None:
     _spawn_finalizer(_finalize_track, old_raw, station_name, prev_track, partial)
 
 
+@trace.traced
 def stop() -> dict[str, Any]:
     global _session
     with _lock:
@@ -266,6 +287,7 @@ def stop() -> dict[str, Any]:
     else:
         _spawn_finalizer(_finalize_session, sess, station_name)
     notify.notify("sqlch record", "Recording stopped")
+    events.publish("recording", active=False)
     return {"ok": True}
 
 
@@ -290,6 +312,7 @@ def _status_locked() -> dict[str, Any]:
 # Per-mode finalize wrappers (run on background threads)
 # ------------------------------------------------------------
 
+@trace.traced
 def _finalize_track(
     raw: Path,
     station_name: str,
@@ -319,6 +342,7 @@ def _finalize_track(
     _finalize(raw, station_name, tags, stem, partial=partial)
 
 
+@trace.traced
 def _finalize_session(sess: dict[str, Any], station_name: str) -> None:
     stamp = f"{sess['started_at']:%Y-%m-%d %H%M}"
     stem = f"{station_name} - {stamp}"
@@ -8,6 +8,7 @@ from typing import Any
 
 import requests
 
+from sqlch.core import stats, trace
 from sqlch.core.paths import cache_dir
 
 CACHE_TTL = 60 * 60 * 24 * 30  # 30 days
@@ -60,6 +61,7 @@ def _save_json(path: Path, data: dict):
     path.write_text(json.dumps(data, indent=2))
 
 
+@trace.traced
 def _get_token() -> str | None:
     if _token_cache().exists():
         try:
@@ -86,6 +88,7 @@ def _get_token() -> str | None:
     return tok['access_token']
 
 
+@trace.traced
 def _search_track(artist: str, track: str, token: str) -> dict | None:
     q = f'artist:"{artist}" track:"{track}"'
     r = requests.get(
@@ -106,6 +109,7 @@ def _search_track(artist: str, track: str, token: str) -> dict | None:
     return None
 
 
+@trace.traced
 def _artist_genres(artist_id: str, token: str) -> list[str]:
     cache_path = _artist_cache()
     cache = _load_json(cache_path)
@@ -130,6 +134,7 @@ def _album_cache() -> Path:
     return cache_dir() / 'spotify_albums.json'
 
 
+@trace.traced
 def get_album_tracks(album_id: str, token: str) -> list[dict]:
     """
     Fetch all tracks for a given album ID, handling pagination over 50 tracks.
@@ -180,6 +185,7 @@ def get_album_tracks(album_id: str, token: str) -> list[dict]:
     return tracks
 
 
+@trace.traced
 def enrich(artist: str, track: str) -> dict[str, Any] | None:
     """
     Cache-first Spotify enrichment.
@@ -195,7 +201,11 @@ def enrich(artist: str, track: str) -> dict[str, Any] | None:
             and entry_tracklist is not None
             and (not entry_tracklist or 'duration_ms' in entry_tracklist[0])
         ):
+            stats.incr('cache.spotify.hit')
             return entry
+        stats.incr('cache.spotify.stale')
+    else:
+        stats.incr('cache.spotify.miss')
     token = _get_token()
     if not token:
         return None
@@ -0,0 +1,219 @@
+"""Warm-standby pool: neighbouring stations pre-buffered in muted mpv instances.
+
+When enabled, the daemon keeps the stations either side of the current one
+(in library order) connected and playing muted in secondary mpv processes,
+each on its own socket. Zapping next/prev to one of them is then a matter of
+promoting that instance (player.adopt_standby) instead of connecting and
+buffering from scratch. The pool is refilled in the background after every
+switch so it follows the cursor.
+
+Configured under "standby" in sqlch.json:
+
+    {"standby": {"enabled": true, "neighbours": 1,
+                 "memory_mb": 16, "max_kbps": 512}}
+
+- neighbours: stations kept warm on each side of the current one
+- memory_mb: total demuxer cache across all standby instances
+- max_kbps: total stream bitrate the pool may pull; stations beyond the
+  budget are skipped (unknown bitrates count as _DEFAULT_KBPS)
+"""
+
+from __future__ import annotations
+
+import secrets
+import threading
+from pathlib import Path
+from typing import Any
+
+from sqlch.core import config, library, stats
+from sqlch.core.paths import runtime_dir
+
+_DEFAULTS: dict[str, Any] = {
+    "enabled": False,
+    "neighbours": 1,
+    "memory_mb": 16,
+    "max_kbps": 512,
+}
+_DEFAULT_KBPS = 128
+
+_lock = threading.Lock()
+_pool: dict[str, dict[str, Any]] = {}  # station id -> {"sock", "url", "kbps"}
+_target: str | None = None
+# Bumped by every re-centre and clear(): an instance whose spawn began
+# under an older generation is quit instead of joining the pool.
+_generation = 0
+_wake = threading.Event()
+_worker: threading.Thread | None = None
+
+
+def _player():
+    from sqlch.core import player
+    return player
+
+
+def settings() -> dict[str, Any]:
+    cfg = config.load().get("standby") or {}
+    return {**_DEFAULTS, **{k: v for k, v in cfg.items() if k in _DEFAULTS}}
+
+
+def _kbps(station: dict[str, Any]) -> int:
+    try:
+        return int((station.get("stream") or {}).get("bitrate") or _DEFAULT_KBPS)
+    except (TypeError, ValueError):
+        return _DEFAULT_KBPS
+
+
+def _neighbours(current_id: str, count: int) -> list[dict[str, Any]]:
+    """Stations around current_id, nearest first, alternating next/prev."""
+    out: list[dict[str, Any]] = []
+    seen = {current_id}
+    fwd = back = current_id
+    for _ in range(count):
+        nxt = library.next_station(fwd)
+        prv = library.prev_station(back)
+        for st in (nxt, prv):
+            if st and st["id"] not in seen and st.get("url"):
+                seen.add(st["id"])
+                out.append(st)
+        if nxt:
+            fwd = nxt["id"]
+        if prv:
+            back = prv["id"]
+    return out
+
+
+# ------------------------------------------------------------
+# Instance management
+# ------------------------------------------------------------
+
+def _spawn(station: dict[str, Any], cache_mb: int) -> dict[str, Any]:
+    sock = runtime_dir() / f"standby-{secrets.token_hex(4)}.sock"
+    _player()._spawn_mpv(
+        station["url"],
+        sock=sock,
+        mpris=False,  # loaded on promotion; muted standbys stay off D-Bus
+        extra_args=[
+            "--mute=yes",
+            f"--demuxer-max-bytes={cache_mb}MiB",
+            "--demuxer-max-back-bytes=0",
+        ],
+    )
+    return {"sock": sock, "url": station["url"], "kbps": _kbps(station)}
+
+
+def _discard(entry: dict[str, Any]) -> None:
+    _player()._quit_instance(entry["sock"])
+
+
+def _sync(current_id: str, gen: int | None = None) -> None:
+    cfg = settings()
+    if not cfg["enabled"]:
+        clear()
+        return
+    wanted = _neighbours(current_id, max(0, int(cfg["neighbours"])))
+    slots = max(1, len(wanted))
+    cache_mb = max(1, int(cfg["memory_mb"]) // slots)
+
+    budget = int(cfg["max_kbps"])
+    keep: dict[str, dict[str, Any]] = {}
+    for st in wanted:
+        kbps = _kbps(st)
+        if kbps > budget:
+            continue
+        budget -= kbps
+        keep[st["id"]] = st
+
+    with _lock:
+        if gen is None:
+            gen = _generation
+        elif gen != _generation:
+            return
+        stale = [sid for sid, e in _pool.items()
+                 if sid not in keep or e["url"] != keep[sid]["url"]]
+        dropped = [_pool.pop(sid) for sid in stale]
+        missing = [st for sid, st in keep.items() if sid not in _pool]
+    for entry in dropped:
+        _discard(entry)
+    for st in missing:
+        entry = _spawn(st, cache_mb)  # slow: runs without _lock
+        with _lock:
+            current = gen == _generation and st["id"] not in _pool
+            if current:
+                _pool[st["id"]] = entry
+        if not current:
+            _discard(entry)  # cleared, taken or re-centred meanwhile
+            return
+
+
+def _run() -> None:
+    while True:
+        _wake.wait()
+        _wake.clear()
+        with _lock:
+            target, gen = _target, _generation
+        if target:
+            try:
+                _sync(target, gen)
+            except Exception:
+                pass
+
+
+# ------------------------------------------------------------
+# Public API
+# ------------------------------------------------------------
+
+def refill(current_id: str | None) -> None:
+    """Re-centre the pool on current_id in the background."""
+    global _target, _generation, _worker
+    if not current_id:
+        return
+    if not settings()["enabled"]:
+        if _pool:
+            clear()
+        return
+    with _lock:
+        _target = current_id
+        _generation += 1
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(target=_run, daemon=True, name="standby")
+            _worker.start()
+    _wake.set()
+
+
+def take(station_id: str | None) -> Path | None:
+    """Hand the standby instance for station_id over to the caller.
+
+    The instance leaves the pool either way; returns its socket path, or
+    None if there is no standby for that station.
+    """
+    if not station_id:
+        return None
+    with _lock:
+        entry = _pool.pop(station_id, None)
+    return entry["sock"] if entry else None
+
+
+def clear() -> None:
+    """Shut down every standby instance (playback stopped or pool disabled)."""
+    global _target, _generation
+    with _lock:
+        _target = None
+        _generation += 1
+        entries = list(_pool.values())
+        _pool.clear()
+    for entry in entries:
+        _discard(entry)
+
+
+def _pool_size() -> int:
+    with _lock:
+        return len(_pool)
+
+
+def _pool_kbps() -> int:
+    with _lock:
+        return sum(e["kbps"] for e in _pool.values())
+
+
+stats.gauge("standby.instances", _pool_size)
+stats.gauge("standby.kbps", _pool_kbps)
@@ -0,0 +1,258 @@
+"""Station list import/export: RadioBrowser JSON, M3U, PLS, XSPF and sqlch.
+
+Readers are generators over an open file and yield partial station dicts
+(name, url and whatever else the format carries: tags, rb_uuid, stream,
+source); library.import_stations normalizes, deduplicates and commits
+them. Nothing reads a whole file into memory except PLS, whose entries
+are numbered keys that may come in any order.
+
+- rb:    a RadioBrowser /json/stations dump, a JSON array of station objects
+- sqlch: our own export, {"version": 1, "stations": [...]} like library.json
+- m3u:   #EXTINF:-1,Name followed by the URL (extended M3U; plain URLs too)
+- pls:   [playlist] with FileN / TitleN
+- xspf:  <track><location/><title/></track> in an XSPF playlist
+"""
+
+from __future__ import annotations
+
+import configparser
+import json
+import re
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import IO, Any, Iterable, Iterator
+
+from sqlch.core.library import LIBRARY_VERSION
+
+FORMATS = ("sqlch", "rb", "m3u", "pls", "xspf")
+
+_EXTENSIONS = {".m3u": "m3u", ".m3u8": "m3u", ".pls": "pls", ".xspf": "xspf"}
+_XSPF_NS = "http://xspf.org/ns/0/"
+_CHUNK = 64 * 1024
+_STATIONS = re.compile(r'"stations"\s*:\s*\[')
+
+
+def detect_format(path: Path) -> str:
+    """Guess a file's format from its extension, or for JSON its first value."""
+    ext = _EXTENSIONS.get(path.suffix.lower())
+    if ext:
+        return ext
+    with open(path, encoding="utf-8") as f:
+        head = f.read(_CHUNK).lstrip("\ufeff \t\r\n")
+    if head.lower().startswith("[playlist]"):
+        return "pls"
+    if head.startswith("["):
+        return "rb"
+    if head.startswith("{"):
+        return "sqlch"
+    if head.startswith("<"):
+        return "xspf"
+    return "m3u"
+
+
+# ------------------------------------------------------------
+# Readers
+# ------------------------------------------------------------
+
+def read_stations(f: IO[str], fmt: str) -> Iterator[dict[str, Any]]:
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown format: {fmt} (one of {', '.join(FORMATS)})")
+    return _READERS[fmt](f)
+
+
+def _iter_json_array(f: IO[str], buf: str = "") -> Iterator[Any]:
+    """Yield the values of the JSON array whose "[" has just been consumed."""
+    decoder = json.JSONDecoder()
+    pos = 0
+    while True:
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n,":
+                pos += 1
+            if pos < len(buf):
+                break
+            chunk = f.read(_CHUNK)
+            if not chunk:
+                raise ValueError("unterminated JSON array")
+            buf, pos = chunk, 0
+        if buf[pos] == "]":
+            return
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            chunk = f.read(_CHUNK)
+            if not chunk:
+                raise
+            buf, pos = buf[pos:] + chunk, 0  # value runs past the buffer
+            continue
+        yield value
+        pos = end
+
+
+def _tags(value: Any) -> list[str]:
+    if isinstance(value, str):
+        value = value.split(",")
+    return [t.strip() for t in value or () if isinstance(t, str) and t.strip()]
+
+
+def _read_rb(f: IO[str]) -> Iterator[dict[str, Any]]:
+    head = f.read(_CHUNK).lstrip("\ufeff \t\r\n")
+    if not head.startswith("["):
+        raise ValueError("not a RadioBrowser dump (expected a JSON array)")
+    for st in _iter_json_array(f, head[1:]):
+        if not isinstance(st, dict):
+            continue
+        yield {
+            "name": (st.get("name") or "").strip() or "Unknown",
+            "url": st.get("url_resolved") or st.get("url"),
+            "tags": _tags(st.get("tags")),
+            "rb_uuid": st.get("stationuuid"),
+            "stream": {
+                "codec": st.get("codec") or None,
+                "bitrate": st.get("bitrate") or None,
+                "country": st.get("countrycode") or st.get("country") or None,
+                "validated": False,
+                "last_checked": None,
+            },
+            "source": {"type": "radiobrowser", "origin": st.get("stationuuid")},
+        }
+
+
+def _read_sqlch(f: IO[str]) -> Iterator[dict[str, Any]]:
+    # Our exports (and library.json) open with "version", then "stations".
+    buf = ""
+    while not (m := _STATIONS.search(buf)):
+        chunk = f.read(_CHUNK)
+        if not chunk:
+            raise ValueError('not a sqlch export (no "stations" list)')
+        buf += chunk
+    for st in _iter_json_array(f, buf[m.end():]):
+        if isinstance(st, dict):
+            yield st
+
+
+def _read_m3u(f: IO[str]) -> Iterator[dict[str, Any]]:
+    title = None
+    for line in f:
+        line = line.strip().lstrip("\ufeff")
+        if not line:
+            continue
+        if line.startswith("#EXTINF:"):
+            title = line.split(",", 1)[1].strip() if "," in line else None
+        elif not line.startswith("#"):
+            yield {"name": title or line, "url": line}
+            title = None
+
+
+def _read_pls(f: IO[str]) -> Iterator[dict[str, Any]]:
+    cp = configparser.ConfigParser(interpolation=None, strict=False)
+    cp.optionxform = str.lower  # type: ignore[assignment]
+    try:
+        cp.read_file(f)
+    except configparser.Error as e:
+        raise ValueError(f"not a PLS playlist: {e}") from None
+    section = next((s for s in cp.sections() if s.lower() == "playlist"), None)
+    if section is None:
+        raise ValueError("not a PLS playlist (no [playlist] section)")
+    entries = cp[section]
+    numbers = sorted(int(k[4:]) for k in entries if k.startswith("file") and k[4:].isdigit())
+    for n in numbers:
+        url = entries[f"file{n}"].strip()
+        yield {"name": entries.get(f"title{n}", "").strip() or url, "url": url}
+
+
+def _read_xspf(f: IO[str]) -> Iterator[dict[str, Any]]:
+    for _, el in ET.iterparse(f):
+        if el.tag.rsplit("}", 1)[-1] != "track":
+            continue
+        fields = {child.tag.rsplit("}", 1)[-1]: (child.text or "").strip() for child in el}
+        el.clear()
+        if fields.get("location"):
+            yield {"name": fields.get("title") or fields["location"], "url": fields["location"]}
+
+
+_READERS = {"rb": _read_rb, "sqlch": _read_sqlch, "m3u": _read_m3u,
+            "pls": _read_pls, "xspf": _read_xspf}
+
+
+# ------------------------------------------------------------
+# Writers
+# ------------------------------------------------------------
+
+def write_stations(stations: Iterable[dict[str, Any]], f: IO[str], fmt: str) -> int:
+    """Write stations to f in fmt; returns how many were written."""
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown format: {fmt} (one of {', '.join(FORMATS)})")
+    return _WRITERS[fmt](stations, f)
+
+
+def _write_sqlch(stations: Iterable[dict[str, Any]], f: IO[str]) -> int:
+    # One station per line, so the file streams back in (and diffs) cleanly.
+    f.write(f'{{"version": {LIBRARY_VERSION}, "stations": [')
+    n = 0
+    for st in stations:
+        f.write(("\n" if n == 0 else ",\n") + json.dumps(st, ensure_ascii=False))
+        n += 1
+    f.write("\n]}\n")
+    return n
+
+
+def _write_rb(stations: Iterable[dict[str, Any]], f: IO[str]) -> int:
+    f.write("[")
+    n = 0
+    for st in stations:
+        stream = st.get("stream") or {}
+        rb = {
+            "stationuuid": st.get("rb_uuid"),
+            "name": st.get("name"),
+            "url": st.get("url"),
+            "url_resolved": st.get("url"),
+            "tags": ",".join(st.get("tags") or ()),
+            "codec": stream.get("codec") or "",
+            "bitrate": stream.get("bitrate") or 0,
+            "countrycode": stream.get("country") or "",
+        }
+        f.write(("\n" if n == 0 else ",\n") + json.dumps(rb, ensure_ascii=False))
+        n += 1
+    f.write("\n]\n")
+    return n
+
+
+def _write_m3u(stations: Iterable[dict[str, Any]], f: IO[str]) -> int:
+    f.write("#EXTM3U\n")
+    n = 0
+    for st in stations:
+        if st.get("url"):
+            f.write(f"#EXTINF:-1,{st.get('name') or ''}\n{st['url']}\n")
+            n += 1
+    return n
+
+
+def _write_pls(stations: Iterable[dict[str, Any]], f: IO[str]) -> int:
+    f.write("[playlist]\n")
+    n = 0
+    for st in stations:
+        if st.get("url"):
+            n += 1
+            f.write(f"File{n}={st['url']}\nTitle{n}={st.get('name') or ''}\nLength{n}=-1\n")
+    f.write(f"NumberOfEntries={n}\nVersion=2\n")
+    return n
+
+
+def _write_xspf(stations: Iterable[dict[str, Any]], f: IO[str]) -> int:
+    f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<playlist version="1" xmlns="{_XSPF_NS}">\n  <trackList>\n')
+    n = 0
+    for st in stations:
+        if not st.get("url"):
+            continue
+        track = ET.Element("track")
+        ET.SubElement(track, "location").text = st["url"]
+        ET.SubElement(track, "title").text = st.get("name") or ""
+        f.write("    " + ET.tostring(track, encoding="unicode") + "\n")
+        n += 1
+    f.write("  </trackList>\n</playlist>\n")
+    return n
+
+
+_WRITERS = {"rb": _write_rb, "sqlch": _write_sqlch, "m3u": _write_m3u,
+            "pls": _write_pls, "xspf": _write_xspf}
@@ -0,0 +1,148 @@
+"""Cheap in-process counters and latency windows behind the `stats` command.
+
+Names are dotted paths ("cmd.play", "cache.enrich.hit"); snapshot() nests
+them by their dots. Every latency series keeps a lifetime count and max
+plus the last _WINDOW samples, from which p50/p95/p99 are computed only
+when a snapshot is asked for, so recording a sample is an append under a
+lock. Gauges are callables sampled at snapshot time (queue depths and the
+like that are cheaper to read than to track).
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+_WINDOW = 1024
+
+_lock = threading.Lock()
+_started = time.monotonic()
+_counters: dict[str, int] = {}
+_series: dict[str, "_Series"] = {}
+_gauges: dict[str, Callable[[], Any]] = {}
+
+
+class _Series:
+    __slots__ = ("count", "max", "samples")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.max = 0.0
+        self.samples: deque[float] = deque(maxlen=_WINDOW)
+
+    def add(self, ms: float) -> None:
+        self.count += 1
+        if ms > self.max:
+            self.max = ms
+        self.samples.append(ms)
+
+    def summary(self) -> dict[str, Any]:
+        window = sorted(self.samples)
+        return {
+            "count": self.count,
+            "p50": _percentile(window, 50),
+            "p95": _percentile(window, 95),
+            "p99": _percentile(window, 99),
+            "max": round(self.max, 2),
+        }
+
+
+def _percentile(ordered: list[float], pct: float) -> float | None:
+    if not ordered:
+        return None
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return round(ordered[k], 2)
+
+
+# ------------------------------------------------------------
+# Recording
+# ------------------------------------------------------------
+
+def incr(name: str, n: int = 1) -> None:
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def observe(name: str, ms: float) -> None:
+    """Add one latency sample, in milliseconds."""
+    with _lock:
+        series = _series.get(name)
+        if series is None:
+            series = _series[name] = _Series()
+        series.add(ms)
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, (time.perf_counter() - t0) * 1000)
+
+
+def gauge(name: str, fn: Callable[[], Any]) -> None:
+    """Register fn to be sampled as name in every snapshot."""
+    with _lock:
+        _gauges[name] = fn
+
+
+def reset() -> None:
+    global _started
+    with _lock:
+        _counters.clear()
+        _series.clear()
+        _started = time.monotonic()
+
+
+# ------------------------------------------------------------
+# Reporting
+# ------------------------------------------------------------
+
+def _nest(flat: dict[str, Any]) -> dict[str, Any]:
+    out: dict[str, Any] = {}
+    for name in sorted(flat):
+        node = out
+        *parents, leaf = name.split(".")
+        for part in parents:
+            child = node.setdefault(part, {})
+            if not isinstance(child, dict):  # "a" and "a.b" both used
+                child = node[part] = {"": child}
+            node = child
+        node[leaf] = flat[name]
+    return out
+
+
+def thread_counts() -> dict[str, int]:
+    """Live threads grouped by name, with pool/worker numbering stripped."""
+    groups: dict[str, int] = {}
+    for t in threading.enumerate():
+        name = re.sub(r"[-_]?\d+$", "", t.name.split(" (")[0]) or t.name
+        groups[name] = groups.get(name, 0) + 1
+    return dict(sorted(groups.items()))
+
+
+def snapshot() -> dict[str, Any]:
+    with _lock:
+        counters = dict(_counters)
+        latency = {name: s.summary() for name, s in _series.items()}
+        gauges = dict(_gauges)
+        uptime = time.monotonic() - _started
+    sampled = {}
+    for name, fn in gauges.items():
+        try:
+            sampled[name] = fn()
+        except Exception:
+            sampled[name] = None
+    threads = thread_counts()
+    return {
+        "uptime_s": int(uptime),
+        "counters": _nest(counters),
+        "latency_ms": _nest(latency),
+        "gauges": _nest(sampled),
+        "threads": {"total": sum(threads.values()), "by_name": threads},
+    }
@@ -0,0 +1,188 @@
+"""Opt-in tracing spans, written as Chrome trace-event JSON.
+
+Set SQLCH_TRACE to a file path ("{pid}" in it is replaced, so several
+processes can trace at once) or to 1 for trace-<pid>.json in the cache
+dir, and every span() / @traced function in the process is recorded as a
+complete ("X") event on its thread; open the file in ui.perfetto.dev or
+chrome://tracing to see where a station switch spent its time.
+
+Events are appended as they finish, one per line, in the trace-event
+"JSON array" form. Both viewers accept the array without its closing
+bracket, so a trace of a daemon that was killed is still readable; a
+clean exit closes it properly.
+
+Disabled (the default), span() hands back one shared no-op context
+manager and a @traced function costs a single global check per call.
+SQLCH_TRACE only names the file at import; it is created by the first
+recorded event, so a process that never records one never touches disk.
+"""
+
+from __future__ import annotations
+
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from pathlib import Path
+from typing import IO, Any, Callable, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_NOOP = nullcontext()
+
+_lock = threading.Lock()
+_out: IO[str] | None = None
+_path: Path | None = None  # set while tracing; _out opens on first event
+_first = True
+_named_threads: set[int] = set()
+
+
+def _now_us() -> float:
+    return time.perf_counter_ns() / 1000
+
+
+def _open_locked() -> IO[str] | None:
+    """Create the trace file at _path on first use (caller holds _lock)."""
+    global _out, _path, _first
+    if _path is None:
+        return None
+    try:
+        _path.parent.mkdir(parents=True, exist_ok=True)
+        _out = open(_path, "w", encoding="utf-8")
+    except OSError:
+        _path = None  # tracing off rather than failing the traced code
+        return None
+    _out.write("[")
+    _first = True
+    _named_threads.clear()
+    return _out
+
+
+def _write(event: dict[str, Any]) -> None:
+    global _first
+    tid = threading.get_native_id()
+    line = json.dumps({**event, "pid": os.getpid(), "tid": tid}, default=str)
+    with _lock:
+        out = _out or _open_locked()
+        if out is None:
+            return
+        if tid not in _named_threads:
+            _named_threads.add(tid)
+            meta = {"name": "thread_name", "ph": "M", "pid": os.getpid(),
+                    "tid": tid, "args": {"name": threading.current_thread().name}}
+            out.write(("\n" if _first else ",\n") + json.dumps(meta))
+            _first = False
+        out.write(("\n" if _first else ",\n") + line)
+        _first = False
+        out.flush()
+
+
+class _Span:
+    __slots__ = ("name", "args", "t0")
+
+    def __init__(self, name: str, args: dict[str, Any]) -> None:
+        self.name = name
+        self.args = args
+
+    def __enter__(self) -> _Span:
+        self.t0 = _now_us()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        t1 = _now_us()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        event = {"name": self.name, "cat": self.name.split(".", 1)[0],
+                 "ph": "X", "ts": round(self.t0, 1), "dur": round(t1 - self.t0, 1)}
+        if self.args:
+            event["args"] = self.args
+        _write(event)
+
+
+# ------------------------------------------------------------
+# Recording
+# ------------------------------------------------------------
+
+def enabled() -> bool:
+    return _path is not None
+
+
+def span(name: str, **args: Any):
+    """Context manager recording name ("module.what") around its block."""
+    if _path is None:
+        return _NOOP
+    return _Span(name, args)
+
+
+def traced(fn: F) -> F:
+    """Decorator: record every call of fn as a span named module.function."""
+    name = f"{fn.__module__.rsplit('.', 1)[-1]}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(*a: Any, **kw: Any) -> Any:
+        if _path is None:
+            return fn(*a, **kw)
+        with _Span(name, {}):
+            return fn(*a, **kw)
+
+    return wrapper  # type: ignore[return-value]
+
+
+def instant(name: str, **args: Any) -> None:
+    """Record a point in time (first audio, first metadata, ...)."""
+    if _path is None:
+        return
+    event = {"name": name, "cat": name.split(".", 1)[0], "ph": "i", "s": "t",
+             "ts": round(_now_us(), 1)}
+    if args:
+        event["args"] = args
+    _write(event)
+
+
+# ------------------------------------------------------------
+# Lifecycle
+# ------------------------------------------------------------
+
+def enable(path: Path) -> None:
+    """Start writing events to path (replacing any earlier trace file)."""
+    global _out, _path, _first
+    disable()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _lock:
+        _out = open(path, "w", encoding="utf-8")
+        _out.write("[")
+        _path = path
+        _first = True
+        _named_threads.clear()
+
+
+def disable() -> Path | None:
+    """Close the trace file (a valid JSON array); returns its path."""
+    global _out, _path
+    with _lock:
+        out, path = _out, _path
+        _out = _path = None
+    if out is not None:
+        out.write("\n]\n")
+        out.close()
+    return path
+
+
+def _from_env() -> None:
+    global _path
+    value = os.environ.get("SQLCH_TRACE", "").strip()
+    if not value or value == "0":
+        return
+    if value == "1":
+        from sqlch.core.paths import cache_dir
+        path = cache_dir() / f"trace-{os.getpid()}.json"
+    else:
+        path = Path(value.replace("{pid}", str(os.getpid()))).expanduser()
+    _path = path  # created by the first event, not at import
+    atexit.register(disable)
+
+
+_from_env()
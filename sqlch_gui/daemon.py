@@ -1,30 +1,21 @@
 """sqlch control socket + MPV IPC queries."""
 
-import json
-import socket
 import subprocess
 
+from sqlch.core.client import Session
+from sqlch.core.mpv_ipc import connection
+
 from . import CONTROL_SOCK, MPV_SOCK
 
+_session = Session(CONTROL_SOCK)
+
 
 def send(msg: dict) -> dict | None:
-    """Send a command JSON message to the main sqlch UNIX domain control socket."""
-    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    """Send a command to the sqlch control socket over the shared session."""
     try:
-        s.settimeout(1.5)
-        s.connect(str(CONTROL_SOCK))
-        s.sendall((json.dumps(msg) + "\n").encode())
-        data = b""
-        while not data.endswith(b"\n"):
-            chunk = s.recv(4096)
-            if not chunk:
-                break
-            data += chunk
-        return json.loads(data.decode("utf-8", errors="replace"))
+        return _session.request(msg)
     except Exception:
         return None
-    finally:
-        s.close()
 
 
 def get_vol_state() -> tuple[float, bool]:
@@ -45,32 +36,35 @@ def get_vol_state() -> tuple[float, bool]:
         return 0.0, False
 
 
+_STREAM_PROPS = ["audio-bitrate", "audio-codec-name", "cache-buffering-state"]
+
+
 def _mpv_get_property(prop: str):
+    return stream_snapshot([prop]).get(prop)
+
+
+def stream_snapshot(props: list[str] | None = None) -> dict:
+    """Fetch the stream indicator properties from MPV in one pipelined round trip.
+
+    Pass the result to get_stream_bitrate/format/buffer so a status refresh
+    costs one IPC burst instead of one connection per indicator.
+    """
+    props = props or _STREAM_PROPS
     if not MPV_SOCK.exists():
-        return None
+        return {p: None for p in props}
     try:
-        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
-            s.settimeout(0.5)
-            s.connect(str(MPV_SOCK))
-            s.sendall((json.dumps({"command": ["get_property", prop]}) + "\n").encode())
-            buf = b""
-            while not buf.endswith(b"\n"):
-                chunk = s.recv(4096)
-                if not chunk:
-                    break
-                buf += chunk
-        if buf.strip():
-            resp = json.loads(buf.decode())
-            if resp.get("error") == "success":
-                return resp.get("data")
+        replies = connection(MPV_SOCK).request_many([["get_property", p] for p in props])
     except Exception:
-        pass
-    return None
+        replies = [None] * len(props)
+    return {
+        p: r.get("data") if r and r.get("error") == "success" else None
+        for p, r in zip(props, replies)
+    }
 
 
-def get_stream_bitrate() -> int | None:
+def get_stream_bitrate(snap: dict | None = None) -> int | None:
     """Return stream bitrate in kbps from MPV audio-bitrate property, or None."""
-    val = _mpv_get_property("audio-bitrate")
+    val = snap.get("audio-bitrate") if snap else _mpv_get_property("audio-bitrate")
     if val is not None:
         try:
             v = int(float(val))
@@ -80,20 +74,24 @@ def get_stream_bitrate() -> int | None:
     return None
 
 
-def get_stream_format() -> str | None:
+def get_stream_format(snap: dict | None = None) -> str | None:
     """Return the short audio codec name (e.g. 'mp3', 'aac') from MPV, or None."""
-    val = _mpv_get_property("audio-codec-name")
+    val = snap.get("audio-codec-name") if snap else _mpv_get_property("audio-codec-name")
     if val:
         return str(val).upper()
     return None
 
 
-def get_stream_buffer() -> int | None:
+def get_stream_buffer(snap: dict | None = None) -> int | None:
     """Return mpv's cache-buffering-state (0-100), or None."""
-    val = _mpv_get_property("cache-buffering-state")
+    val = (
+        snap.get("cache-buffering-state")
+        if snap
+        else _mpv_get_property("cache-buffering-state")
+    )
     if val is not None:
         try:
             return int(val)
         except (ValueError, TypeError):
             pass
-    return None
\ No newline at end of file
+    return None
@@ -391,13 +391,13 @@ class NowPlayingPanel(Gtk.Box):
         self.rec_bubble.set_state(bool(rec.get("active")), mode)
 
     def on_record_clicked(self, bubble, mode):
-        daemon.send({"cmd": "record", "action": "toggle", "mode": mode})
+        daemon.send({"cmd": "record", "action": "toggle", "mode": mode, "async": True})
 
     def on_toggle_play(self, btn):
         if self._loaded:
-            daemon.send({"cmd": "stop"})
+            daemon.send({"cmd": "stop", "async": True})
         else:
-            daemon.send({"cmd": "play", "query": "__last__"})
+            daemon.send({"cmd": "play", "query": "__last__", "async": True})
 
     def on_vol_changed(self, meter, val):
         import subprocess
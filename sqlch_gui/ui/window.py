@@ -316,9 +316,10 @@ class SqlchPopupWindow(Gtk.ApplicationWindow):
             resp = daemon.send({"cmd": "status"})
             icy = metadata.get_icy_track()
             vol, muted = daemon.get_vol_state()
-            bitrate = daemon.get_stream_bitrate()
-            fmt = daemon.get_stream_format()
-            buffer = daemon.get_stream_buffer()
+            snap = daemon.stream_snapshot()
+            bitrate = daemon.get_stream_bitrate(snap)
+            fmt = daemon.get_stream_format(snap)
+            buffer = daemon.get_stream_buffer(snap)
 
             GLib.idle_add(
                 self._apply_daemon_state,
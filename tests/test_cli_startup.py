@@ -0,0 +1,36 @@
+import subprocess
+import sys
+import unittest
+from importlib import resources
+from pathlib import Path
+
+# The checkout the sqlch package is imported from.
+ROOT = Path(str(resources.files("sqlch"))).resolve().parent
+
+HEAVY = ("requests", "sqlch.core.player", "sqlch.core.library",
+         "sqlch.core.discover", "sqlch.core.daemon")
+
+# Runs `sqlch status` against a canned daemon reply, then reports which
+# heavy modules ended up imported.
+PROBE = """
+import sys
+from unittest import mock
+from sqlch.cli import main as cli
+with mock.patch.object(cli.client, "daemon_available", return_value=True), \\
+        mock.patch.object(cli.client, "send", return_value={"status": "Not playing"}):
+    cli.dispatch_command("status", [])
+print(",".join(m for m in %r if m in sys.modules))
+"""
+
+
+class TestThinClientImports(unittest.TestCase):
+    def test_status_via_daemon_skips_heavy_imports(self):
+        proc = subprocess.run([sys.executable, "-c", PROBE % (HEAVY,)],
+                              capture_output=True, text=True, cwd=ROOT, check=True)
+        lines = proc.stdout.splitlines()
+        self.assertEqual(lines[0], "Not playing")
+        self.assertEqual(lines[1], "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sqlch.core import client, daemon
+from sqlch.core.client import Session
+
+
+class TestSession(unittest.TestCase):
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        self.addCleanup(self._td.cleanup)
+        self.path = Path(self._td.name) / "control.sock"
+        self.session = Session(self.path)
+        self.addCleanup(self.session.close)
+
+    def start_server(self):
+        server = daemon.ControlServer(self.path, workers=2)
+        server.bind()
+        t = threading.Thread(target=server.serve_forever, daemon=True)
+        t.start()
+        self.addCleanup(t.join, 2)
+        self.addCleanup(server.shutdown)
+        return server, t
+
+    def test_no_daemon_raises_connection_error(self):
+        with self.assertRaises(ConnectionError):
+            self.session.request({"cmd": "ping"})
+
+    def test_requests_reuse_one_connection(self):
+        self.start_server()
+        self.assertEqual(self.session.request({"cmd": "ping"}), {"ok": True, "msg": "pong"})
+        sock = self.session._sock
+        for _ in range(3):
+            self.session.request({"cmd": "ping"})
+        self.assertIs(self.session._sock, sock)
+
+    def test_in_flight_requests_do_not_block_each_other(self):
+        self.start_server()
+        release = threading.Event()
+        results = {}
+        with mock.patch.object(daemon.player, "pause",
+                               side_effect=lambda: release.wait(5)):
+            slow = threading.Thread(target=lambda: results.setdefault(
+                "pause", self.session.request({"cmd": "pause"}, timeout=5)))
+            slow.start()
+            time.sleep(0.05)
+            self.assertEqual(self.session.request({"cmd": "ping"})["msg"], "pong")
+            self.assertNotIn("pause", results)
+            release.set()
+            slow.join(5)
+        self.assertEqual(results["pause"], {"ok": True})
+
+    def test_request_many_keeps_command_order(self):
+        self.start_server()
+        replies = self.session.request_many([{"cmd": "ping"}, {"cmd": "nope"}])
+        self.assertEqual(replies[0]["msg"], "pong")
+        self.assertEqual(replies[1]["error"], "unknown cmd: nope")
+
+    def test_batch(self):
+        self.start_server()
+        replies = self.session.batch([{"cmd": "ping"}, {"cmd": "status"}])
+        self.assertEqual(replies[0]["msg"], "pong")
+        self.assertIn("state", replies[1])
+
+    def test_timeout(self):
+        self.start_server()
+        release = threading.Event()
+        self.addCleanup(release.set)
+        with mock.patch.object(daemon.player, "pause",
+                               side_effect=lambda: release.wait(5)):
+            with self.assertRaises(TimeoutError):
+                self.session.request({"cmd": "pause"}, timeout=0.1)
+
+    def test_reconnects_after_daemon_restart(self):
+        server, t = self.start_server()
+        self.session.request({"cmd": "ping"})
+        server.shutdown()
+        t.join(2)
+        deadline = time.monotonic() + 2
+        while self.session.connected and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.start_server()
+        self.assertEqual(self.session.request({"cmd": "ping"})["msg"], "pong")
+
+    def test_run_job_outlasts_the_request_timeout(self):
+        self.start_server()
+        with mock.patch.object(client, "session", return_value=self.session), \
+                mock.patch.object(daemon.player, "stop", side_effect=lambda: time.sleep(0.3)), \
+                mock.patch.object(daemon.standby, "clear"):
+            t0 = time.monotonic()
+            self.assertEqual(client.run_job({"cmd": "stop"}, wait=0.05), {"ok": True})
+            self.assertGreaterEqual(time.monotonic() - t0, 0.3)
+
+    def test_quick_job_costs_no_poll_sleep(self):
+        self.start_server()
+        with mock.patch.object(client, "session", return_value=self.session), \
+                mock.patch.object(daemon.player, "stop"), \
+                mock.patch.object(daemon.standby, "clear"):
+            t0 = time.monotonic()
+            self.assertEqual(client.run_job({"cmd": "stop"}), {"ok": True})
+            self.assertLess(time.monotonic() - t0, 0.05)
+
+    def test_run_job_times_out_and_cancels(self):
+        self.start_server()
+        release = threading.Event()
+        self.addCleanup(release.set)
+        with mock.patch.object(client, "session", return_value=self.session), \
+                mock.patch.object(daemon.jobs, "cancel", wraps=daemon.jobs.cancel) as cancel, \
+                mock.patch.object(daemon.player, "stop", side_effect=lambda: release.wait(5)), \
+                mock.patch.object(daemon.standby, "clear"):
+            with self.assertRaises(TimeoutError):
+                client.run_job({"cmd": "stop"}, timeout=0.1, wait=0.05)
+        cancel.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
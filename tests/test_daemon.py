@@ -0,0 +1,341 @@
+import json
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sqlch.core import daemon, events
+
+
+class ControlServerTestCase(unittest.TestCase):
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        self.addCleanup(self._td.cleanup)
+        self.path = Path(self._td.name) / "control.sock"
+        self.server = daemon.ControlServer(self.path, workers=2)
+        self.server.bind()
+        t = threading.Thread(target=self.server.serve_forever, daemon=True)
+        t.start()
+        self.addCleanup(t.join, 2)
+        self.addCleanup(self.server.shutdown)
+
+    def connect(self):
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        s.settimeout(2)
+        s.connect(str(self.path))
+        self.addCleanup(s.close)
+        f = s.makefile("rb")
+        self.addCleanup(f.close)
+        return s, f
+
+    def ask(self, s, f, msg):
+        s.sendall((json.dumps(msg) + "\n").encode())
+        return json.loads(f.readline())
+
+
+class TestControlServer(ControlServerTestCase):
+    def test_one_shot_request(self):
+        s, f = self.connect()
+        self.assertEqual(self.ask(s, f, {"cmd": "ping"}), {"ok": True, "msg": "pong"})
+
+    def test_connection_serves_several_requests_and_echoes_ids(self):
+        s, f = self.connect()
+        s.sendall(b'{"cmd": "ping", "id": 1}\n{"cmd": "ping", "id": 2}\n')
+        ids = [json.loads(f.readline())["id"] for _ in range(2)]
+        self.assertEqual(ids, [1, 2])
+
+    def test_invalid_json_gets_an_error(self):
+        s, f = self.connect()
+        s.sendall(b"not json\n")
+        resp = json.loads(f.readline())
+        self.assertFalse(resp["ok"])
+        self.assertEqual(self.ask(s, f, {"cmd": "ping"})["msg"], "pong")
+
+    def test_status_is_not_blocked_by_slow_play(self):
+        release = threading.Event()
+
+        def slow_search(q):
+            release.wait(5)
+            return []
+
+        with mock.patch.object(daemon.library, "find_station", return_value=None), \
+                mock.patch.object(daemon.library, "search_stations", return_value=[]), \
+                mock.patch.object(daemon.discover, "search", side_effect=slow_search), \
+                mock.patch.object(daemon.player, "current", return_value=None):
+            slow, slow_f = self.connect()
+            slow.sendall(b'{"cmd": "play", "query": "nowhere", "id": "p"}\n')
+            time.sleep(0.05)
+            s, f = self.connect()
+            t0 = time.monotonic()
+            resp = self.ask(s, f, {"cmd": "status"})
+            self.assertLess(time.monotonic() - t0, 1.0)
+            self.assertTrue(resp["ok"])
+            self.assertEqual(resp["status"], "Not playing")
+            release.set()
+            resp = json.loads(slow_f.readline())
+        self.assertEqual(resp["id"], "p")
+        self.assertIn("could not resolve", resp["error"])
+
+    def test_play_resolves_fuzzy_matches_locally(self):
+        st = {"id": "jazz-fm-91", "name": "Jazz FM 91", "url": "http://jazz"}
+        with mock.patch.object(daemon.library, "find_station", return_value=None), \
+                mock.patch.object(daemon.library, "search_stations",
+                                  return_value=[(0.86, st)]) as search, \
+                mock.patch.object(daemon.discover, "search") as remote, \
+                mock.patch.object(daemon, "_play") as play:
+            resp = daemon._handle({"cmd": "play", "query": "jaz fm"})
+        self.assertEqual(resp["station"]["id"], "jazz-fm-91")
+        search.assert_called_once_with("jaz fm", limit=1, min_score=daemon._FUZZY_MIN)
+        remote.assert_not_called()
+        play.assert_called_once_with(st)
+
+    def test_slow_replies_arrive_out_of_order_by_id(self):
+        release = threading.Event()
+        with mock.patch.object(daemon.player, "pause",
+                               side_effect=lambda: release.wait(5)):
+            s, f = self.connect()
+            s.sendall(b'{"cmd": "pause", "id": "slow"}\n{"cmd": "ping", "id": "fast"}\n')
+            self.assertEqual(json.loads(f.readline())["id"], "fast")
+            release.set()
+            self.assertEqual(json.loads(f.readline())["id"], "slow")
+
+    def test_handler_error_is_reported(self):
+        with mock.patch.object(daemon, "_handle", side_effect=RuntimeError("boom")):
+            s, f = self.connect()
+            self.assertEqual(self.ask(s, f, {"cmd": "stop"}),
+                             {"ok": False, "error": "boom"})
+
+
+class TestBatch(ControlServerTestCase):
+    def test_replies_in_order(self):
+        s, f = self.connect()
+        resp = self.ask(s, f, {"cmd": "batch", "id": 3, "commands": [
+            {"cmd": "ping"}, {"cmd": "record", "action": "status"}, {"cmd": "status"}]})
+        self.assertTrue(resp["ok"])
+        self.assertEqual(resp["id"], 3)
+        self.assertEqual([r["ok"] for r in resp["replies"]], [True, True, True])
+        self.assertEqual(resp["replies"][0]["msg"], "pong")
+        self.assertIn("recording", resp["replies"][1])
+
+    def test_failure_mid_batch_continues_by_default(self):
+        resp = daemon._respond({"cmd": "batch", "commands": [
+            {"cmd": "ping"}, {"cmd": "nope"}, {"cmd": "ping"}]})
+        self.assertFalse(resp["ok"])
+        self.assertEqual([r["ok"] for r in resp["replies"]], [True, False, True])
+
+    def test_stop_on_error_skips_the_rest(self):
+        with mock.patch.object(daemon.player, "pause") as pause:
+            resp = daemon._respond({"cmd": "batch", "stop_on_error": True, "commands": [
+                {"cmd": "ping"}, {"cmd": "play"}, {"cmd": "pause"}]})
+        pause.assert_not_called()
+        self.assertFalse(resp["ok"])
+        self.assertEqual(resp["replies"][1]["error"], "missing query")
+        self.assertEqual(resp["replies"][2], {"ok": False, "error": "skipped", "skipped": True})
+
+    def test_nesting_and_subscribe_are_refused(self):
+        resp = daemon._respond({"cmd": "batch", "commands": [
+            {"cmd": "batch", "commands": [{"cmd": "ping"}]}, {"cmd": "subscribe"}, "junk"]})
+        self.assertEqual([r["error"] for r in resp["replies"]], [
+            "batch cannot be batched", "subscribe cannot be batched", "invalid request"])
+
+    def test_empty_batch_is_an_error(self):
+        self.assertFalse(daemon._respond({"cmd": "batch", "commands": []})["ok"])
+
+    def test_read_only_batch_is_answered_inline(self):
+        self.assertTrue(daemon._inline({"cmd": "batch", "commands": [
+            {"cmd": "status"}, {"cmd": "ping"}]}))
+        self.assertFalse(daemon._inline({"cmd": "batch", "commands": [
+            {"cmd": "status"}, {"cmd": "stop"}]}))
+
+
+class TestSubscribe(ControlServerTestCase):
+    def test_events_stream_to_subscriber(self):
+        s, f = self.connect()
+        ack = self.ask(s, f, {"cmd": "subscribe", "id": 7})
+        self.assertEqual(ack, {"ok": True, "topics": sorted(events.TOPICS), "id": 7})
+        events.publish("track", station="KEXP", artist="Neu!", title="Hallogallo")
+        ev = json.loads(f.readline())
+        self.assertEqual((ev["event"], ev["artist"], ev["title"]),
+                         ("track", "Neu!", "Hallogallo"))
+
+    def test_topic_filter(self):
+        s, f = self.connect()
+        self.assertTrue(self.ask(s, f, {"cmd": "subscribe", "topics": ["buffer"]})["ok"])
+        events.publish("track", station="KEXP", artist=None, title="ignored")
+        events.publish("buffer", percent=40)
+        self.assertEqual(json.loads(f.readline())["percent"], 40)
+
+    def test_unknown_topic_is_rejected(self):
+        s, f = self.connect()
+        resp = self.ask(s, f, {"cmd": "subscribe", "topics": "track,weather"})
+        self.assertFalse(resp["ok"])
+        self.assertIn("weather", resp["error"])
+
+    def test_disconnect_unsubscribes(self):
+        s, f = self.connect()
+        self.ask(s, f, {"cmd": "subscribe"})
+        self.assertTrue(events._subscribers)
+        s.shutdown(socket.SHUT_RDWR)
+        deadline = time.monotonic() + 2
+        while events._subscribers and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(events._subscribers, {})
+
+    def test_requests_still_answered_on_subscribed_connection(self):
+        s, f = self.connect()
+        self.ask(s, f, {"cmd": "subscribe", "topics": ["playback"]})
+        self.assertEqual(self.ask(s, f, {"cmd": "ping"})["msg"], "pong")
+        self.assertEqual(self.ask(s, f, {"cmd": "unsubscribe"}), {"ok": True})
+        self.assertEqual(events._subscribers, {})
+
+
+class TestStatusSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.snap = daemon._StatusSnapshot()
+        kexp = {"id": "kexp", "name": "KEXP"}
+        self.playing = {"event": "playback", "state": "playing", "station": kexp}
+        self.paused = {"event": "playback", "state": "paused", "station": kexp}
+        self.track = {"event": "track", "station": "KEXP", "artist": "Neu!",
+                      "title": "Hallogallo"}
+
+    def test_follows_playback_and_track_events(self):
+        self.assertEqual(self.snap.reply(), {"status": "Not playing", "state": "stopped",
+                                             "recording": {"active": False}})
+        self.snap.on_event(self.playing)
+        self.assertEqual(self.snap.reply()["status"], "\u266b KEXP")
+        self.snap.on_event(self.track)
+        self.assertEqual(self.snap.reply(), {
+            "status": "\u266b KEXP\n  Neu! \u2014 Hallogallo", "state": "playing",
+            "recording": {"active": False}})
+        self.snap.on_event({"event": "playback", "state": "stopped", "station": None})
+        self.assertEqual(self.snap.reply()["status"], "Not playing")
+
+    def test_pause_and_resume_keep_the_track(self):
+        self.snap.on_event(self.playing)
+        self.snap.on_event(self.track)
+        self.snap.on_event(self.paused)
+        self.assertEqual(self.snap.reply()["state"], "paused")
+        self.snap.on_event(self.playing)
+        self.assertIn("Hallogallo", self.snap.reply()["status"])
+
+    def test_new_station_drops_the_old_track(self):
+        self.snap.on_event(self.playing)
+        self.snap.on_event(self.track)
+        self.snap.on_event({"event": "playback", "state": "playing",
+                            "station": {"id": "fip", "name": "FIP"}})
+        self.assertEqual(self.snap.reply()["status"], "\u266b FIP")
+
+    def test_follows_recording_events(self):
+        self.snap.on_event({"event": "recording", "ts": 1.0, "active": True, "mode": "full",
+                            "elapsed": 65, "file": "/tmp/rec.mkv", "station": "KEXP"})
+        rec = self.snap.reply()["recording"]
+        self.assertEqual((rec["active"], rec["mode"], rec["elapsed"]), (True, "full", 65))
+        self.assertNotIn("event", rec)
+        self.snap.on_event({"event": "recording", "ts": 2.0, "active": False})
+        self.assertEqual(self.snap.reply()["recording"], {"active": False})
+
+    def test_status_command_does_not_touch_mpv_or_disk(self):
+        from sqlch.core import recorder
+        with mock.patch.object(recorder, "status", side_effect=AssertionError), \
+                mock.patch.object(daemon.player, "mpv_snapshot", side_effect=AssertionError), \
+                mock.patch.object(daemon.player, "mpv_get", side_effect=AssertionError), \
+                mock.patch.object(daemon.library, "load", side_effect=AssertionError):
+            resp = daemon._handle({"cmd": "status"})
+        self.assertTrue(resp["ok"])
+        self.assertIn("state", resp)
+
+
+class TestJobs(ControlServerTestCase):
+    def poll(self, s, f, job_id, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.ask(s, f, {"cmd": "job", "job": job_id})["job"]
+            if job["state"] in ("done", "failed", "cancelled") or time.monotonic() > deadline:
+                return job
+            time.sleep(0.01)
+
+    def test_async_play_returns_job_at_once_and_finishes(self):
+        release = threading.Event()
+        st = {"id": "s1", "name": "KEXP", "url": "http://kexp"}
+
+        def slow_search(q):
+            release.wait(5)
+            return [{"name": "KEXP", "url": "http://kexp"}]
+
+        with mock.patch.object(daemon.library, "find_station", return_value=None), \
+                mock.patch.object(daemon.library, "search_stations", return_value=[]), \
+                mock.patch.object(daemon.discover, "search", side_effect=slow_search), \
+                mock.patch.object(daemon.library, "add_station", return_value=st), \
+                mock.patch.object(daemon, "_play") as play:
+            s, f = self.connect()
+            t0 = time.monotonic()
+            resp = self.ask(s, f, {"cmd": "play", "query": "kexp", "async": True, "id": 3})
+            self.assertLess(time.monotonic() - t0, 1.0)
+            self.assertEqual((resp["ok"], resp["id"]), (True, 3))
+            job = self.ask(s, f, {"cmd": "job", "job": resp["job"]})["job"]
+            self.assertEqual(job["cmd"], "play")
+            release.set()
+            job = self.poll(s, f, resp["job"])
+        self.assertEqual(job["state"], "done")
+        self.assertEqual(job["result"]["station"]["name"], "KEXP")
+        play.assert_called_once_with(st)
+
+    def test_cancel_between_search_and_switch(self):
+        searching = threading.Event()
+        release = threading.Event()
+
+        def slow_search(q):
+            searching.set()
+            release.wait(5)
+            return [{"name": "KEXP", "url": "http://kexp"}]
+
+        with mock.patch.object(daemon.library, "find_station", return_value=None), \
+                mock.patch.object(daemon.library, "search_stations", return_value=[]), \
+                mock.patch.object(daemon.discover, "search", side_effect=slow_search), \
+                mock.patch.object(daemon.library, "add_station") as add, \
+                mock.patch.object(daemon, "_play") as play:
+            s, f = self.connect()
+            job_id = self.ask(s, f, {"cmd": "play", "query": "kexp", "async": True})["job"]
+            self.assertTrue(searching.wait(2))
+            resp = self.ask(s, f, {"cmd": "job", "job": job_id, "action": "cancel"})
+            self.assertEqual(resp["job"]["progress"], "searching")
+            release.set()
+            job = self.poll(s, f, job_id)
+        self.assertEqual(job["state"], "cancelled")
+        add.assert_not_called()
+        play.assert_not_called()
+
+    def test_failed_command_fails_the_job(self):
+        s, f = self.connect()
+        job_id = self.ask(s, f, {"cmd": "play", "async": True})["job"]
+        job = self.poll(s, f, job_id)
+        self.assertEqual((job["state"], job["result"]["error"]), ("failed", "missing query"))
+
+    def test_job_poll_waits_for_the_result(self):
+        release = threading.Event()
+        with mock.patch.object(daemon.player, "stop", side_effect=lambda: release.wait(5)), \
+                mock.patch.object(daemon.standby, "clear"):
+            s, f = self.connect()
+            job_id = self.ask(s, f, {"cmd": "stop", "async": True})["job"]
+            threading.Timer(0.1, release.set).start()
+            t0 = time.monotonic()
+            job = self.ask(s, f, {"cmd": "job", "job": job_id, "wait": 5})["job"]
+        self.assertEqual(job["state"], "done")
+        self.assertLess(time.monotonic() - t0, 2)
+        self.assertFalse(self.ask(s, f, {"cmd": "job", "job": job_id, "wait": "x"})["ok"])
+
+    def test_unknown_job_and_listing(self):
+        s, f = self.connect()
+        self.assertFalse(self.ask(s, f, {"cmd": "job", "job": "j0"})["ok"])
+        self.assertIsInstance(self.ask(s, f, {"cmd": "job"})["jobs"], list)
+
+    def test_async_is_ignored_for_read_only_commands(self):
+        s, f = self.connect()
+        self.assertEqual(self.ask(s, f, {"cmd": "ping", "async": True})["msg"], "pong")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+from sqlch.core import fuzzy
+
+
+class TestTrigrams(unittest.TestCase):
+    def test_words_are_padded_and_folded(self):
+        self.assertEqual(fuzzy.trigrams("FM"), {"  f", " fm", "fm "})
+        self.assertEqual(fuzzy.trigrams("Ö1"), fuzzy.trigrams("o1"))
+        self.assertEqual(fuzzy.trigrams("  -- "), set())
+
+
+class TestTrigramIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = fuzzy.TrigramIndex()
+        for name in ("Jazz FM 91", "Smooth Jazz Florida", "Radio Paradise", "Jazz FM 91"):
+            self.index.add(name)
+
+    def test_full_query_scores_one_and_closer_match_wins(self):
+        hits = self.index.search("jazz")
+        self.assertEqual([s for s, _ in hits], [1.0, 1.0, 1.0])
+        self.assertEqual(hits[0][1], 0)  # shortest, then earliest
+
+    def test_typos_and_missing_words(self):
+        self.assertEqual(self.index.search("radio paradize", limit=1)[0][1], 2)
+        self.assertEqual(self.index.search("smoth jazz", limit=1)[0][1], 1)
+
+    def test_min_score_and_limit(self):
+        self.assertEqual(self.index.search("jazz", limit=1), [(1.0, 0)])
+        self.assertEqual(self.index.search("rock antenne", min_score=0.75), [])
+        self.assertEqual(self.index.search("", min_score=0), [])
+        for score, _ in self.index.search("jaz florida", min_score=0.5):
+            self.assertGreaterEqual(score, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
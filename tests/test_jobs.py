@@ -0,0 +1,95 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from sqlch.core import events, jobs
+
+
+def wait_final(job, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while job.state not in jobs._FINAL and time.monotonic() < deadline:
+        time.sleep(0.005)
+    return job.state
+
+
+class TestJobs(unittest.TestCase):
+    def test_result_decides_done_or_failed(self):
+        ok = jobs.submit("play", lambda: {"ok": True, "station": "KEXP"})
+        bad = jobs.submit("play", lambda: {"ok": False, "error": "nope"})
+        self.assertEqual(wait_final(ok), jobs.DONE)
+        self.assertEqual(ok.info()["result"]["station"], "KEXP")
+        self.assertEqual(wait_final(bad), jobs.FAILED)
+
+    def test_exception_fails_the_job(self):
+        def boom():
+            raise RuntimeError("mpv gone")
+
+        job = jobs.submit("play", boom)
+        self.assertEqual(wait_final(job), jobs.FAILED)
+        self.assertEqual(job.result, {"ok": False, "error": "mpv gone"})
+
+    def test_cancel_at_checkpoint(self):
+        started, release = threading.Event(), threading.Event()
+        reached = []
+
+        def work():
+            jobs.progress("searching")
+            started.set()
+            release.wait(2)
+            jobs.checkpoint()
+            reached.append(True)
+            return {"ok": True}
+
+        job = jobs.submit("play", work)
+        self.assertTrue(started.wait(2))
+        self.assertEqual((job.state, job.progress), (jobs.RUNNING, "searching"))
+        jobs.cancel(job.id)
+        release.set()
+        self.assertEqual(wait_final(job), jobs.CANCELLED)
+        self.assertEqual(reached, [])
+
+    def test_pending_job_never_runs_once_cancelled(self):
+        release = threading.Event()
+        blockers = [jobs.submit("play", lambda: release.wait(2) and {"ok": True})
+                    for _ in range(jobs._WORKERS)]
+        ran = []
+        job = jobs.submit("play", lambda: ran.append(1) or {"ok": True})
+        self.assertEqual(jobs.cancel(job.id).state, jobs.CANCELLED)
+        release.set()
+        for b in blockers:
+            wait_final(b)
+        time.sleep(0.05)
+        self.assertEqual((job.state, ran), (jobs.CANCELLED, []))
+
+    def test_helpers_are_noops_outside_a_job(self):
+        jobs.progress("anything")
+        jobs.checkpoint()
+        self.assertIsNone(jobs.current())
+
+    def test_state_changes_are_published(self):
+        seen = []
+        token = events.subscribe(seen.append, ["job"])
+        self.addCleanup(events.unsubscribe, token)
+        job = jobs.submit("next", lambda: {"ok": True})
+
+        def states():
+            return [e["state"] for e in seen if e["id"] == job.id]
+
+        deadline = time.monotonic() + 2
+        while len(states()) < 3 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        self.assertEqual(states(), [jobs.PENDING, jobs.RUNNING, jobs.DONE])
+
+    def test_finished_jobs_are_pruned(self):
+        with mock.patch.object(jobs, "_KEEP_FINISHED", 2):
+            done = [jobs.submit("stop", lambda: {"ok": True}) for _ in range(3)]
+            for j in done:
+                wait_final(j)
+            jobs.submit("stop", lambda: {"ok": True})
+        self.assertIsNone(jobs.get(done[0].id))
+        self.assertIsNotNone(jobs.get(done[-1].id))
+
+
+if __name__ == "__main__":
+    unittest.main()
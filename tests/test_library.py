@@ -0,0 +1,328 @@
+import json
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sqlch.core import library, library_db
+
+
+# Runs in a second process against the library at argv[1]: "play" records
+# plays (compacting every few), "edit" adds stations until plays.done exists.
+OTHER_PROCESS = """
+import sys
+from pathlib import Path
+from unittest import mock
+from sqlch.core import library
+path = Path(sys.argv[1])
+with mock.patch.object(library, "_library_path", return_value=path), \\
+        mock.patch.object(library, "_COMPACT_BYTES", 400):
+    library.set_backend("json")
+    if sys.argv[2] == "play":
+        for _ in range(int(sys.argv[3])):
+            library.record_play("kexp")
+        path.with_name("plays.done").touch()
+    else:
+        n = 0
+        while not path.with_name("plays.done").exists():
+            n += 1
+            library.add_station(name=f"Station {n}", url=f"http://s{n}")
+"""
+
+
+class LibraryTestCase(unittest.TestCase):
+    backend = "json"
+
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        self.addCleanup(self._td.cleanup)
+        self.path = Path(self._td.name) / "library.json"
+        self.db = Path(self._td.name) / "library.db"
+        for name, value in (("_library_path", self.path), ("_db_path", self.db)):
+            p = mock.patch.object(library, name, return_value=value)
+            p.start()
+            self.addCleanup(p.stop)
+        library.set_backend(self.backend)
+        self.addCleanup(library.set_backend, None)
+
+    def write_external(self, stations):
+        """Replace every station the way another process would."""
+        if self.backend == "sqlite":
+            conn = library_db.connect(self.db)
+            library_db.replace_all(conn, [library._normalize_station(s) for s in stations])
+            conn.close()
+            return
+        tmp = self.path.with_name("other.tmp")
+        tmp.write_text(json.dumps({"version": 1, "stations": stations}))
+        tmp.replace(self.path)
+
+
+class TestLibraryCache(LibraryTestCase):
+    def test_reads_reuse_the_parsed_library(self):
+        library.add_station(name="KEXP", url="http://kexp")
+        library.add_station(name="Radio Paradise", url="http://rp")
+        with mock.patch.object(library.json, "loads", side_effect=AssertionError):
+            self.assertEqual(library.find_station("kexp")["url"], "http://kexp")
+            self.assertEqual(len(library.list_stations()), 2)
+            self.assertEqual(library.next_station("kexp")["id"], "radio-paradise")
+            library.record_play("kexp")
+            self.assertEqual(library.last_played_station()["id"], "kexp")
+
+    def test_external_change_is_picked_up(self):
+        library.add_station(name="KEXP", url="http://kexp")
+        self.write_external([{"id": "fip", "name": "FIP", "url": "http://fip"}])
+        self.assertEqual([s["id"] for s in library.list_stations()], ["fip"])
+        self.assertIsNone(library.find_station("kexp"))
+
+    def test_callers_get_copies(self):
+        library.add_station(name="KEXP", url="http://kexp", tags=["indie"])
+        st = library.find_station("kexp")
+        st["name"] = "changed"
+        st["tags"].append("mutated")
+        library.load()["stations"][0]["url"] = "http://elsewhere"
+        fresh = library.find_station("kexp")
+        self.assertEqual((fresh["name"], fresh["tags"], fresh["url"]),
+                         ("KEXP", ["indie"], "http://kexp"))
+
+    def test_mutations_are_written_through(self):
+        library.add_station(name="KEXP", url="http://kexp")
+        library.update_station("kexp", {"category": "music"})
+        library.record_play("kexp")
+        library.invalidate()
+        st = library.find_station("kexp")
+        self.assertEqual((st["category"], st["play_count"]), ("music", 1))
+        self.assertTrue(library.remove_station("kexp"))
+        library.invalidate()
+        self.assertEqual(library.list_stations(), [])
+
+    def test_save_round_trip(self):
+        library.add_station(name="KEXP", url="http://kexp")
+        lib = library.load()
+        lib["stations"].append({"name": "FIP", "url": "http://fip"})
+        library.save(lib)
+        self.assertEqual(library.find_station("fip")["play_count"], 0)
+        library.invalidate()
+        self.assertEqual(len(library.list_stations()), 2)
+
+    def test_failed_write_leaves_cache_untouched(self):
+        library.add_station(name="KEXP", url="http://kexp")
+        with mock.patch.object(library, "_atomic_write", side_effect=OSError("full")), \
+                mock.patch.object(library_db, "insert_station", side_effect=OSError("full")):
+            with self.assertRaises(OSError):
+                library.add_station(name="FIP", url="http://fip")
+        self.assertIsNone(library.find_station("fip"))
+
+
+class TestIndexes(LibraryTestCase):
+    def scan_find(self, q):
+        q = q.lower()
+        stations = library.list_stations()
+        return (next((s for s in stations if s["id"] == q or s["name"].lower() == q), None)
+                or next((s for s in stations if q in s["name"].lower()), None))
+
+    def test_find_matches_the_linear_rules(self):
+        for name in ("Jazz FM", "jazz", "Radio Jazz", "KEXP"):
+            library.add_station(name=name, url=f"http://{name}")
+        library.update_station("kexp", {"name": "jazz fm"})  # name clash, later position
+        for q in ("jazz", "JAZZ FM", "jazz-fm", "radio", "kexp", "nothing"):
+            self.assertEqual(library.find_station(q), self.scan_find(q), q)
+
+    def test_neighbours_follow_position(self):
+        for name in ("A", "B", "C"):
+            library.add_station(name=name, url=f"http://{name}")
+        self.assertEqual(library.next_station("c")["id"], "a")
+        self.assertEqual(library.prev_station("a")["id"], "c")
+        library.remove_station("b")
+        self.assertEqual(library.next_station("a")["id"], "c")
+        self.assertEqual(library.next_station("gone")["id"], "a")
+        self.assertEqual(library.prev_station("gone")["id"], "c")
+
+    def test_last_played_ordering(self):
+        for name in ("A", "B", "C"):
+            library.add_station(name=name, url=f"http://{name}")
+        self.assertIsNone(library.last_played_station())
+        for sid, t in (("b", 100), ("c", 200), ("b", 300)):
+            with mock.patch.object(library, "_now", return_value=t):
+                library.record_play(sid)
+        self.assertEqual(library.last_played_station()["id"], "b")
+        with mock.patch.object(library, "_now", return_value=300):
+            library.record_play("a")  # same second: the earlier station wins
+        self.assertEqual(library.last_played_station()["id"], "a")
+        library.remove_station("a")
+        self.assertEqual(library.last_played_station()["id"], "b")
+
+    def test_indexes_rebuilt_after_external_write(self):
+        library.add_station(name="A", url="http://a")
+        self.write_external([{"id": "x", "name": "X", "url": "http://x", "last_played": 5},
+                             {"id": "y", "name": "Y", "url": "http://y"}])
+        self.assertEqual(library.next_station("x")["id"], "y")
+        self.assertEqual(library.last_played_station()["id"], "x")
+        self.assertIsNone(library.find_station("a"))
+
+
+class TestSearch(LibraryTestCase):
+    def setUp(self):
+        super().setUp()
+        library.add_station(name="Jazz FM 91", url="http://jazz", tags=["smooth"])
+        library.add_station(name="Radio Paradise", url="http://rp", tags=["eclectic"])
+        library.add_station(name="Smooth Jazz Florida", url="http://sjf")
+
+    def ids(self, query, **kw):
+        return [st["id"] for _, st in library.search_stations(query, **kw)]
+
+    def test_ranked_and_typo_tolerant(self):
+        self.assertEqual(self.ids("jazz")[:2], ["jazz-fm-91", "smooth-jazz-florida"])
+        self.assertEqual(self.ids("radio paradize", limit=1), ["radio-paradise"])
+        self.assertEqual(self.ids("eclectic"), ["radio-paradise"])
+        self.assertEqual(self.ids("jaz fm", min_score=0.75), ["jazz-fm-91"])
+        self.assertEqual(self.ids("zzzz"), [])
+
+    def test_index_follows_changes(self):
+        self.ids("jazz")  # build it
+        library.add_station(name="FIP", url="http://fip")
+        self.assertEqual(self.ids("fip", limit=1), ["fip"])
+        library.update_station("fip", {"name": "FIP Groove"})
+        self.assertEqual(self.ids("groove", limit=1), ["fip"])
+        library.remove_station("jazz-fm-91")
+        self.assertEqual(self.ids("jazz fm", limit=1), ["smooth-jazz-florida"])
+
+
+class TestImport(LibraryTestCase):
+    def test_dedup_in_one_write(self):
+        library.add_station(name="KEXP", url="http://kexp")
+        batch = [
+            {"name": "KEXP again", "url": "HTTP://KEXP/"},             # same URL
+            {"name": "Fip", "url": "http://fip", "rb_uuid": "u1"},
+            {"name": "FIP", "url": "http://fip2"},                     # same id
+            {"name": "Fip HD", "url": "http://fip3", "rb_uuid": "u1"},  # same uuid
+            {"name": "No URL"},
+            {"name": "Radio Paradise", "url": "http://rp", "tags": ("eclectic",)},
+        ]
+        store = library._store()
+        with mock.patch.object(store, "add_many", wraps=store.add_many) as add_many, \
+                mock.patch.object(store, "add", side_effect=AssertionError):
+            self.assertEqual(library.import_stations(iter(batch)), (2, 4))
+        add_many.assert_called_once()
+        self.assertEqual([s["id"] for s in library.list_stations()],
+                         ["kexp", "fip", "radio-paradise"])
+        self.assertEqual(library.find_station("fip")["rb_uuid"], "u1")
+        self.assertEqual(library.search_stations("eclectic", limit=1)[0][1]["id"], "radio-paradise")
+        library.invalidate()
+        self.assertEqual(len(library.list_stations()), 3)
+        self.assertEqual(library.import_stations(batch), (0, 6))
+
+
+    def test_discovered_station_uuid_blocks_reimport(self):
+        library.add_discovered_station(
+            {"name": "Fip", "url": "http://fip", "stationuuid": "u1"})
+        batch = [{"name": "FIP (HD)", "url": "http://fip/hd", "rb_uuid": "u1"}]
+        self.assertEqual(library.import_stations(batch), (0, 1))
+        self.assertEqual([s["id"] for s in library.list_stations()], ["fip"])
+
+class TestImportSqlite(TestImport):
+    backend = "sqlite"
+
+
+class TestPlaysLog(LibraryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.log = self.path.with_name("plays.log")
+        library.add_station(name="KEXP", url="http://kexp")
+
+    def on_disk(self, station_id):
+        library.invalidate()
+        return library.find_station(station_id)["play_count"]
+
+    def test_plays_append_without_rewriting_the_library(self):
+        with mock.patch.object(library, "_atomic_write", side_effect=AssertionError):
+            for _ in range(3):
+                library.record_play("kexp")
+        self.assertEqual(library.find_station("kexp")["play_count"], 3)
+        self.assertEqual(len(self.log.read_text().splitlines()[1:]), 3)  # after the header
+        self.assertEqual(json.loads(self.path.read_text())["stations"][0]["play_count"], 0)
+        self.assertEqual(self.on_disk("kexp"), 3)
+
+    def test_full_write_does_not_count_logged_plays_twice(self):
+        library.record_play("kexp")
+        library.update_station("kexp", {"category": "music"})
+        library.record_play("kexp")
+        self.assertEqual(self.on_disk("kexp"), 2)
+
+    def test_plays_from_another_process_are_seen(self):
+        library.record_play("kexp")
+        with open(self.log, "a") as f:
+            f.write(json.dumps({"id": "kexp", "ts": 4102444800}) + "\n")
+            f.write('{"id": "kexp", "ts"')  # still being written
+        st = library.find_station("kexp")
+        self.assertEqual((st["play_count"], st["last_played"]), (2, 4102444800))
+
+    def test_compaction_folds_the_log_into_the_library(self):
+        with mock.patch.object(library, "_COMPACT_BYTES", 200):
+            for _ in range(10):
+                library.record_play("kexp")
+        self.assertLess(self.log.stat().st_size, 200)
+        self.assertGreater(json.loads(self.path.read_text())["stations"][0]["play_count"], 0)
+        self.assertEqual(library.find_station("kexp")["play_count"], 10)
+        self.assertEqual(self.on_disk("kexp"), 10)
+
+
+    def test_save_from_another_process_keeps_compacted_plays(self):
+        def run(*args):
+            return subprocess.Popen([sys.executable, "-c", OTHER_PROCESS, str(self.path), *args])
+
+        with run("edit") as editor, run("play", "300") as player:
+            self.assertEqual(player.wait(60), 0)
+            self.assertEqual(editor.wait(60), 0)
+        self.assertEqual(self.on_disk("kexp"), 300)
+
+class TestLibraryCacheSqlite(TestLibraryCache):
+    backend = "sqlite"
+
+
+class TestIndexesSqlite(TestIndexes):
+    backend = "sqlite"
+
+
+class TestSqliteBackend(LibraryTestCase):
+    backend = "sqlite"
+
+    def test_first_open_imports_library_json(self):
+        library.set_backend("json")
+        library.add_station(name="KEXP", url="http://kexp")
+        library.record_play("kexp")
+        self.db.unlink()
+        library.set_backend("sqlite")
+        st = library.find_station("kexp")
+        self.assertEqual((st["url"], st["play_count"]), ("http://kexp", 1))
+        library.add_station(name="FIP", url="http://fip")
+        library.set_backend("sqlite")  # reopen: no second import
+        self.assertEqual([s["id"] for s in library.list_stations()], ["kexp", "fip"])
+        self.assertNotIn("fip", self.path.read_text())  # json left as it was
+
+    def test_writes_are_row_level(self):
+        library.add_station(name="KEXP", url="http://kexp")
+        with mock.patch.object(library_db, "replace_all", side_effect=AssertionError), \
+                mock.patch.object(library, "_atomic_write", side_effect=AssertionError):
+            library.record_play("kexp")
+            library.update_station("kexp", {"category": "music"})
+            library.add_station(name="FIP", url="http://fip")
+            library.remove_station("fip")
+        self.assertEqual(library.find_station("kexp")["play_count"], 1)
+
+    def test_other_connection_commit_is_seen(self):
+        library.add_station(name="KEXP", url="http://kexp")
+        conn = library_db.connect(self.db)
+        library_db.record_play(conn, "kexp", 1234)
+        conn.close()
+        self.assertEqual(library.find_station("kexp")["last_played"], 1234)
+
+    def test_wal_mode(self):
+        conn = library_db.connect(self.db)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        conn.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,31 @@
+import json
+import subprocess
+import sys
+import unittest
+from importlib import resources
+from pathlib import Path
+
+# The checkout the sqlch package is imported from.
+ROOT = Path(str(resources.files("sqlch"))).resolve().parent
+
+
+class TestLoadtestSmoke(unittest.TestCase):
+    """A short run of tools/loadtest.py: real daemon, fake mpv, no errors."""
+
+    def test_short_run(self):
+        proc = subprocess.run(
+            [sys.executable, str(ROOT / "tools" / "loadtest.py"), "--json",
+             "--duration", "0.5", "--clients", "2", "--subscribers", "1",
+             "--stations", "3", "--mpv-latency-ms", "5"],
+            capture_output=True, text=True, cwd=ROOT, timeout=60,
+        )
+        self.assertEqual(proc.returncode, 0, proc.stderr)
+        report = json.loads(proc.stdout)
+        self.assertGreater(report["total_ops"], 0)
+        self.assertEqual(sum(s["errors"] for s in report["ops"].values()), 0)
+        self.assertGreater(report["ops"]["status"]["count"], 0)
+        self.assertGreater(report["events_received"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,265 @@
+import json
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+from sqlch.core import stats
+from sqlch.core.mpv_ipc import MpvConnection
+
+
+class StubMpv:
+    """Minimal mpv JSON-IPC server: answers get_property from a dict.
+
+    `delay` maps property names to a reply delay so tests can force replies
+    to arrive out of request order.
+    """
+
+    def __init__(self, path: Path, props=None, delay=None):
+        self.path = path
+        self.props = props or {}
+        self.delay = delay or {}
+        self.accepts = 0
+        self.observed: list[str] = []
+        self.commands: list[list] = []
+        self.clients: list[socket.socket] = []
+        self._srv = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._srv.bind(str(path))
+        self._srv.listen(8)
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self._srv.accept()
+            except OSError:
+                return
+            self.accepts += 1
+            self.clients.append(conn)
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        lock = threading.Lock()
+        buf = b""
+        while True:
+            try:
+                chunk = conn.recv(4096)
+            except OSError:
+                return
+            if not chunk:
+                return
+            buf += chunk
+            while b"\n" in buf:
+                line, buf = buf.split(b"\n", 1)
+                msg = json.loads(line)
+                self.commands.append(msg["command"])  # in arrival order
+                threading.Thread(
+                    target=self._answer, args=(conn, lock, msg), daemon=True
+                ).start()
+
+    def _answer(self, conn, lock, msg):
+        cmd = msg["command"]
+        if cmd[0] == "get_property":
+            time.sleep(self.delay.get(cmd[1], 0))
+            reply = {"data": self.props.get(cmd[1]), "error": "success"}
+        elif cmd[0] == "observe_property":
+            self.observed.append(cmd[2])
+            self.send({"event": "property-change", "id": cmd[1], "name": cmd[2],
+                       "data": self.props.get(cmd[2])}, conn, lock)
+            reply = {"error": "success"}
+        else:
+            reply = {"data": None, "error": "success"}
+        reply["request_id"] = msg.get("request_id", 0)
+        self.send(reply, conn, lock)
+
+    def send(self, obj, conn=None, lock=None):
+        data = (json.dumps(obj) + "\n").encode()
+        targets = [conn] if conn else list(self.clients)
+        for c in targets:
+            try:
+                if lock:
+                    with lock:
+                        c.sendall(data)
+                else:
+                    c.sendall(data)
+            except OSError:
+                pass  # client hung up (quit, test teardown)
+
+    def close(self):
+        self._srv.close()
+        for c in self.clients:
+            try:
+                c.shutdown(socket.SHUT_RDWR)
+                c.close()
+            except OSError:
+                pass
+        self.path.unlink(missing_ok=True)
+
+
+class TestMpvConnection(unittest.TestCase):
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        self.addCleanup(self._td.cleanup)
+        self.path = Path(self._td.name) / "mpv.sock"
+
+    def _stub(self, **kw):
+        stub = StubMpv(self.path, **kw)
+        self.addCleanup(stub.close)
+        return stub
+
+    def test_missing_socket_returns_none(self):
+        conn = MpvConnection(self.path)
+        self.assertIsNone(conn.request(["get_property", "pid"]))
+        self.assertFalse(conn.connected)
+
+    def test_requests_share_one_connection(self):
+        stub = self._stub(props={"pid": 4242, "volume": 80})
+        conn = MpvConnection(self.path)
+        self.addCleanup(conn.close)
+        for _ in range(5):
+            self.assertEqual(conn.request(["get_property", "pid"])["data"], 4242)
+        self.assertEqual(conn.request(["get_property", "volume"])["data"], 80)
+        self.assertEqual(stub.accepts, 1)
+
+    def test_out_of_order_replies_reach_their_callers(self):
+        self._stub(props={"slow": "s", "fast": "f"}, delay={"slow": 0.2})
+        conn = MpvConnection(self.path)
+        self.addCleanup(conn.close)
+        results = {}
+
+        def ask(prop):
+            results[prop] = conn.request(["get_property", prop], timeout=2)["data"]
+
+        threads = [threading.Thread(target=ask, args=(p,)) for p in ("slow", "fast")]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, {"slow": "s", "fast": "f"})
+
+    def test_events_go_to_listeners(self):
+        stub = self._stub(props={"pid": 1})
+        conn = MpvConnection(self.path)
+        self.addCleanup(conn.close)
+        got = threading.Event()
+        seen = []
+        conn.add_listener(lambda msg: (seen.append(msg), got.set()))
+        conn.request(["get_property", "pid"])
+        stub.send({"event": "playback-restart"})
+        self.assertTrue(got.wait(2))
+        self.assertEqual(seen, [{"event": "playback-restart"}])
+
+    def test_reconnects_after_mpv_restart(self):
+        stub = self._stub(props={"pid": 1})
+        conn = MpvConnection(self.path)
+        self.addCleanup(conn.close)
+        self.assertEqual(conn.request(["get_property", "pid"])["data"], 1)
+        stub.close()
+        deadline = time.monotonic() + 2
+        while conn.connected and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertFalse(conn.connected)
+
+        self._stub(props={"pid": 2})
+        self.assertEqual(conn.request(["get_property", "pid"])["data"], 2)
+
+    def test_request_many_pipelines_in_one_write(self):
+        stub = self._stub(props={"pid": 7, "volume": 55}, delay={"pid": 0.1})
+        conn = MpvConnection(self.path)
+        self.addCleanup(conn.close)
+        replies = conn.request_many(
+            [["get_property", "pid"], ["get_property", "volume"]], timeout=2
+        )
+        self.assertEqual([r["data"] for r in replies], [7, 55])
+        self.assertEqual(stub.accepts, 1)
+
+    def test_request_many_without_mpv(self):
+        conn = MpvConnection(self.path)
+        self.assertEqual(conn.request_many([["get_property", "pid"]] * 2), [None, None])
+
+    def test_send_many_does_not_wait_for_replies(self):
+        stub = self._stub(delay={"pid": 1.0})
+        conn = MpvConnection(self.path)
+        self.addCleanup(conn.close)
+        t0 = time.monotonic()
+        self.assertTrue(conn.send_many([["get_property", "pid"], ["stop"]]))
+        self.assertLess(time.monotonic() - t0, 0.5)
+        deadline = time.monotonic() + 2
+        while len(stub.commands) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(stub.commands, [["get_property", "pid"], ["stop"]])
+
+    def test_send_many_without_mpv(self):
+        self.assertFalse(MpvConnection(self.path).send_many([["stop"]]))
+
+    def test_observe_delivers_initial_value_and_survives_reconnect(self):
+        first = self._stub(props={"pause": False})
+        conn = MpvConnection(self.path)
+        self.addCleanup(conn.close)
+        changes = []
+        got = threading.Event()
+
+        def on_event(msg):
+            if msg.get("event") == "property-change":
+                changes.append((msg["name"], msg["data"]))
+                got.set()
+
+        conn.add_listener(on_event)
+        self.assertTrue(conn.observe("pause"))
+        self.assertTrue(got.wait(2))
+        self.assertEqual(changes, [("pause", False)])
+
+        first.close()
+        conn.close()
+        got.clear()
+        stub = self._stub(props={"pause": True})
+        conn.request(["get_property", "pid"])  # reconnect replays observations
+        self.assertTrue(got.wait(2))
+        self.assertEqual(changes[-1], ("pause", True))
+        self.assertEqual(stub.observed, ["pause"])
+
+    def test_observe_unobserves_only_on_the_live_socket(self):
+        first = self._stub(props={"pause": False})
+        conn = MpvConnection(self.path)
+        self.addCleanup(conn.close)
+        self.assertTrue(conn.observe("pause"))
+        self.assertTrue(conn.observe("pause"))  # re-subscribe on the same socket
+        conn.request(["get_property", "pid"])  # replies arrive in order
+        self.assertEqual([c[0] for c in first.commands],
+                         ["observe_property", "unobserve_property",
+                          "observe_property", "get_property"])
+
+        first.close()
+        conn.close()
+        stub = self._stub(props={"pause": True})
+        self.assertTrue(conn.observe("pause"))  # connect replays it; once is enough
+        conn.request(["get_property", "pid"])
+        self.assertEqual([c[0] for c in stub.commands],
+                         ["observe_property", "get_property"])
+
+    def test_round_trips_and_timeouts_are_counted(self):
+        self._stub(props={"pid": 1}, delay={"slow": 0.3})
+        stats.reset()
+        self.addCleanup(stats.reset)
+        conn = MpvConnection(self.path)
+        self.addCleanup(conn.close)
+        conn.request(["get_property", "pid"])
+        conn.request(["get_property", "slow"], timeout=0.05)
+        snap = stats.snapshot()
+        self.assertEqual(snap["latency_ms"]["mpv_ipc"]["round_trip"]["count"], 1)
+        self.assertEqual(snap["counters"]["mpv_ipc"]["timeouts"], 1)
+
+    def test_close_notifies_listeners(self):
+        self._stub()
+        conn = MpvConnection(self.path)
+        seen = []
+        conn.add_listener(seen.append)
+        conn.request(["get_property", "pid"])
+        conn.close()
+        self.assertIn({"event": "ipc-disconnected"}, seen)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,352 @@
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sqlch.core import events, player
+from tests.test_mpv_ipc import StubMpv
+
+
+class PlayerTestCase(unittest.TestCase):
+    """Points sqlch.core.player at a stub mpv on a private socket."""
+
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        self.addCleanup(self._td.cleanup)
+        self.sock = Path(self._td.name) / "mpv.sock"
+        p = mock.patch.object(player, "mpv_socket", return_value=self.sock)
+        p.start()
+        self.addCleanup(p.stop)
+        self.stub = StubMpv(self.sock, props={"pid": 4242, "pause": False})
+        self.addCleanup(self.stub.close)
+        self.addCleanup(player._conn().close)
+        self.addCleanup(player._stop_watcher)
+
+    def wait_for(self, predicate, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if predicate():
+                return True
+            time.sleep(0.01)
+        return False
+
+    def start_watcher(self, station="KEXP"):
+        player._start_watcher(station)
+        self.assertTrue(self.wait_for(
+            lambda: set(player._WATCHED_PROPS) <= set(self.stub.observed)
+            and set(player._WATCHED_PROPS) <= set(player.playback_state())
+        ))
+
+
+class TestSnapshot(PlayerTestCase):
+    def test_snapshot_maps_each_property(self):
+        snap = player.mpv_snapshot(["pid", "pause", "no-such-prop"])
+        self.assertEqual(snap, {"pid": 4242, "pause": False, "no-such-prop": None})
+        self.assertEqual(self.stub.accepts, 1)
+
+
+class TestFade(PlayerTestCase):
+    def test_fade_is_one_script_message(self):
+        player.fade_volume(20, duration=1.0)
+        self.assertEqual(
+            [c for c in self.stub.commands if c[0] != "get_property"],
+            [["script-message-to", "sqlch_fade", "fade", "20.0", "1.0"]],
+        )
+
+    def test_fallback_timeline_is_superseded_by_new_fade(self):
+        self.stub.props["volume"] = 100
+        with mock.patch.object(player, "_mpv_ipc", wraps=player._mpv_ipc) as ipc:
+            ipc.side_effect = lambda cmd, timeout=0.5: (
+                None if cmd["command"][0] == "script-message-to"
+                else player._conn().request(cmd["command"], timeout)
+            )
+            player.fade_volume(0, duration=5.0)
+            time.sleep(0.15)
+            player.fade_volume(100, duration=0)
+            time.sleep(0.15)
+        volumes = [c[2] for c in self.stub.commands
+                   if c[:2] == ["set_property", "volume"]]
+        self.assertGreater(len(volumes), 1)
+        self.assertEqual(volumes[-1], 100)
+        self.assertTrue(all(v > 90 for v in volumes[:-1]))  # long ramp cut short
+
+    def test_fade_script_ships_with_package(self):
+        self.assertTrue(player.fade_script().exists())
+
+
+class TestPreview(PlayerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.preview_sock = self.sock.with_name("preview.sock")
+        self.preview_stub = StubMpv(self.preview_sock, props={"pid": 6161})
+        self.addCleanup(self.preview_stub.close)
+        for target in (
+            mock.patch.object(player, "preview_socket", return_value=self.preview_sock),
+            mock.patch.object(player, "_spawn_mpv"),
+            mock.patch.object(player, "fade_volume"),
+        ):
+            target.start()
+            self.addCleanup(target.stop)
+        self.addCleanup(player._end_session)
+
+    def test_preview_loads_into_idle_instance_without_spawning(self):
+        player.preview("http://a.example/stream", duration=30)
+        player.preview("http://b.example/stream", duration=30)
+        player._spawn_mpv.assert_not_called()
+        loads = [c for c in self.preview_stub.commands if c[0] == "loadfile"]
+        self.assertEqual(loads, [["loadfile", "http://a.example/stream", "replace"],
+                                 ["loadfile", "http://b.example/stream", "replace"]])
+        self.assertEqual(self.stub.commands, [])  # main player untouched
+
+    def test_mpv_enforces_the_preview_length(self):
+        player.preview("http://a.example/stream", duration=12)
+        cmds = self.preview_stub.commands
+        end = cmds.index(["set_property", "end", "+12"])
+        self.assertLess(end, cmds.index(["loadfile", "http://a.example/stream", "replace"]))
+
+    def test_preview_instance_does_not_keep_streams_open(self):
+        self.preview_stub.close()
+        with mock.patch.object(player, "_wait_for_ipc", return_value=True):
+            player._ensure_preview_mpv()
+        self.assertIn("--keep-open=no", player._spawn_mpv.call_args.kwargs["extra_args"])
+
+    def test_preview_ducks_and_restores_main_player(self):
+        self.stub.props["volume"] = 80
+        with mock.patch.object(player, "_current", {"type": "station", "item": {}}):
+            player.preview("http://a.example/stream", duration=0.05)
+            self.assertTrue(self.wait_for(lambda: player._preview_timer is None))
+        player.fade_volume.assert_any_call(20, duration=1.0)
+        player.fade_volume.assert_called_with(80.0, duration=1.0)
+        self.assertIn(["stop"], self.preview_stub.commands)
+        self.assertNotIn(["stop"], self.stub.commands)
+
+
+    def test_stale_timer_leaves_a_newer_preview_alone(self):
+        player.preview("http://a.example/stream", duration=30)
+        stale = player._preview_gen
+        player.preview("http://b.example/stream", duration=30)
+        timer = player._preview_timer
+        player._preview_done(stale)  # a's timer, firing as b started
+        self.assertIs(player._preview_timer, timer)
+        self.assertNotIn(["stop"], self.preview_stub.commands)
+
+class TestMetadataPublisher(PlayerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(player._publisher.reset)
+
+    def _sets(self):
+        return [c[1:] for c in self.stub.commands if c[0] == "set_property_string"]
+
+    def _settle(self, count):
+        self.assertTrue(self.wait_for(lambda: len(self._sets()) >= count))
+        time.sleep(0.05)
+
+    def test_first_publish_sends_every_field_once(self):
+        with mock.patch.object(player._conn(), "send_many",
+                               wraps=player._conn().send_many) as send:
+            player._publish_fields({"title": "Hallogallo", "album": "KEXP"})
+        send.assert_called_once()
+        self._settle(4)
+        self.assertEqual(sorted(self._sets()), [
+            ["metadata/album", "KEXP"], ["metadata/title", "Hallogallo"],
+            ["user-data/album", "KEXP"], ["user-data/title", "Hallogallo"],
+        ])
+
+    def test_only_changed_keys_are_sent(self):
+        player._publish_fields({"title": "Hallogallo", "album": "KEXP"})
+        self._settle(4)
+        self.stub.commands.clear()
+        player._publish_fields({"title": "Hallogallo", "album": "KEXP"})
+        player._publish_fields({"title": "Vitamin C", "album": "KEXP"})
+        self._settle(2)
+        self.assertEqual(self._sets(), [["metadata/title", "Vitamin C"],
+                                        ["user-data/title", "Vitamin C"]])
+
+    def test_dropped_keys_are_blanked(self):
+        player._publish_fields({"title": "Hallogallo", "date": "1972"})
+        self._settle(4)
+        self.stub.commands.clear()
+        player._publish_fields({"title": "Hallogallo"})
+        self._settle(2)
+        self.assertEqual(self._sets(), [["metadata/date", ""], ["user-data/date", ""]])
+
+    def test_station_switch_republishes(self):
+        player._publish_fields({"title": "Hallogallo"})
+        self._settle(2)
+        player._stop_watcher()
+        self.stub.commands.clear()
+        player._publish_fields({"title": "Hallogallo"})
+        self._settle(2)
+        self.assertEqual(len(self._sets()), 2)
+
+
+class TestEnrichment(PlayerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(player._publisher.reset)
+        p = mock.patch("sqlch.core.recorder.on_track_change")
+        p.start()
+        self.addCleanup(p.stop)
+        self.release = threading.Event()
+        self.looked_up = []
+
+        def slow_enrich(artist, track):
+            self.looked_up.append(track)
+            self.release.wait(2)
+            return {"album": f"{track} LP", "year": "1972", "genres": ["krautrock"]}
+
+        p = mock.patch.object(player.enrich, "enrich_track", side_effect=slow_enrich)
+        p.start()
+        self.addCleanup(p.stop)
+
+    def _published(self, key):
+        return [c[2] for c in self.stub.commands
+                if c[:2] == ["set_property_string", f"metadata/{key}"]]
+
+    def test_raw_fields_are_published_before_enrichment(self):
+        player._on_track_change("Neu! - Hallogallo", "KEXP")
+        # publishing is fire-and-forget, so wait for the stub to see it
+        self.assertTrue(self.wait_for(lambda: self._published("album") == ["KEXP"]))
+        self.assertTrue(self.wait_for(lambda: self._published("title") == ["Hallogallo"]))
+        self.release.set()
+        self.assertTrue(self.wait_for(lambda: "Hallogallo LP" in self._published("album")))
+        self.assertTrue(self.wait_for(lambda: self._published("genre") == ["krautrock"]))
+
+    def test_track_and_enrichment_events(self):
+        seen = []
+        token = events.subscribe(seen.append, ["track", "enrichment"])
+        self.addCleanup(events.unsubscribe, token)
+        player._on_track_change("Neu! - Hallogallo", "KEXP")
+        self.assertEqual([e["event"] for e in seen], ["track"])
+        self.release.set()
+        self.assertTrue(self.wait_for(lambda: len(seen) == 2))
+        self.assertEqual(seen[1]["fields"]["album"], "Hallogallo LP")
+
+    def test_stale_track_results_are_dropped(self):
+        player._on_track_change("Neu! - Hallogallo", "KEXP")
+        self.assertTrue(self.wait_for(lambda: self.looked_up == ["Hallogallo"]))
+        player._on_track_change("Can - Vitamin C", "KEXP")
+        player._on_track_change("Faust - Jennifer", "KEXP")
+        self.release.set()
+        self.assertTrue(self.wait_for(lambda: "Jennifer LP" in self._published("album")))
+        self.assertNotIn("Hallogallo LP", self._published("album"))
+        self.assertNotIn("Vitamin C", self.looked_up)  # queued, then superseded
+
+
+class TestWatcher(PlayerTestCase):
+    def test_title_change_event_triggers_track_change(self):
+        seen = threading.Event()
+        calls = []
+
+        def on_change(icy, station):
+            calls.append((icy, station))
+            seen.set()
+
+        with mock.patch.object(player, "_on_track_change", side_effect=on_change):
+            self.start_watcher()
+            self.stub.send({"event": "property-change", "name": "metadata",
+                            "data": {"icy-title": "Neu! - Hallogallo"}})
+            self.assertTrue(seen.wait(2))
+        self.assertEqual(calls, [("Neu! - Hallogallo", "KEXP")])
+
+    def test_watched_properties_are_tracked(self):
+        self.start_watcher()
+        self.stub.send({"event": "property-change", "name": "cache-buffering-state",
+                        "data": 42})
+        self.assertTrue(self.wait_for(
+            lambda: player.playback_state().get("cache-buffering-state") == 42
+        ))
+        self.assertIs(player.playback_state().get("pause"), False)
+
+    def test_pause_and_buffer_changes_are_published(self):
+        seen = []
+        token = events.subscribe(seen.append, ["playback", "buffer"])
+        self.addCleanup(events.unsubscribe, token)
+        self.start_watcher()
+        self.stub.send({"event": "property-change", "name": "pause", "data": True})
+        self.stub.send({"event": "property-change", "name": "cache-buffering-state",
+                        "data": 55})
+        self.assertTrue(self.wait_for(lambda: len(seen) >= 2))
+        self.assertEqual([(e["event"], e.get("state", e.get("percent"))) for e in seen],
+                         [("playback", "paused"), ("buffer", 55)])
+
+    def test_stop_ends_watcher_thread(self):
+        self.start_watcher()
+        t = player._metadata_thread
+        player._stop_watcher()
+        t.join(2)
+        self.assertFalse(t.is_alive())
+
+
+class TestStationSwitch(PlayerTestCase):
+    STATION = {"id": "kexp", "name": "KEXP", "url": "http://kexp.example/stream"}
+
+    def setUp(self):
+        super().setUp()
+        for target in (
+            mock.patch.object(player.notify, "notify"),
+            mock.patch.object(player.library, "record_play"),
+            mock.patch("sqlch.core.recorder.stop"),
+            mock.patch.object(player, "_spawn_mpv"),
+            mock.patch.object(player, "_wait_for_ipc", return_value=False),
+        ):
+            target.start()
+            self.addCleanup(target.stop)
+        player.set_reuse(True)
+        self.addCleanup(player.set_reuse, False)
+
+    def test_reuse_switches_with_loadfile(self):
+        player.play_station(self.STATION)
+        self.assertIn(["loadfile", self.STATION["url"], "replace"], self.stub.commands)
+        self.assertIn(["set_property", "pause", False], self.stub.commands)
+        player._spawn_mpv.assert_not_called()
+        self.assertEqual(player.current()["item"]["id"], "kexp")
+
+    def test_first_audio_latency_is_recorded(self):
+        before = len(player.switch_latencies())
+        player.play_station(self.STATION)
+        self.stub.send({"event": "playback-restart"})
+        self.assertTrue(self.wait_for(
+            lambda: len(player.switch_latencies()) > before
+        ))
+        sample = player.switch_latencies()[-1]
+        self.assertEqual((sample["mode"], sample["station"]), ("reuse", "kexp"))
+        self.assertGreaterEqual(sample["ms"], 0)
+
+    def test_dead_mpv_is_respawned(self):
+        self.stub.close()
+        with mock.patch.object(player, "_kill_existing") as kill:
+            player.play_station(self.STATION)
+        kill.assert_called_once()
+        player._spawn_mpv.assert_called_once_with(self.STATION["url"])
+
+    def test_stop_leaves_reused_mpv_idle(self):
+        with mock.patch.object(player, "_kill_existing") as kill:
+            player.stop(notify_user=False)
+        kill.assert_not_called()
+        self.assertIn(["stop"], self.stub.commands)
+        self.assertIsNone(player.current())
+
+    def test_adopt_standby_promotes_instance(self):
+        standby_sock = self.sock.with_name("standby-x.sock")
+        warm = StubMpv(standby_sock, props={"pid": 5151})
+        self.addCleanup(warm.close)
+        with mock.patch.object(player, "_kill_existing"):
+            self.assertTrue(player.adopt_standby(self.STATION, standby_sock))
+        self.assertTrue(self.sock.is_symlink())
+        self.assertEqual(self.sock.resolve(), standby_sock.resolve())
+        self.assertIn(["set_property", "mute", False], warm.commands)
+        self.assertEqual(player.switch_latencies()[-1]["mode"], "standby")
+        self.assertEqual(player.current()["item"]["id"], "kexp")
+
+    def test_adopt_dead_standby_is_refused(self):
+        gone = self.sock.with_name("standby-gone.sock")
+        self.assertFalse(player.adopt_standby(self.STATION, gone))
+        self.assertFalse(self.sock.is_symlink())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -157,6 +157,9 @@ class FakeMpv:
             return {"icy-genre": "electronic"}
         return None
 
+    def mpv_snapshot(self, props):
+        return {prop: self.mpv_get(prop) for prop in props}
+
     def mpv_command(self, *parts):
         self.props.append(parts)
 
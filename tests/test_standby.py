@@ -0,0 +1,101 @@
+import unittest
+from unittest import mock
+
+from sqlch.core import player, standby
+
+STATIONS = [
+    {"id": f"s{i}", "name": f"S{i}", "url": f"http://s{i}.example/stream",
+     "stream": {"bitrate": 128}}
+    for i in range(5)
+]
+
+
+def _next(cur):
+    ids = [s["id"] for s in STATIONS]
+    return STATIONS[(ids.index(cur) + 1) % len(STATIONS)] if cur in ids else STATIONS[0]
+
+
+def _prev(cur):
+    ids = [s["id"] for s in STATIONS]
+    return STATIONS[(ids.index(cur) - 1) % len(STATIONS)] if cur in ids else STATIONS[-1]
+
+
+class TestStandbyPool(unittest.TestCase):
+    def setUp(self):
+        self.cfg = {"standby": {"enabled": True, "neighbours": 1,
+                                "memory_mb": 16, "max_kbps": 512}}
+        for target in (
+            mock.patch.object(standby.config, "load", side_effect=lambda: self.cfg),
+            mock.patch.object(standby.library, "next_station", side_effect=_next),
+            mock.patch.object(standby.library, "prev_station", side_effect=_prev),
+            mock.patch.object(player, "_spawn_mpv"),
+            mock.patch.object(player, "_quit_instance"),
+        ):
+            target.start()
+            self.addCleanup(target.stop)
+        standby._pool.clear()
+        self.addCleanup(standby._pool.clear)
+
+    def _spawned_urls(self):
+        return [c.args[0] for c in player._spawn_mpv.call_args_list]
+
+    def test_sync_warms_both_neighbours_muted(self):
+        standby._sync("s2")
+        self.assertEqual(sorted(standby._pool), ["s1", "s3"])
+        self.assertEqual(sorted(self._spawned_urls()),
+                         ["http://s1.example/stream", "http://s3.example/stream"])
+        kwargs = player._spawn_mpv.call_args.kwargs
+        self.assertFalse(kwargs["mpris"])
+        self.assertIn("--mute=yes", kwargs["extra_args"])
+        self.assertIn("--demuxer-max-bytes=8MiB", kwargs["extra_args"])
+
+    def test_bandwidth_cap_limits_pool(self):
+        self.cfg["standby"]["max_kbps"] = 200
+        standby._sync("s2")
+        self.assertEqual(list(standby._pool), ["s3"])  # nearest-first, next wins
+
+    def test_moving_cursor_discards_and_refills(self):
+        standby._sync("s2")
+        old = dict(standby._pool)
+        player._spawn_mpv.reset_mock()
+        standby._sync("s3")
+        self.assertEqual(sorted(standby._pool), ["s2", "s4"])
+        player._quit_instance.assert_any_call(old["s1"]["sock"])
+        self.assertEqual(sorted(self._spawned_urls()),
+                         ["http://s2.example/stream", "http://s4.example/stream"])
+
+    def test_take_hands_over_instance(self):
+        standby._sync("s2")
+        sock = standby._pool["s3"]["sock"]
+        self.assertEqual(standby.take("s3"), sock)
+        self.assertNotIn("s3", standby._pool)
+        self.assertIsNone(standby.take("s3"))
+
+    def test_clear_during_spawn_quits_the_new_instance(self):
+        player._spawn_mpv.side_effect = lambda *a, **kw: standby.clear()
+        standby._sync("s2")
+        self.assertEqual(standby._pool, {})
+        self.assertEqual(player._spawn_mpv.call_count, 1)  # stops after the stale one
+        sock = player._spawn_mpv.call_args.kwargs["sock"]
+        player._quit_instance.assert_called_once_with(sock)
+
+    def test_stale_generation_does_nothing(self):
+        standby._sync("s2", gen=standby._generation - 1)
+        self.assertEqual(standby._pool, {})
+        player._spawn_mpv.assert_not_called()
+
+    def test_pool_gauges(self):
+        standby._sync("s2")
+        gauges = standby.stats.snapshot()["gauges"]["standby"]
+        self.assertEqual(gauges, {"instances": 2, "kbps": 256})
+
+    def test_disabled_pool_clears(self):
+        standby._sync("s2")
+        self.cfg["standby"]["enabled"] = False
+        standby._sync("s2")
+        self.assertEqual(standby._pool, {})
+        self.assertEqual(player._quit_instance.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import io
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sqlch.core import stationio
+
+STATIONS = [
+    {"id": "kexp", "name": "KEXP", "url": "http://kexp", "tags": ["indie"],
+     "rb_uuid": "u1", "stream": {"codec": "MP3", "bitrate": 128, "country": "US"}},
+    {"id": "fip", "name": "FIP & co", "url": "http://fip?a=1&b=2", "tags": []},
+]
+
+
+def dump(fmt):
+    out = io.StringIO()
+    stationio.write_stations(STATIONS, out, fmt)
+    return out.getvalue()
+
+
+def load(text, fmt):
+    return list(stationio.read_stations(io.StringIO(text), fmt))
+
+
+class TestRoundTrip(unittest.TestCase):
+    def test_every_format_keeps_names_and_urls(self):
+        for fmt in stationio.FORMATS:
+            with self.subTest(fmt=fmt):
+                got = load(dump(fmt), fmt)
+                self.assertEqual([(s["name"], s["url"]) for s in got],
+                                 [(s["name"], s["url"]) for s in STATIONS])
+
+    def test_rb_and_sqlch_keep_details(self):
+        rb = load(dump("rb"), "rb")[0]
+        self.assertEqual((rb["rb_uuid"], rb["tags"], rb["stream"]["country"]),
+                         ("u1", ["indie"], "US"))
+        self.assertEqual(load(dump("sqlch"), "sqlch"), STATIONS)
+
+    def test_json_is_streamed_across_chunks(self):
+        with mock.patch.object(stationio, "_CHUNK", 7):
+            self.assertEqual(load(dump("sqlch"), "sqlch"), STATIONS)
+            self.assertEqual(len(load(dump("rb"), "rb")), 2)
+
+
+class TestReaders(unittest.TestCase):
+    def test_m3u_titles_and_plain_urls(self):
+        text = "#EXTM3U\n#EXTINF:-1 tvg-id=\"x\",Radio One\nhttp://one\n\nhttp://two\n"
+        self.assertEqual(load(text, "m3u"), [{"name": "Radio One", "url": "http://one"},
+                                             {"name": "http://two", "url": "http://two"}])
+
+    def test_pls_entries_in_number_order(self):
+        text = "[playlist]\nFile2=http://two\nTitle2=Two\nfile1=http://one\nNumberOfEntries=2\n"
+        self.assertEqual(load(text, "pls"), [{"name": "http://one", "url": "http://one"},
+                                             {"name": "Two", "url": "http://two"}])
+
+    def test_bad_input_raises_value_error(self):
+        for text, fmt in (("{}", "rb"), ("[]", "sqlch"), ("x=1", "pls"), ('[{"a": ', "rb")):
+            with self.subTest(fmt=fmt), self.assertRaises(ValueError):
+                load(text, fmt)
+        with self.assertRaises(ValueError):
+            load("", "csv")
+
+    def test_detect_format(self):
+        with tempfile.TemporaryDirectory() as td:
+            for name, text, fmt in (("a.json", " [", "rb"), ("b.json", "{", "sqlch"),
+                                    ("c.txt", "[playlist]", "pls"), ("d.M3U8", "", "m3u"),
+                                    ("e", "<?xml", "xspf"), ("f", "http://x", "m3u")):
+                path = Path(td) / name
+                path.write_text(text)
+                self.assertEqual(stationio.detect_format(path), fmt, name)
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        self.addCleanup(self._td.cleanup)
+        self.dir = Path(self._td.name)
+
+    def test_undecodable_file_is_reported(self):
+        from sqlch.cli import main as cli
+        for name in ("bad.json", "bad"):
+            path = self.dir / name
+            path.write_bytes(b"\xff\xfe[{}]")
+            with self.subTest(name=name), mock.patch("sys.stderr", io.StringIO()) as err, \
+                    self.assertRaises(SystemExit):
+                cli.import_cmd([str(path)])
+            self.assertIn("cannot read", err.getvalue())
+
+    def test_failed_export_leaves_no_temp_file(self):
+        from sqlch.cli import main as cli
+        from sqlch.core import library
+
+        def fail(stations, f, fmt):
+            f.write("partial")
+            raise OSError("disk full")
+
+        out = self.dir / "out.m3u"
+        with mock.patch.object(library, "list_stations", return_value=STATIONS), \
+                mock.patch.object(stationio, "write_stations", side_effect=fail), \
+                mock.patch("sys.stderr", io.StringIO()), self.assertRaises(SystemExit):
+            cli.export_cmd([str(out)])
+        self.assertEqual(list(self.dir.iterdir()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import threading
+import unittest
+
+from sqlch.core import daemon, stats
+
+
+class TestStats(unittest.TestCase):
+    def setUp(self):
+        stats.reset()
+        self.addCleanup(stats.reset)
+
+    def test_percentiles_over_window(self):
+        for ms in range(1, 101):
+            stats.observe("cmd.play", float(ms))
+        lat = stats.snapshot()["latency_ms"]["cmd"]["play"]
+        self.assertEqual((lat["count"], lat["p50"], lat["p95"], lat["p99"], lat["max"]),
+                         (100, 50.0, 95.0, 99.0, 100.0))
+
+    def test_window_is_bounded_but_count_is_lifetime(self):
+        for _ in range(stats._WINDOW + 10):
+            stats.observe("mpv_ipc.round_trip", 1.0)
+        series = stats._series["mpv_ipc.round_trip"]
+        self.assertEqual(len(series.samples), stats._WINDOW)
+        self.assertEqual(series.count, stats._WINDOW + 10)
+
+    def test_counters_nest_by_dots(self):
+        stats.incr("cache.enrich.hit", 2)
+        stats.incr("cache.enrich.miss")
+        stats.incr("cache.spotify.stale")
+        self.assertEqual(stats.snapshot()["counters"]["cache"], {
+            "enrich": {"hit": 2, "miss": 1}, "spotify": {"stale": 1}})
+
+    def test_gauges_are_sampled_and_errors_contained(self):
+        stats.gauge("test.depth", lambda: 3)
+        stats.gauge("test.broken", lambda: 1 / 0)
+        self.addCleanup(stats._gauges.pop, "test.depth")
+        self.addCleanup(stats._gauges.pop, "test.broken")
+        self.assertEqual(stats.snapshot()["gauges"]["test"], {"broken": None, "depth": 3})
+
+    def test_thread_counts_strip_worker_numbers(self):
+        release = threading.Event()
+        workers = [threading.Thread(target=release.wait, name=f"sqlch-cmd_{i}")
+                   for i in range(3)]
+        for t in workers:
+            t.start()
+        try:
+            self.assertEqual(stats.thread_counts().get("sqlch-cmd"), 3)
+        finally:
+            release.set()
+            for t in workers:
+                t.join()
+
+    def test_daemon_records_command_latency_and_errors(self):
+        daemon._respond({"cmd": "ping"})
+        daemon._respond({"cmd": "no-such-command"})
+        resp = daemon._handle({"cmd": "stats"})
+        self.assertEqual(resp["stats"]["latency_ms"]["cmd"]["ping"]["count"], 1)
+        self.assertEqual(resp["stats"]["counters"]["cmd_errors"], {"unknown": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
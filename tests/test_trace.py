@@ -0,0 +1,103 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from sqlch.core import trace
+
+
+@trace.traced
+def _work(x):
+    return x * 2
+
+
+class TestTrace(unittest.TestCase):
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        self.addCleanup(self._td.cleanup)
+        self.path = Path(self._td.name) / "trace.json"
+        trace.enable(self.path)
+        self.addCleanup(trace.disable)
+
+    def events(self):
+        trace.disable()
+        return json.loads(self.path.read_text())
+
+    def test_spans_instants_and_traced_functions(self):
+        with trace.span("player.switch", station="KEXP"):
+            self.assertEqual(_work(2), 4)
+        trace.instant("player.first_audio", mode="spawn")
+        evs = [e for e in self.events() if e["ph"] != "M"]
+        self.assertEqual([e["name"] for e in evs],
+                         ["test_trace._work", "player.switch", "player.first_audio"])
+        work, switch, first = evs
+        self.assertEqual((switch["cat"], switch["args"]), ("player", {"station": "KEXP"}))
+        self.assertLessEqual(switch["ts"], work["ts"])
+        self.assertGreaterEqual(switch["ts"] + switch["dur"], work["ts"] + work["dur"])
+        self.assertEqual((first["ph"], first["args"]), ("i", {"mode": "spawn"}))
+
+    def test_exception_is_recorded_and_propagates(self):
+        with self.assertRaises(KeyError):
+            with trace.span("daemon.play"):
+                raise KeyError("x")
+        (ev,) = [e for e in self.events() if e["ph"] == "X"]
+        self.assertEqual(ev["args"], {"error": "KeyError"})
+
+    def test_threads_are_named(self):
+        t = threading.Thread(target=_work, args=(1,), name="enrichment")
+        t.start()
+        t.join()
+        names = {e["args"]["name"] for e in self.events() if e["ph"] == "M"}
+        self.assertIn("enrichment", names)
+
+    def test_unclosed_trace_is_readable_once_terminated(self):
+        with trace.span("recorder.start"):
+            pass
+        partial = self.path.read_text()
+        self.assertEqual(json.loads(partial + "]")[-1]["name"], "recorder.start")
+
+    def test_disabled_is_a_noop(self):
+        trace.disable()
+        self.assertFalse(trace.enabled())
+        self.assertIs(trace.span("a.b", x=1), trace._NOOP)
+        trace.instant("a.c")
+        self.assertEqual(_work(3), 6)
+        self.assertEqual(json.loads(self.path.read_text()), [])
+
+
+class TestTraceFromEnv(unittest.TestCase):
+    def setUp(self):
+        self._td = tempfile.TemporaryDirectory()
+        self.addCleanup(self._td.cleanup)
+        self.addCleanup(trace.disable)
+
+    def test_file_is_created_by_the_first_event(self):
+        path = Path(self._td.name) / "sub" / "trace-{pid}.json"
+        with mock.patch.dict(os.environ, {"SQLCH_TRACE": str(path)}), \
+                mock.patch.object(trace.atexit, "register"):
+            trace._from_env()
+        path = Path(str(path).replace("{pid}", str(os.getpid())))
+        self.assertTrue(trace.enabled())
+        self.assertFalse(path.parent.exists())
+        with trace.span("cli.main"):
+            pass
+        self.assertEqual(trace.disable(), path)
+        self.assertEqual([e["name"] for e in json.loads(path.read_text())
+                          if e["ph"] == "X"], ["cli.main"])
+
+    def test_unwritable_path_turns_tracing_off(self):
+        blocker = Path(self._td.name) / "file"
+        blocker.write_text("")
+        with mock.patch.dict(os.environ, {"SQLCH_TRACE": str(blocker / "t.json")}), \
+                mock.patch.object(trace.atexit, "register"):
+            trace._from_env()
+        with trace.span("cli.main"):
+            pass
+        self.assertFalse(trace.enabled())
+
+
+if __name__ == "__main__":
+    unittest.main()
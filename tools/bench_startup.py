@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Cold-start budget for thin CLI commands (`sqlch status` and friends).
+
+Measures, in fresh interpreters:
+
+- import time of sqlch.cli.main (python -X importtime, best of N runs)
+- that no heavy module (requests, player, library, ...) is imported by it
+- wall time of `sqlch status` against a live control socket
+
+Exits 1 if the import time exceeds the budget or a heavy module leaks in.
+
+    python tools/bench_startup.py [--budget-ms 30] [--runs 7]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+# Modules a daemon-forwarded command must not pay for.
+HEAVY = (
+    "requests",
+    "sqlch.core.player",
+    "sqlch.core.library",
+    "sqlch.core.discover",
+    "sqlch.core.daemon",
+    "sqlch.core.enrich",
+)
+
+CHECK_IMPORTS = (
+    "import sys, sqlch.cli.main\n"
+    "heavy = [m for m in {heavy!r} if m in sys.modules]\n"
+    "print(','.join(heavy))\n"
+)
+
+STATUS = (
+    "import sys\n"
+    "from sqlch.cli.main import main\n"
+    "sys.argv = ['sqlch', 'status']\n"
+    "main()\n"
+)
+
+
+def _python(code: str, env: dict | None = None, importtime: bool = False):
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ["-X", "importtime"]
+    cmd += ["-c", code]
+    return subprocess.run(cmd, capture_output=True, text=True, cwd=ROOT,
+                          env=env or os.environ.copy())
+
+
+def import_ms() -> float:
+    proc = _python("import sqlch.cli.main", importtime=True)
+    for line in proc.stderr.splitlines():
+        if line.rstrip().endswith("| sqlch.cli.main"):
+            return int(line.split("|")[1]) / 1000
+    raise RuntimeError(f"no importtime line for sqlch.cli.main:\n{proc.stderr}")
+
+
+def leaked_modules() -> list[str]:
+    out = _python(CHECK_IMPORTS.format(heavy=HEAVY)).stdout.strip()
+    return [m for m in out.split(",") if m]
+
+
+def status_wall_ms(runs: int) -> float:
+    from sqlch.core import daemon
+
+    with tempfile.TemporaryDirectory() as td:
+        env = os.environ.copy()
+        env["XDG_RUNTIME_DIR"] = td
+        sock = Path(td) / "sqlch" / "control.sock"
+        sock.parent.mkdir()
+        server = daemon.ControlServer(sock)
+        server.bind()
+        t = threading.Thread(target=server.serve_forever, daemon=True)
+        t.start()
+        samples = []
+        try:
+            for _ in range(runs):
+                t0 = time.perf_counter()
+                _python(STATUS, env=env)
+                samples.append((time.perf_counter() - t0) * 1000)
+        finally:
+            server.shutdown()
+            t.join(2)
+    return min(samples)
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--budget-ms", type=float, default=30.0,
+                    help="max import time of sqlch.cli.main (default 30)")
+    ap.add_argument("--runs", type=int, default=7)
+    args = ap.parse_args()
+
+    samples = [import_ms() for _ in range(args.runs)]
+    best = min(samples)
+    print(f"import sqlch.cli.main: best {best:.1f} ms, "
+          f"median {statistics.median(samples):.1f} ms "
+          f"(budget {args.budget_ms:.0f} ms)")
+    print(f"sqlch status (interpreter + import + round trip): "
+          f"{status_wall_ms(args.runs):.1f} ms")
+
+    failed = False
+    leaked = leaked_modules()
+    if leaked:
+        print(f"FAIL: thin CLI imports {', '.join(leaked)}")
+        failed = True
+    if best > args.budget_ms:
+        print(f"FAIL: import time {best:.1f} ms over budget")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""Stand-in for mpv that speaks just enough JSON IPC for the daemon.
+
+Accepts mpv's command line (only --input-ipc-server and the optional URL
+matter), plays nothing, and behaves like a stream player over the socket:
+
+- get_property / set_property / set_property_string on a property dict
+- observe_property / unobserve_property with property-change events
+- loadfile: goes active, emits playback-restart after the configured
+  latency, then publishes an ICY title; titles rotate while "playing"
+- stop, cycle pause, quit; anything else answers success
+
+Used by tools/loadtest.py via MPV_BIN. Tuning comes from the environment:
+FAKE_MPV_LATENCY_MS (loadfile to first audio, default 50) and
+FAKE_MPV_TITLE_EVERY (seconds between title changes, default 5, 0 = off).
+"""
+import itertools
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+LATENCY = float(os.environ.get("FAKE_MPV_LATENCY_MS", "50")) / 1000
+TITLE_EVERY = float(os.environ.get("FAKE_MPV_TITLE_EVERY", "5"))
+
+
+class FakeMpv:
+    def __init__(self, sock_path: str, url: str | None) -> None:
+        self.sock_path = sock_path
+        self.lock = threading.Lock()
+        self.clients: list["_Client"] = []
+        self.props = {
+            "pid": os.getpid(),
+            "idle-active": True,
+            "pause": False,
+            "mute": False,
+            "volume": 100.0,
+            "path": None,
+            "metadata": {},
+            "filtered-metadata": {},
+            "cache-buffering-state": 100,
+            "audio-codec-name": "mp3",
+            "audio-bitrate": 128000,
+            "playback-time": 0.0,
+            "stream-record": "",
+        }
+        self.load_gen = 0
+        self.titles = itertools.count(1)
+        self.stopping = threading.Event()
+        if url:
+            self.loadfile(url)
+
+    # --------------------------------------------------------
+    # State
+    # --------------------------------------------------------
+
+    def set_prop(self, name: str, value) -> None:
+        with self.lock:
+            self.props[name] = value
+            watchers = [(c, oid) for c in self.clients
+                        for oid, prop in c.observed.items() if prop == name]
+        for c, oid in watchers:
+            c.send({"event": "property-change", "id": oid, "name": name, "data": value})
+
+    def broadcast(self, event: dict) -> None:
+        with self.lock:
+            clients = list(self.clients)
+        for c in clients:
+            c.send(event)
+
+    def _new_title(self) -> None:
+        n = next(self.titles)
+        url = self.props.get("path") or "stream"
+        icy = f"Fake Artist {n % 7} - Track {n} ({url.rsplit('/', 1)[-1]})"
+        self.set_prop("metadata", {"icy-title": icy})
+        self.set_prop("filtered-metadata", {"icy-genre": "test"})
+
+    def loadfile(self, url: str) -> None:
+        with self.lock:
+            self.load_gen += 1
+            gen = self.load_gen
+        self.set_prop("path", url)
+        self.set_prop("metadata", {})
+        self.set_prop("idle-active", False)
+
+        def started() -> None:
+            time.sleep(LATENCY)
+            if gen != self.load_gen:
+                return
+            self.broadcast({"event": "playback-restart"})
+            self._new_title()
+
+        threading.Thread(target=started, daemon=True).start()
+
+    def stop(self) -> None:
+        with self.lock:
+            self.load_gen += 1
+        self.set_prop("path", None)
+        self.set_prop("metadata", {})
+        self.set_prop("idle-active", True)
+
+    def rotate_titles(self) -> None:
+        while not self.stopping.wait(TITLE_EVERY):
+            if not self.props["idle-active"] and not self.props["pause"]:
+                self._new_title()
+
+    # --------------------------------------------------------
+    # Commands
+    # --------------------------------------------------------
+
+    def handle(self, client: "_Client", command: list) -> dict:
+        name, args = command[0], command[1:]
+        if name == "get_property":
+            if args[0] not in self.props:
+                return {"error": "property unavailable"}
+            return {"error": "success", "data": self.props[args[0]]}
+        if name in ("set_property", "set_property_string"):
+            self.set_prop(args[0], args[1])
+            return {"error": "success"}
+        if name == "observe_property":
+            oid, prop = args
+            with self.lock:
+                client.observed[oid] = prop
+            client.send({"event": "property-change", "id": oid, "name": prop,
+                         "data": self.props.get(prop)})
+            return {"error": "success"}
+        if name == "unobserve_property":
+            with self.lock:
+                client.observed.pop(args[0], None)
+            return {"error": "success"}
+        if name == "loadfile":
+            self.loadfile(args[0])
+            return {"error": "success"}
+        if name == "stop":
+            self.stop()
+            return {"error": "success"}
+        if name == "cycle" and args and args[0] == "pause":
+            self.set_prop("pause", not self.props["pause"])
+            return {"error": "success"}
+        if name == "quit":
+            self.stopping.set()
+            return {"error": "success"}
+        return {"error": "success"}
+
+    # --------------------------------------------------------
+    # Socket
+    # --------------------------------------------------------
+
+    def serve(self) -> None:
+        try:
+            os.unlink(self.sock_path)
+        except OSError:
+            pass
+        srv = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        srv.bind(self.sock_path)
+        srv.listen(16)
+        srv.settimeout(0.2)
+        if TITLE_EVERY > 0:
+            threading.Thread(target=self.rotate_titles, daemon=True).start()
+        try:
+            while not self.stopping.is_set():
+                try:
+                    conn, _ = srv.accept()
+                except socket.timeout:
+                    continue
+                client = _Client(self, conn)
+                with self.lock:
+                    self.clients.append(client)
+                threading.Thread(target=client.run, daemon=True).start()
+        finally:
+            srv.close()
+            try:
+                os.unlink(self.sock_path)
+            except OSError:
+                pass
+
+
+class _Client:
+    def __init__(self, mpv: FakeMpv, conn: socket.socket) -> None:
+        self.mpv = mpv
+        self.conn = conn
+        self.observed: dict[int, str] = {}
+        self.send_lock = threading.Lock()
+
+    def send(self, msg: dict) -> None:
+        with self.send_lock:
+            try:
+                self.conn.sendall((json.dumps(msg) + "\n").encode())
+            except OSError:
+                pass
+
+    def run(self) -> None:
+        buf = b""
+        try:
+            while True:
+                chunk = self.conn.recv(65536)
+                if not chunk:
+                    break
+                buf += chunk
+                while b"\n" in buf:
+                    line, buf = buf.split(b"\n", 1)
+                    if not line.strip():
+                        continue
+                    try:
+                        msg = json.loads(line)
+                        reply = self.mpv.handle(self, msg["command"])
+                    except (ValueError, KeyError, IndexError, TypeError):
+                        reply = {"error": "invalid parameter"}
+                        msg = {}
+                    if "request_id" in msg:
+                        reply["request_id"] = msg["request_id"]
+                    self.send(reply)
+        except OSError:
+            pass
+        finally:
+            with self.mpv.lock:
+                if self in self.mpv.clients:
+                    self.mpv.clients.remove(self)
+            self.conn.close()
+
+
+def main(argv: list[str]) -> int:
+    sock_path = None
+    url = None
+    for arg in argv:
+        if arg.startswith("--input-ipc-server="):
+            sock_path = arg.split("=", 1)[1]
+        elif not arg.startswith("-"):
+            url = arg
+    if not sock_path:
+        print("fake_mpv: --input-ipc-server is required", file=sys.stderr)
+        return 2
+    FakeMpv(sock_path, url).serve()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
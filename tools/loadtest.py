@@ -0,0 +1,305 @@
+#!/usr/bin/env python3
+"""Load-test the daemon's control socket against a fake mpv.
+
+Starts a real daemon in a throwaway XDG environment, with MPV_BIN pointing
+at tools/fake_mpv.py, a seeded library, and enrichment/notifications aimed
+at nothing (no audio, network or desktop needed). Then N client threads,
+each on its own persistent session, issue a weighted mix of status, play,
+next, record and subscribe for the given duration, while a few standing
+subscribers count the events pushed to them.
+
+Reports throughput and per-command p50/p95/p99/max latency, failures
+(reply ok false) and errors (timeouts, dropped connections).
+
+    python tools/loadtest.py [--clients 8] [--duration 10] [--json]
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from sqlch.core.client import Session  # noqa: E402
+
+# Relative weights of the request mix.
+MIX = {"status": 55, "play": 15, "next": 15, "record": 5, "subscribe": 10}
+
+BOOT = (
+    "from sqlch.core import daemon, library\n"
+    "for i in range({stations}):\n"
+    "    library.add_station(name=f'Load {{i:03d}}', url=f'fake://load/{{i}}',\n"
+    "                        allow_existing=True)\n"
+    "daemon.run_daemon(mpris=False)\n"
+)
+
+
+def _percentile(ordered: list[float], pct: float) -> float | None:
+    if not ordered:
+        return None
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return round(ordered[k], 2)
+
+
+# ------------------------------------------------------------
+# Environment
+# ------------------------------------------------------------
+
+def _environment(tmp: Path, args) -> dict:
+    bin_dir = tmp / "bin"
+    bin_dir.mkdir()
+    mpv = bin_dir / "mpv"
+    mpv.write_text(f'#!/bin/sh\nexec "{sys.executable}" "{ROOT / "tools" / "fake_mpv.py"}" "$@"\n')
+    mpv.chmod(0o755)
+    quiet = bin_dir / "notify-send"
+    quiet.write_text("#!/bin/sh\nexit 0\n")
+    quiet.chmod(0o755)
+
+    env = {k: v for k, v in os.environ.items()
+           if k not in ("SPOTIFY_CLIENT_ID", "SPOTIFY_CLIENT_SECRET", "SQLCH_TRACE")}
+    for name in ("XDG_RUNTIME_DIR", "XDG_DATA_HOME", "XDG_CONFIG_HOME", "XDG_CACHE_HOME"):
+        d = tmp / name.lower()
+        d.mkdir()
+        env[name] = str(d)
+    dead = "http://127.0.0.1:9"  # discard port: enrichment fails fast, offline
+    env.update({
+        "PATH": f"{bin_dir}{os.pathsep}{env.get('PATH', '')}",
+        "MPV_BIN": str(mpv),
+        "SQLCH_MUSICBRAINZ_BASE": dead,
+        "SQLCH_SPOTIFY_BASE": dead,
+        "SQLCH_SPOTIFY_AUTH_BASE": dead,
+        "FAKE_MPV_LATENCY_MS": str(args.mpv_latency_ms),
+        "FAKE_MPV_TITLE_EVERY": str(args.title_every),
+        "PYTHONPATH": f"{ROOT}{os.pathsep}{env.get('PYTHONPATH', '')}",
+    })
+    if args.trace:
+        env["SQLCH_TRACE"] = str(Path(args.trace).resolve())
+    return env
+
+
+def _start_daemon(env: dict, stations: int) -> tuple[subprocess.Popen, Path]:
+    sock = Path(env["XDG_RUNTIME_DIR"]) / "sqlch" / "control.sock"
+    proc = subprocess.Popen(
+        [sys.executable, "-c", BOOT.format(stations=stations)],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    deadline = time.monotonic() + 15
+    while not sock.exists():
+        if proc.poll() is not None:
+            raise RuntimeError(f"daemon exited: {proc.stderr.read().decode()[-2000:]}")
+        if time.monotonic() > deadline:
+            proc.kill()
+            raise RuntimeError("daemon did not open its control socket")
+        time.sleep(0.05)
+    return proc, sock
+
+
+def _stop_daemon(proc: subprocess.Popen, env: dict) -> None:
+    mpv_sock = Path(env["XDG_RUNTIME_DIR"]) / "sqlch" / "mpv.sock"
+    if mpv_sock.exists():
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+                s.settimeout(1)
+                s.connect(str(mpv_sock))
+                s.sendall(b'{"command": ["quit"]}\n')
+        except OSError:
+            pass
+    proc.terminate()
+    try:
+        proc.wait(5)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+# ------------------------------------------------------------
+# Load
+# ------------------------------------------------------------
+
+class Results:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.latency: dict[str, list[float]] = {op: [] for op in MIX}
+        self.failed: dict[str, int] = {op: 0 for op in MIX}
+        self.errors: dict[str, int] = {op: 0 for op in MIX}
+        self.events = 0
+
+    def add(self, op: str, ms: float, ok: bool | None) -> None:
+        with self.lock:
+            if ok is None:
+                self.errors[op] += 1
+                return
+            self.latency[op].append(ms)
+            if not ok:
+                self.failed[op] += 1
+
+
+def _subscribe_once(sock: Path) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.settimeout(5)
+        s.connect(str(sock))
+        s.sendall(b'{"cmd": "subscribe"}\n')
+        with s.makefile("rb") as f:
+            return bool(json.loads(f.readline()).get("ok"))
+
+
+def _client(sock: Path, stations: list[str], deadline: float, seed: int,
+            results: Results) -> None:
+    rng = random.Random(seed)
+    ops, weights = zip(*MIX.items())
+    session = Session(sock)
+    try:
+        while time.monotonic() < deadline:
+            op = rng.choices(ops, weights)[0]
+            if op == "status":
+                msg = {"cmd": "status"}
+            elif op == "play":
+                msg = {"cmd": "play", "query": rng.choice(stations)}
+            elif op == "next":
+                msg = {"cmd": "next"}
+            elif op == "record":
+                msg = {"cmd": "record", "action": "toggle"}
+            t0 = time.perf_counter()
+            try:
+                if op == "subscribe":
+                    ok = _subscribe_once(sock)
+                else:
+                    ok = bool(session.request(msg, timeout=10).get("ok"))
+            except (ConnectionError, TimeoutError, OSError, ValueError):
+                ok = None
+            results.add(op, (time.perf_counter() - t0) * 1000, ok)
+    finally:
+        session.close()
+
+
+def _subscriber(sock: Path, stop: threading.Event, results: Results) -> None:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(str(sock))
+        s.settimeout(0.2)
+        s.sendall(b'{"cmd": "subscribe"}\n')
+        buf = b""
+        while not stop.is_set():
+            try:
+                chunk = s.recv(65536)
+            except socket.timeout:
+                continue
+            if not chunk:
+                break
+            buf += chunk
+            lines = buf.split(b"\n")
+            buf = lines.pop()
+            n = sum(1 for line in lines if b'"event"' in line)
+            with results.lock:
+                results.events += n
+
+
+def run(args) -> dict:
+    with tempfile.TemporaryDirectory(prefix="sqlch-load-") as td:
+        env = _environment(Path(td), args)
+        proc, sock = _start_daemon(env, args.stations)
+        try:
+            stations = [f"load-{i:03d}" for i in range(args.stations)]
+            warm = Session(sock)
+            warm.request({"cmd": "play", "query": stations[0]}, timeout=10)
+            warm.close()
+
+            results = Results()
+            stop = threading.Event()
+            subs = [threading.Thread(target=_subscriber, args=(sock, stop, results),
+                                     daemon=True) for _ in range(args.subscribers)]
+            for t in subs:
+                t.start()
+            t0 = time.monotonic()
+            deadline = t0 + args.duration
+            workers = [
+                threading.Thread(target=_client,
+                                 args=(sock, stations, deadline, args.seed + i, results),
+                                 daemon=True)
+                for i in range(args.clients)
+            ]
+            for t in workers:
+                t.start()
+            for t in workers:
+                t.join()
+            elapsed = time.monotonic() - t0
+            time.sleep(0.2)  # let the last events land
+            stop.set()
+            for t in subs:
+                t.join(2)
+
+            probe = Session(sock)
+            daemon_stats = probe.request({"cmd": "stats"}, timeout=5).get("stats", {})
+            probe.close()
+        finally:
+            _stop_daemon(proc, env)
+
+    report: dict = {"clients": args.clients, "duration_s": round(elapsed, 2),
+                    "ops": {}, "events_received": results.events,
+                    "daemon_threads": daemon_stats.get("threads", {}).get("total")}
+    total = 0
+    for op in MIX:
+        lat = sorted(results.latency[op])
+        total += len(lat) + results.errors[op]
+        report["ops"][op] = {
+            "count": len(lat) + results.errors[op],
+            "failed": results.failed[op],
+            "errors": results.errors[op],
+            "p50": _percentile(lat, 50),
+            "p95": _percentile(lat, 95),
+            "p99": _percentile(lat, 99),
+            "max": round(lat[-1], 2) if lat else None,
+        }
+    report["total_ops"] = total
+    report["ops_per_s"] = round(total / elapsed, 1) if elapsed else None
+    return report
+
+
+def _ms(v) -> str:
+    return "-" if v is None else f"{v:.1f}"
+
+
+def print_report(r: dict) -> None:
+    print(f"{r['clients']} clients, {r['duration_s']} s: {r['total_ops']} requests "
+          f"({r['ops_per_s']}/s), {r['events_received']} events pushed, "
+          f"daemon threads {r['daemon_threads']}")
+    print(f"  {'command':<10} {'count':>7} {'fail':>5} {'err':>5} "
+          f"{'p50':>8} {'p95':>8} {'p99':>8} {'max':>8}  (ms)")
+    for op, s in r["ops"].items():
+        print(f"  {op:<10} {s['count']:>7} {s['failed']:>5} {s['errors']:>5} "
+              f"{_ms(s['p50']):>8} {_ms(s['p95']):>8} {_ms(s['p99']):>8} {_ms(s['max']):>8}")
+
+
+def main() -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--clients", type=int, default=8)
+    ap.add_argument("--duration", type=float, default=10.0, help="seconds")
+    ap.add_argument("--subscribers", type=int, default=2,
+                    help="standing event subscribers")
+    ap.add_argument("--stations", type=int, default=20)
+    ap.add_argument("--mpv-latency-ms", type=float, default=50,
+                    help="fake mpv loadfile-to-audio delay")
+    ap.add_argument("--title-every", type=float, default=1.0,
+                    help="seconds between fake ICY title changes (0 = off)")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--trace", help="also write a daemon trace (see sqlch.core.trace)")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    report = run(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    errors = sum(s["errors"] for s in report["ops"].values())
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())